@@ -8,15 +8,37 @@ Reference:
 - SAD Section 4.3: Chat Interface Specifications
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Tuple
+import asyncio
+import contextvars
+import os
 import json
+import time
 import structlog
 
-from services.crew_manager import OnboardingCrewManager
-from typing import AsyncGenerator
+from services.chat_router import ROUTE_CREW
+from services.chat_sessions import ChatSession, get_chat_session_store
+from services.kickoff_executor import ExecutorSaturatedError, KickoffAdmission
+from services.rate_limiter import get_rate_limiter
+from services.resilience import get_exception_handler
+from services.shared_state import get_shared_store
+from utils.config import get_settings
+from utils.metrics import (
+    CHAT_IN_FLIGHT,
+    CHAT_TIME_TO_FIRST_CHUNK,
+    SSE_RESPONSE_BYTES,
+    SSE_RESPONSE_FRAMES,
+)
+from utils.tracing import NOOP_SPAN, get_tracer
+from typing import AsyncGenerator, AsyncIterator
+
+if TYPE_CHECKING:
+    # Pulls in crewai; the crew manager itself is built after startup
+    from services.crew_manager import OnboardingCrewManager
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -29,7 +51,15 @@ class ChatRequest(BaseModel):
     workflow_id: Optional[str] = Field(None, description="Workflow ID for context")
     conversation_history: Optional[List[Dict[str, str]]] = Field(
         None,
-        description="Previous conversation messages"
+        description="Previous conversation messages (only needed without session_id)"
+    )
+    session_id: Optional[str] = Field(
+        None,
+        description="Server-side session; its history is used and the new turn appended"
+    )
+    create_session: bool = Field(
+        False,
+        description="Start a server-side session for this conversation (id returned in X-Session-Id)"
     )
 
 
@@ -41,55 +71,299 @@ class ChatResponseChunk(BaseModel):
     tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool execution results")
 
 
-async def stream_chat_response(
-    crew_manager: OnboardingCrewManager,
-    request: ChatRequest
+# Static tail of a "responding" frame; same field order as ChatResponseChunk.model_dump()
+_CHUNK_FRAME_TAIL = json.dumps(
+    {"agent": "onboarding_orchestrator", "status": "responding", "tool_calls": None}
+)[1:]
+
+
+def _format_chunk_frame(chunk: str) -> str:
+    """Serialize a responding chunk as an SSE frame without building a model per frame."""
+    return f'data: {{"chunk": {json.dumps(chunk)}, {_CHUNK_FRAME_TAIL}\n\n'
+
+
+def _split_at_word_boundary(data: bytearray, limit: int) -> int:
+    """
+    Return the split index for a frame of at most ``limit`` bytes of UTF-8 ``data``.
+    
+    Cuts after the last space or newline within the limit; without one, backs
+    off to the nearest character boundary (forward only if a single character
+    is longer than ``limit``).
+    """
+    if len(data) <= limit:
+        return len(data)
+    cut = max(data.rfind(b" ", 0, limit), data.rfind(b"\n", 0, limit))
+    if cut > 0:
+        return cut + 1
+    cut = limit
+    # 0b10xxxxxx bytes continue a multi-byte character
+    while cut > 0 and data[cut] & 0xC0 == 0x80:
+        cut -= 1
+    if cut == 0:
+        cut = limit
+        while cut < len(data) and data[cut] & 0xC0 == 0x80:
+            cut += 1
+    return cut
+
+
+async def _anext(iterator: AsyncIterator[str]) -> str:
+    return await iterator.__anext__()
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str],
+    flush_bytes: int,
+    flush_interval: float,
 ) -> AsyncGenerator[str, None]:
     """
-    Stream chat response from CrewAI agents.
+    Coalesce small text chunks into larger frames.
     
-    Yields Server-Sent Events (SSE) formatted chunks.
+    A frame is flushed once ``flush_bytes`` UTF-8 bytes have accumulated (cut
+    at a word boundary where possible, never inside a character) or ``flush_interval`` seconds after its first
+    chunk arrived, whichever comes first. ``flush_bytes <= 0`` passes chunks
+    through unchanged; ``flush_interval <= 0`` disables the time window.
     """
+    if flush_bytes <= 0:
+        async for chunk in chunks:
+            if chunk:
+                yield chunk
+        return
+    
+    loop = asyncio.get_running_loop()
+    # Every __anext__ runs in this one context, as if the generator were
+    # iterated directly, so context variables it sets (e.g. the active
+    # tracing span) persist between chunks
+    context = contextvars.copy_context()
+    iterator = chunks.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    # Encoded once per chunk; frames are cut on the bytes
+    buffer = bytearray()
+    deadline: Optional[float] = None
     try:
-        # Send initial status
-        yield f"data: {json.dumps({'status': 'thinking', 'agent': 'onboarding_orchestrator'})}\n\n"
+        while True:
+            if pending is None:
+                pending = loop.create_task(_anext(iterator), context=context)
+            timeout = None
+            if deadline is not None and flush_interval > 0:
+                timeout = max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # Time window elapsed while waiting on the producer
+                yield buffer.decode("utf-8")
+                buffer, deadline = bytearray(), None
+                continue
+            
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+            if not chunk:
+                continue
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer += chunk.encode("utf-8")
+            
+            while len(buffer) >= flush_bytes:
+                cut = _split_at_word_boundary(buffer, flush_bytes)
+                frame = buffer[:cut].decode("utf-8")
+                del buffer[:cut]
+                yield frame
+                deadline = loop.time() + flush_interval if buffer else None
         
-        # Process message and stream response
-        async for chunk in crew_manager.process_chat_message(
-            message=request.message,
-            employee_id=request.employee_id,
-            workflow_id=request.workflow_id,
-            conversation_history=request.conversation_history
-        ):
-            # Format as SSE chunk
-            response_chunk = ChatResponseChunk(
-                chunk=chunk,
+        if buffer:
+            yield buffer.decode("utf-8")
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def stream_chat_response(
+    crew_manager: "OnboardingCrewManager",
+    request: ChatRequest,
+    admission: Optional[KickoffAdmission] = None,
+    session: Optional[ChatSession] = None,
+    trace: Any = NOOP_SPAN,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream chat response from CrewAI agents.
+    
+    Yields Server-Sent Events (SSE) formatted chunks, coalesced according to
+    SSE_FLUSH_BYTES / SSE_FLUSH_INTERVAL_MS. With a session, its history is
+    used and the completed turn is appended to it; failed turns are not. ``trace`` is the request's
+    root span; it ends with the stream.
+    """
+    settings = get_settings()
+    started = time.perf_counter()
+    sent_bytes = 0
+    sent_frames = 0
+    CHAT_IN_FLIGHT.inc()
+    with get_tracer().span("chat.stream", parent=trace) as span:
+        try:
+            # Send initial status
+            status = {'status': 'thinking', 'agent': 'onboarding_orchestrator'}
+            if session is not None:
+                status['session_id'] = session.session_id
+            event = f"data: {json.dumps(status)}\n\n"
+            sent_bytes, sent_frames = sent_bytes + len(event), sent_frames + 1
+            yield event
+            
+            # Process message and stream response
+            history = list(session.messages) if session is not None else request.conversation_history
+            # Set by the crew manager when it answered with an error fallback
+            outcome: Dict[str, Any] = {}
+            chunks = crew_manager.process_chat_message(
+                message=request.message,
+                employee_id=request.employee_id,
+                workflow_id=request.workflow_id,
+                conversation_history=history,
+                admission=admission,
+                outcome=outcome,
+            )
+            parts: List[str] = []
+            async for frame in coalesce_chunks(
+                chunks,
+                flush_bytes=settings.SSE_FLUSH_BYTES,
+                flush_interval=settings.SSE_FLUSH_INTERVAL_MS / 1000,
+            ):
+                if not parts:
+                    ttfc = time.perf_counter() - started
+                    CHAT_TIME_TO_FIRST_CHUNK.observe(ttfc)
+                    trace.set_attribute("chat.time_to_first_chunk_ms", round(ttfc * 1000, 3))
+                parts.append(frame)
+                event = _format_chunk_frame(frame)
+                sent_bytes, sent_frames = sent_bytes + len(event), sent_frames + 1
+                yield event
+            
+            if session is not None and parts and "error" not in outcome:
+                await get_chat_session_store().aappend(session, [
+                    {"role": "user", "content": request.message},
+                    {"role": "assistant", "content": "".join(parts)},
+                ])
+            
+            # Send completion status
+            event = f"data: {json.dumps({'status': 'complete', 'agent': 'onboarding_orchestrator'})}\n\n"
+            sent_bytes, sent_frames = sent_bytes + len(event), sent_frames + 1
+            yield event
+            
+        except Exception as e:
+            logger.error("Error streaming chat response", error=str(e), exc_info=True)
+            error_chunk = ChatResponseChunk(
+                chunk=f"Error: {str(e)}",
                 agent="onboarding_orchestrator",
-                status="responding"
+                status="error"
             )
-            yield f"data: {json.dumps(response_chunk.model_dump())}\n\n"
-        
-        # Send completion status
-        yield f"data: {json.dumps({'status': 'complete', 'agent': 'onboarding_orchestrator'})}\n\n"
-        
-    except Exception as e:
-        logger.error("Error streaming chat response", error=str(e), exc_info=True)
-        error_chunk = ChatResponseChunk(
-            chunk=f"Error: {str(e)}",
-            agent="onboarding_orchestrator",
-            status="error"
+            event = f"data: {json.dumps(error_chunk.model_dump())}\n\n"
+            sent_bytes, sent_frames = sent_bytes + len(event), sent_frames + 1
+            yield event
+        finally:
+            CHAT_IN_FLIGHT.dec()
+            # Character counts; frames are JSON-escaped, so ASCII and bytes agree
+            SSE_RESPONSE_BYTES.observe(sent_bytes)
+            SSE_RESPONSE_FRAMES.observe(sent_frames)
+            span.set_attributes(**{"sse.bytes": sent_bytes, "sse.frames": sent_frames})
+            trace.end()
+            if admission is not None:
+                admission.release_if_unused()
+
+
+async def _resolve_session(request: ChatRequest) -> Optional[ChatSession]:
+    """
+    Session for this request, or None when the client did not ask for one.
+    
+    create_session without a session_id starts a new session seeded with the
+    client's conversation_history if it sent one; the new id is returned in
+    the X-Session-Id header and the first SSE frame. An unknown session_id
+    (expired, evicted without a spill, or lost in a restart) is rejected
+    with 409 rather than answered without its history, so the client can
+    start a new session from the transcript it shows.
+    """
+    if not request.session_id and not request.create_session:
+        return None
+    store = get_chat_session_store()
+    if request.session_id:
+        session = await store.aget(request.session_id)
+        if session is None:
+            logger.info("Chat session not found", session_id=request.session_id)
+            raise HTTPException(status_code=409, detail="Session not found or expired")
+        return session
+    return await store.acreate(
+        employee_id=request.employee_id,
+        messages=request.conversation_history,
+    )
+
+
+async def _prepare_chat(
+    request: ChatRequest,
+    app_request: Request,
+) -> Tuple["OnboardingCrewManager", Optional[KickoffAdmission], Optional[ChatSession]]:
+    """Checks before streaming: crew manager, kickoff admission for crew requests (503 when full) and session (409 when unknown)."""
+    # Get crew manager from app state
+    try:
+        crew_manager: "OnboardingCrewManager" = app_request.app.state.crew_manager
+    except AttributeError:
+        logger.error("Crew manager not found in app state")
+        raise HTTPException(
+            status_code=500, 
+            detail="Crew manager not initialized. Please check backend logs for initialization errors."
+        )
+    
+    if not crew_manager and getattr(app_request.app.state, "crew_manager_status", None) == "initializing":
+        # Built in the background after startup; usually ready within seconds
+        raise HTTPException(
+            status_code=503,
+            detail="Chat backend is starting up. Please retry shortly.",
+            headers={"Retry-After": str(get_settings().KICKOFF_RETRY_AFTER_SECONDS)},
+        )
+    
+    if not crew_manager:
+        logger.error("Crew manager is None")
+        raise HTTPException(
+            status_code=500, 
+            detail="Crew manager is None. Please check backend logs for initialization errors."
         )
-        yield f"data: {json.dumps(error_chunk.model_dump())}\n\n"
+    
+    # Admit crew requests before streaming so an overloaded backend can
+    # still answer 503; direct answers never use a kickoff thread
+    admission = None
+    if crew_manager.choose_route(request.message, request.workflow_id) == ROUTE_CREW:
+        try:
+            admission = crew_manager.kickoff_executor.admit()
+        except ExecutorSaturatedError as e:
+            logger.warning("Chat request rejected, kickoff queue full", retry_after=e.retry_after)
+            raise HTTPException(
+                status_code=503,
+                detail="Chat backend is at capacity. Please retry shortly.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+    
+    try:
+        session = await _resolve_session(request)
+    except BaseException:
+        if admission is not None:
+            admission.release_if_unused()
+        raise
+    return crew_manager, admission, session
+
+
+async def _start_chat_trace() -> Any:
+    """Root span of a chat request; FastAPI solves it before validating the body."""
+    return get_tracer().start_span("chat.request", parent=None, attributes={"http.route": "/api/chat"})
 
 
 @router.post("/chat")
-async def chat_endpoint(request: ChatRequest, app_request: Request):
+async def chat_endpoint(
+    request: ChatRequest,
+    app_request: Request,
+    trace: Any = Depends(_start_chat_trace),
+):
     """
     Chat API endpoint - streams responses from CrewAI agents.
     
     Args:
         request: Chat request with message and context
         app_request: FastAPI request object for accessing app state
+        trace: Root tracing span (see utils/tracing.py)
         
     Returns:
         StreamingResponse with Server-Sent Events (SSE) format
@@ -101,35 +375,56 @@ async def chat_endpoint(request: ChatRequest, app_request: Request):
         workflow_id=request.workflow_id
     )
     
-    # Get crew manager from app state
     try:
-        crew_manager: OnboardingCrewManager = app_request.app.state.crew_manager
-    except AttributeError:
-        logger.error("Crew manager not found in app state")
-        raise HTTPException(
-            status_code=500, 
-            detail="Crew manager not initialized. Please check backend logs for initialization errors."
-        )
+        # Starts with the root span, so request model validation counts too
+        with get_tracer().span("chat.validate", parent=trace, start_ns=trace.start_ns):
+            crew_manager, admission, session = await _prepare_chat(request, app_request)
+    except HTTPException as e:
+        trace.set_attribute("http.status_code", e.status_code)
+        trace.end()
+        raise
     
-    if not crew_manager:
-        logger.error("Crew manager is None")
-        raise HTTPException(
-            status_code=500, 
-            detail="Crew manager is None. Please check backend logs for initialization errors."
-        )
+    background = BackgroundTasks()
+    if admission is not None:
+        background.add_task(admission.release_if_unused)
+    background.add_task(trace.end)
+    
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",  # Disable buffering for nginx
+    }
+    if session is not None:
+        headers["X-Session-Id"] = session.session_id
     
     # Return streaming response
     return StreamingResponse(
-        stream_chat_response(crew_manager, request),
+        stream_chat_response(crew_manager, request, admission, session, trace),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable buffering for nginx
-        }
+        headers=headers,
+        # Frees the slot (and closes the trace) even if the client went away
+        # before the body was streamed
+        background=background,
     )
 
 
+@router.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str):
+    """Return a chat session and its messages."""
+    session = await get_chat_session_store().aget(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return session.to_dict()
+
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """End a chat session and drop its history."""
+    if not await get_chat_session_store().adelete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"session_id": session_id, "deleted": True}
+
+
 @router.get("/chat/status")
 async def chat_status_endpoint(app_request: Request):
     """
@@ -138,9 +433,25 @@ async def chat_status_endpoint(app_request: Request):
     Returns:
         Dictionary with agent status information
     """
-    crew_manager: OnboardingCrewManager = app_request.app.state.crew_manager
+    crew_manager: "OnboardingCrewManager" = app_request.app.state.crew_manager
     
     if not crew_manager:
         raise HTTPException(status_code=500, detail="Crew manager not initialized")
     
-    return crew_manager.get_agent_status()
+    rate_limiter = get_rate_limiter()
+    # Both read the shared store, which may be a SQLite file
+    shared_state, rate_limits = await asyncio.to_thread(
+        lambda: (
+            get_shared_store().stats(),
+            rate_limiter.stats() if rate_limiter is not None else {"enabled": False},
+        )
+    )
+    return {
+        **crew_manager.get_agent_status(),
+        "sessions": get_chat_session_store().stats(),
+        # Per-worker view; counters above are this worker's
+        "worker_pid": os.getpid(),
+        "shared_state": shared_state,
+        "rate_limiter": rate_limits,
+        "resilience": get_exception_handler().stats(),
+    }
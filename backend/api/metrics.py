@@ -0,0 +1,81 @@
+"""
+Metrics Endpoint
+
+GET /metrics serves the in-process metrics (utils/metrics.py) in the
+Prometheus text format. MetricsMiddleware times every HTTP request; it is a
+plain ASGI middleware so streamed (SSE) bodies pass through untouched and
+are timed until their last chunk is sent. GET /traces returns recent request
+traces when tracing exports to memory (utils/tracing.py).
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+"""
+
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+
+from utils.metrics import HTTP_REQUEST_DURATION, REGISTRY
+from utils.tracing import InMemorySpanExporter, get_tracer
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Current metrics in the Prometheus text exposition format."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/traces", include_in_schema=False)
+async def traces(limit: int = Query(default=20, ge=1, le=500), min_ms: float = Query(default=0.0, ge=0)):
+    """Most recent traces, optionally only those slower than ``min_ms``."""
+    exporter = get_tracer().exporter
+    if not isinstance(exporter, InMemorySpanExporter):
+        raise HTTPException(status_code=404, detail="In-memory tracing is not enabled")
+    return {"traces": exporter.traces(limit=limit, min_ms=min_ms)}
+
+
+def _route_label(scope) -> str:
+    """Path with its parameters put back as placeholders, e.g. /api/chat/sessions/{session_id}."""
+    if scope.get("route") is None:
+        return "unmatched"
+    path = scope.get("path", "")
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
+
+class MetricsMiddleware:
+    """Record HTTP latency per method, route template and status code."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route templates, not raw paths, keep label cardinality bounded
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                _route_label(scope),
+                str(status),
+            )
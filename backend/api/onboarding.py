@@ -0,0 +1,117 @@
+"""
+Onboarding API Endpoints
+
+Batch initiation of onboarding workflows for a cohort, with per-employee
+progress streamed as Server-Sent Events.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+- SAD Section 3.2: Task Orchestration Specification
+"""
+
+import json
+from typing import Any, AsyncGenerator, Dict, List
+
+import structlog
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from api.stub_endpoints import OnboardingRequest
+from services.onboarding_batch import OnboardingBatchRunner
+from utils.config import get_settings
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+class OnboardingBatchRequest(BaseModel):
+    """Batch onboarding request for a cohort sharing a start date."""
+    employees: List[OnboardingRequest] = Field(..., min_length=1, description="Employees to onboard")
+
+
+def _get_batch_runner(app_request: Request) -> OnboardingBatchRunner:
+    runner = getattr(app_request.app.state, "batch_runner", None)
+    if runner is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Onboarding batch runner not initialized. Please check backend logs.",
+        )
+    return runner
+
+
+async def _get_batch_summary(runner: OnboardingBatchRunner, batch_id: str) -> Dict[str, Any]:
+    summary = await runner.summary(batch_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' not found")
+    return summary
+
+
+async def stream_batch_events(runner: OnboardingBatchRunner, batch_id: str) -> AsyncGenerator[str, None]:
+    """Yield the batch's progress events as SSE frames until it finishes."""
+    async for event in runner.follow(batch_id):
+        yield f"data: {json.dumps(event)}\n\n"
+
+
+def _event_stream_response(runner: OnboardingBatchRunner, batch_id: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_batch_events(runner, batch_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable buffering for nginx
+            "X-Batch-Id": batch_id,
+        },
+    )
+
+
+@router.post("/onboarding/batch", status_code=202)
+async def initiate_onboarding_batch(
+    request: OnboardingBatchRequest,
+    app_request: Request,
+    stream: bool = False,
+):
+    """
+    Initiate onboarding for a cohort in one call.
+
+    All workflow records are created in a single transaction, then the
+    workflows run on the DAG orchestrator with bounded concurrency.
+
+    Args:
+        request: Employees to onboard
+        app_request: FastAPI request object for accessing app state
+        stream: Stream progress events (SSE) instead of returning immediately
+
+    Returns:
+        Batch id and workflow ids, or an SSE stream of per-employee progress
+    """
+    settings = get_settings()
+    if len(request.employees) > settings.ONBOARDING_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds ONBOARDING_BATCH_MAX_SIZE ({settings.ONBOARDING_BATCH_MAX_SIZE})",
+        )
+    runner = _get_batch_runner(app_request)
+    logger.info("Batch onboarding endpoint called", size=len(request.employees))
+    batch = await runner.start([employee.model_dump() for employee in request.employees])
+    if stream:
+        return _event_stream_response(runner, batch.batch_id)
+    return {
+        **batch.summary(),
+        "events": f"/api/onboarding/batch/{batch.batch_id}/events",
+    }
+
+
+@router.get("/onboarding/batch/{batch_id}")
+async def get_onboarding_batch(batch_id: str, app_request: Request):
+    """Get batch progress counters and workflow ids (batches run by any worker)."""
+    return await _get_batch_summary(_get_batch_runner(app_request), batch_id)
+
+
+@router.get("/onboarding/batch/{batch_id}/events")
+async def get_onboarding_batch_events(batch_id: str, app_request: Request):
+    """Stream batch progress as SSE, replaying events that already happened."""
+    runner = _get_batch_runner(app_request)
+    await _get_batch_summary(runner, batch_id)
+    return _event_stream_response(runner, batch_id)
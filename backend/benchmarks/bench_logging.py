@@ -0,0 +1,141 @@
+"""
+Logging Pipeline Benchmark
+
+Measures what logging costs a request: the previous setup (structlog
+rendering JSON with the stdlib json module and writing synchronously on the
+calling thread) against utils/logging_config.py (event dicts queued, rendering
+and writing on a background thread, orjson).
+
+Each simulated request runs on one event loop, emits the log lines a chat
+request emits (endpoint, processing, tool calls, LLM response) and awaits a
+short simulated LLM call. Requests arrive open-loop at a fixed rate, so time
+spent logging on the loop shows up as queueing delay in every later request.
+
+Run from backend/:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --rate 1000 --seconds 5 --logs 8
+
+Reports p50/p95/p99/max request latency per pipeline and the hot-path cost
+of one logger.info call.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog  # noqa: E402
+
+from utils.logging_config import configure_logging, shutdown_logging  # noqa: E402
+
+
+def configure_previous(stream) -> None:
+    """The configuration main.py used before: render and write on the caller."""
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.StreamHandler(stream))
+    root.setLevel(logging.INFO)
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def configure_async(stream) -> None:
+    configure_logging(level="INFO", async_logging=True, queue_size=100000, stream=stream)
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _request(logger, i: int, logs: int, llm_ms: float, latencies: list, arrival: float) -> None:
+    logger.info("Chat endpoint called", message_length=42, employee_id=f"E{i}", workflow_id=None)
+    logger.info("Processing chat message", message_length=42, employee_id=f"E{i}", workflow_id=None)
+    for n in range(max(0, logs - 3)):
+        logger.info("Task scheduler called", task_id=f"task-{i}-{n}", task_type="it_provisioning")
+    await asyncio.sleep(llm_ms / 1000)
+    logger.info(
+        "LLM response received",
+        raw_length=812,
+        streamed=True,
+        preview="Welcome aboard! Your laptop will be ready on your first day and IT will...",
+    )
+    latencies.append(time.perf_counter() - arrival)
+
+
+async def _run_load(rate: int, seconds: float, logs: int, llm_ms: float) -> list:
+    logger = structlog.get_logger("bench")
+    latencies: list = []
+    tasks = []
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        arrival = start + i * interval
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_request(logger, i, logs, llm_ms, latencies, arrival)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def _hot_path_us(calls: int = 20000) -> float:
+    logger = structlog.get_logger("bench")
+    started = time.perf_counter()
+    for i in range(calls):
+        logger.info("Task scheduler called", task_id=f"task-{i}", task_type="it_provisioning")
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Request latency impact of the logging pipeline")
+    parser.add_argument("--rate", type=int, default=1000, help="requests per second")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--logs", type=int, default=6, help="log lines per request")
+    parser.add_argument("--llm-ms", type=float, default=20.0, help="simulated LLM latency")
+    args = parser.parse_args()
+
+    print(
+        f"{args.rate} req/s for {args.seconds:.0f}s, {args.logs} log lines per request, "
+        f"{args.llm_ms:.0f} ms simulated LLM call\n"
+    )
+    print(f"{'pipeline':<22} {'log call µs':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, configure in (("sync json (previous)", configure_previous), ("async queue + orjson", configure_async)):
+            with open(os.path.join(tmp, f"{name.split()[0]}.log"), "w") as stream:
+                configure(stream)
+                hot_us = _hot_path_us()
+                latencies = sorted(asyncio.run(_run_load(args.rate, args.seconds, args.logs, args.llm_ms)))
+                shutdown_logging()
+            ms = [v * 1000 for v in latencies]
+            print(
+                f"{name:<22} {hot_us:>11.2f} {_percentile(ms, 0.5):>9.2f} {_percentile(ms, 0.95):>9.2f} "
+                f"{_percentile(ms, 0.99):>9.2f} {ms[-1]:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
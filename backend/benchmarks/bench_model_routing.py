@@ -0,0 +1,178 @@
+"""
+Model Routing Benchmark
+
+Answers a mix of onboarding chat messages (short FAQs plus comparison,
+multi-step and troubleshooting questions) through
+OnboardingCrewManager.process_chat_message against the mock LLM server
+(benchmarks/mock_llm_server.py), which is started with a fast small model
+and a slower large one. Two modes:
+
+- single: MODEL_ROUTING_ENABLED off, every answer uses the complex tier
+- routed: messages classified as simple go to the simple tier
+
+Reports the share of answers per tier, p50/p95 answer latency and the
+estimated cost per request from the --simple-price / --complex-price
+arguments (illustrative input:output USD per million tokens, not provider
+quotes). The
+response cache and single-flight are off so every message reaches the LLM.
+
+Run from backend/:
+    python benchmarks/bench_model_routing.py
+    python benchmarks/bench_model_routing.py --requests 400 --concurrency 16 --simple-ms 150 --complex-ms 600
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SIMPLE_MODEL = "mock/small"
+COMPLEX_MODEL = "mock/large"
+
+MESSAGES = [
+    "What documents do I need for my first day?",
+    "When is orientation?",
+    "Where do I pick up my laptop?",
+    "Who is my onboarding buddy?",
+    "What time should I arrive on Monday?",
+    "How do I set up direct deposit?",
+    "Is there a dress code?",
+    "How do I get VPN access?",
+    "Which training modules are required?",
+    "Where can I find the employee handbook?",
+    "Can you compare the two health plans and explain which is better for a family of four?",
+    "Walk me through everything I have to do in my first week, step by step.",
+    "My badge is not working and IT says HR has to fix it first. What should I do?",
+    "Why do I need to finish security training before I get repository access?",
+    "What happens if my I-9 documents arrive late, and does that delay payroll and equipment?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_mock(port: int) -> None:
+    for _ in range(100):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5) as response:
+                json.loads(response.read())
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("mock LLM server did not start")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_mode(manager, mode: str, requests: int, concurrency: int) -> Dict[str, float]:
+    from services.model_router import TIER_SIMPLE, ModelRouter
+
+    base = manager.model_router
+    manager.model_router = ModelRouter(base.tiers, base.classifier, enabled=mode == "routed")
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            async for _chunk in manager.process_chat_message(MESSAGES[i % len(MESSAGES)]):
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    tiers = manager.model_router.stats()["tiers"]
+    total_cost = sum(t["cost_usd"] for t in tiers.values())
+    return {
+        "simple_share": tiers[TIER_SIMPLE]["requests"] / requests,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "cost_per_request": total_cost / requests,
+    }
+
+
+async def run_modes(manager, modes: List[str], requests: int, concurrency: int) -> None:
+    # One event loop for all modes: the shared async LLM client is bound to it
+    for mode in modes:
+        r = await run_mode(manager, mode, requests, concurrency)
+        print(
+            f"{mode:<8} {r['simple_share']:>8.0%} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+            f"{r['cost_per_request'] * 1e6:>9.2f} µ$"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Single model vs routed simple/complex tiers")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--simple-ms", type=float, default=150.0, help="small model time to first token")
+    parser.add_argument("--simple-tps", type=float, default=400.0, help="small model tokens per second")
+    parser.add_argument("--complex-ms", type=float, default=500.0, help="large model time to first token")
+    parser.add_argument("--complex-tps", type=float, default=100.0, help="large model tokens per second")
+    parser.add_argument("--simple-price", default="0.15:0.60", help="small model USD per 1M input:output tokens")
+    parser.add_argument("--complex-price", default="2.50:10.00", help="large model USD per 1M input:output tokens")
+    parser.add_argument("--modes", default="single,routed")
+    args = parser.parse_args()
+
+    port = _free_port()
+    mock = subprocess.Popen(
+        [
+            sys.executable, "benchmarks/mock_llm_server.py",
+            "--port", str(port),
+            "--reply-tokens", "40",
+            "--model-speed", f"{SIMPLE_MODEL}={args.simple_ms}:{args.simple_tps}",
+            "--model-speed", f"{COMPLEX_MODEL}={args.complex_ms}:{args.complex_tps}",
+            "--seed", "7",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "mock",
+        "MODEL_SIMPLE": SIMPLE_MODEL,
+        "MODEL_COMPLEX": COMPLEX_MODEL,
+        "MODEL_ROUTING_ENABLED": "true",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "CHAT_SINGLE_FLIGHT_ENABLED": "false",
+        "LLM_RATE_LIMIT_RPM": "60000",
+    })
+    try:
+        _wait_for_mock(port)
+        from services.crew_manager import OnboardingCrewManager
+        from services.model_router import TIER_SIMPLE
+
+        manager = OnboardingCrewManager()
+        for tier, price in ((manager.model_router.tiers[TIER_SIMPLE], args.simple_price),
+                            (manager.model_router.complex, args.complex_price)):
+            tier.input_cost_per_mtok, tier.output_cost_per_mtok = (float(p) for p in price.split(":"))
+        print(
+            f"{args.requests} chat messages, concurrency {args.concurrency}; mock: "
+            f"small {args.simple_ms:.0f} ms + {args.simple_tps:.0f} tok/s, "
+            f"large {args.complex_ms:.0f} ms + {args.complex_tps:.0f} tok/s\n"
+        )
+        print(f"{'mode':<8} {'simple':>8} {'p50':>8} {'p95':>8} {'cost/req':>12}")
+        asyncio.run(run_modes(manager, args.modes.split(","), args.requests, args.concurrency))
+        manager.shutdown()
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
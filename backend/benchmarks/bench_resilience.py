@@ -0,0 +1,165 @@
+"""
+LLM Resilience Benchmark
+
+Sends streamed chat-completion requests to the mock LLM server
+(benchmarks/mock_llm_server.py), started with a failure rate and a slow
+tail, through three transports:
+
+- none: plain httpx transport (a failed call is a failed request)
+- retry: services/resilience.py retries and circuit breaker
+- hedge: retries plus hedged requests after the observed p95
+
+Reports success rate, p50/p95/p99/max time to first bytes, and how many
+upstream requests each mode spent per successful call (the cost of retries
+and hedges against the rate budget).
+
+Run from backend/:
+    python benchmarks/bench_resilience.py
+    python benchmarks/bench_resilience.py --requests 500 --concurrency 16 --error-rate 0.05 --slow-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from services.resilience import AsyncResilientTransport, ExceptionHandler, RetryPolicy  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _mock_requests(port: int) -> int:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5) as response:
+        return json.loads(response.read())["requests"]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _transport(mode: str) -> httpx.AsyncBaseTransport:
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=200))
+    if mode == "none":
+        return transport
+    handler = ExceptionHandler(
+        policy=RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=2.0),
+        failure_threshold=50,
+        hedge_enabled=mode == "hedge",
+        hedge_min_samples=20,
+        hedge_max_ratio=0.1,
+    )
+    return AsyncResilientTransport(transport, handler)
+
+
+async def run_mode(mode: str, port: int, requests: int, concurrency: int) -> Dict[str, float]:
+    body = {"model": "mock-model", "stream": True, "messages": [{"role": "user", "content": "When is orientation?"}]}
+    latencies: List[float] = []
+    failures = 0
+    remaining = iter(range(requests))
+    upstream_before = _mock_requests(port)
+
+    async with httpx.AsyncClient(transport=_transport(mode), timeout=30) as client:
+        async def worker() -> None:
+            nonlocal failures
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    async with client.stream("POST", f"http://127.0.0.1:{port}/v1/chat/completions", json=body) as r:
+                        if r.status_code != 200:
+                            failures += 1
+                            continue
+                        first = None
+                        async for _chunk in r.aiter_bytes():
+                            if first is None:
+                                first = time.perf_counter() - started
+                        latencies.append(first or 0.0)
+                except httpx.HTTPError:
+                    failures += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    upstream = _mock_requests(port) - upstream_before
+    ok = len(latencies)
+    return {
+        "ok": ok,
+        "success_rate": ok / requests,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "upstream_per_success": upstream / ok if ok else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Retries and hedging against a flaky mock LLM")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.03)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--modes", default="none,retry,hedge")
+    args = parser.parse_args()
+
+    port = _free_port()
+    mock = subprocess.Popen(
+        [
+            sys.executable, "benchmarks/mock_llm_server.py",
+            "--port", str(port),
+            "--latency-ms", str(args.latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+            "--tokens-per-second", "200",
+            "--reply-tokens", "20",
+            "--error-rate", str(args.error_rate),
+            "--slow-rate", str(args.slow_rate),
+            "--slow-ms", str(args.slow_ms),
+            "--seed", "11",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        for _ in range(100):
+            try:
+                _mock_requests(port)
+                break
+            except OSError:
+                time.sleep(0.1)
+        print(
+            f"{args.requests} streamed requests, concurrency {args.concurrency}; mock: "
+            f"{args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, {args.error_rate:.0%} errors, "
+            f"{args.slow_rate:.0%} +{args.slow_ms:.0f} ms\n"
+        )
+        print(f"{'mode':<8} {'success':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'upstream/ok':>12}")
+        for mode in args.modes.split(","):
+            r = asyncio.run(run_mode(mode, port, args.requests, args.concurrency))
+            print(
+                f"{mode:<8} {r['success_rate']:>8.1%} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+                f"{r['p99_ms']:>8.0f} {r['max_ms']:>8.0f} {r['upstream_per_success']:>12.3f}"
+            )
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
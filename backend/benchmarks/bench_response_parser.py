@@ -0,0 +1,125 @@
+"""
+Response Parser Benchmark
+
+Compares the previous extraction pipeline (fence strip + char-by-char brace
+matching + json.loads, several passes and copies) with
+utils/response_parser.py on large, messy LLM outputs: long ReAct traces,
+fenced JSON with braces inside strings, and plain prose.
+
+Run from backend/:
+    python benchmarks/bench_response_parser.py
+    python benchmarks/bench_response_parser.py --size 200000 --repeat 20
+
+Reports µs per call for each input and implementation, and the cost of
+streaming the same text through JSONMessageStream in 4-character tokens.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_parser import JSONMessageStream, extract_plain_message  # noqa: E402
+
+
+# --- previous implementation, kept verbatim for comparison -----------------
+
+def _legacy_strip_markdown_code_blocks(s: str) -> str:
+    t = s.strip()
+    for marker in ("```json", "```JSON", "```"):
+        i = t.find(marker)
+        if i >= 0:
+            start = i + len(marker)
+            t = t[start:].lstrip("\n\r")
+            j = t.find("```")
+            if j >= 0:
+                t = t[:j].rstrip()
+            break
+    return t.strip()
+
+
+def _legacy_extract_json_object(s: str) -> Optional[str]:
+    start = s.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    for i in range(start, len(s)):
+        if s[i] == "{":
+            depth += 1
+        elif s[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start : i + 1]
+    return None
+
+
+def legacy_extract(raw: str) -> str:
+    t = _legacy_strip_markdown_code_blocks(raw)
+    candidate = _legacy_extract_json_object(t) or (t if (t.startswith("{") or t.startswith("[")) else None)
+    if not candidate:
+        return raw
+    try:
+        data = json.loads(candidate)
+        if data and isinstance(data, dict):
+            for key in ("message", "content", "text", "response", "output"):
+                v = data.get(key)
+                if isinstance(v, str):
+                    return v
+    except Exception:
+        pass
+    return raw
+
+
+# ---------------------------------------------------------------------------
+
+def build_inputs(size: int) -> dict:
+    prose = (
+        "Thought: the employee asked about documents. I should list the I-9, "
+        "W-4 and direct deposit form and explain where to upload them. "
+    )
+    message = ("Bring your I-9 documents {passport or licence} and a \"void\" cheque. " * (size // 70))[:size]
+    payload = json.dumps({"message": message, "meta": {"sources": ["hr}", "{it"], "score": 0.9}}, indent=2)
+    return {
+        "react trace + fenced json": (prose * (size // len(prose))) + "\nFinal Answer: ```json\n" + payload + "\n```",
+        "bare json": payload,
+        "plain prose": prose * (size // len(prose)),
+    }
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6
+
+
+def stream_extract(text: str) -> str:
+    parser = JSONMessageStream()
+    return "".join(parser.feed(text[i:i + 4]) for i in range(0, len(text), 4))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000, help="Approximate characters per input")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'input':28s} {'chars':>8s} {'legacy µs':>11s} {'new µs':>9s} {'speedup':>8s} {'stream µs':>10s}")
+    for name, text in build_inputs(args.size).items():
+        legacy_us = timed(legacy_extract, text, args.repeat)
+        new_us = timed(extract_plain_message, text, args.repeat)
+        stream_us = timed(stream_extract, text, max(1, args.repeat // 5))
+        print(
+            f"{name:28s} {len(text):>8d} {legacy_us:>11.0f} {new_us:>9.0f} "
+            f"{legacy_us / new_us:>7.1f}x {stream_us:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+SSE Framing Benchmark
+
+Compares the old per-character SSE framing (pydantic model + json.dumps per
+character, 20 ms pacing) with the coalesced framing in api/chat.py.
+
+Run from backend/:
+    python benchmarks/bench_sse_framing.py
+    python benchmarks/bench_sse_framing.py --chars 1500 --token-interval-ms 15
+
+Reports frames, bytes on the wire, wall time and frames/sec for both modes.
+The old mode's 20 ms pacing is added analytically unless --real-pacing is set.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.chat import ChatResponseChunk, _format_chunk_frame, coalesce_chunks  # noqa: E402
+
+SAMPLE = (
+    "For your first day you will need your I-9 identity documents, a completed W-4, "
+    "and the direct deposit form. Upload them through the onboarding portal before "
+    "Monday so HR can verify them. IT access is requested automatically once the "
+    "documents are verified; you will receive your laptop and credentials by email. "
+)
+
+OLD_PACING_SECONDS = 0.02
+
+
+def make_text(chars: int) -> str:
+    return (SAMPLE * (chars // len(SAMPLE) + 1))[:chars]
+
+
+async def token_source(text: str, token_chars: int, interval: float):
+    """Yield the text in token-sized pieces, optionally paced like an LLM."""
+    for i in range(0, len(text), token_chars):
+        if interval > 0:
+            await asyncio.sleep(interval)
+        yield text[i:i + token_chars]
+
+
+async def run_old(text: str, real_pacing: bool) -> dict:
+    frames = 0
+    wire = 0
+    start = time.perf_counter()
+    for char in text:
+        frame = f"data: {json.dumps(ChatResponseChunk(chunk=char).model_dump())}\n\n"
+        frames += 1
+        wire += len(frame.encode("utf-8"))
+        if real_pacing:
+            await asyncio.sleep(OLD_PACING_SECONDS)
+    elapsed = time.perf_counter() - start
+    if not real_pacing:
+        elapsed += len(text) * OLD_PACING_SECONDS
+    return {"frames": frames, "bytes": wire, "wall_seconds": elapsed}
+
+
+async def run_new(text: str, args) -> dict:
+    frames = 0
+    wire = 0
+    start = time.perf_counter()
+    source = token_source(text, args.token_chars, args.token_interval_ms / 1000)
+    async for chunk in coalesce_chunks(source, args.flush_bytes, args.flush_interval_ms / 1000):
+        frame = _format_chunk_frame(chunk)
+        frames += 1
+        wire += len(frame.encode("utf-8"))
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "bytes": wire, "wall_seconds": elapsed}
+
+
+def report(name: str, result: dict) -> None:
+    wall = result["wall_seconds"]
+    fps = result["frames"] / wall if wall > 0 else float("inf")
+    print(
+        f"{name:<10} frames={result['frames']:>6}  bytes={result['bytes']:>8}  "
+        f"wall={wall:8.3f}s  frames/sec={fps:10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=1500, help="Response length in characters")
+    parser.add_argument("--token-chars", type=int, default=4, help="Characters per simulated LLM token")
+    parser.add_argument("--token-interval-ms", type=float, default=0.0, help="Delay between simulated tokens")
+    parser.add_argument("--flush-bytes", type=int, default=48)
+    parser.add_argument("--flush-interval-ms", type=float, default=40.0)
+    parser.add_argument("--real-pacing", action="store_true", help="Actually sleep 20 ms per char in old mode")
+    args = parser.parse_args()
+
+    text = make_text(args.chars)
+    old = asyncio.run(run_old(text, args.real_pacing))
+    new = asyncio.run(run_new(text, args))
+
+    print(f"Response: {len(text)} chars, token={args.token_chars} chars every {args.token_interval_ms} ms")
+    print(f"Policy:   flush at {args.flush_bytes} bytes or {args.flush_interval_ms} ms")
+    print("-" * 78)
+    report("before", old)
+    report("after", new)
+    print("-" * 78)
+    print(f"Frames reduced {old['frames'] / max(new['frames'], 1):.1f}x, "
+          f"bytes on the wire reduced {old['bytes'] / max(new['bytes'], 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
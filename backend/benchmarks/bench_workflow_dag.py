@@ -0,0 +1,46 @@
+"""
+Workflow DAG Benchmark
+
+Runs FullWorkflowOrchestrator over config/tasks.yaml with a simulated task
+runner (each task sleeps for a configurable time instead of calling the
+LLM) and compares wall time with the sequential sum of task times.
+
+Run from backend/:
+    python benchmarks/bench_workflow_dag.py --task-seconds 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.workflow_orchestrator import FullWorkflowOrchestrator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--task-seconds", type=float, default=0.5, help="Simulated duration of every task")
+    args = parser.parse_args()
+
+    def simulated_runner(task_config, agent_config, context):
+        time.sleep(args.task_seconds)
+        return f"{task_config['id']} done"
+
+    orchestrator = FullWorkflowOrchestrator(task_runner=simulated_runner)
+    report = asyncio.run(orchestrator.run({"employee_id": "EMP-BENCH", "role": "Engineer"}))
+    orchestrator.shutdown()
+
+    print(f"Execution levels: {orchestrator.levels}")
+    print(json.dumps(report["tasks"], indent=2))
+    print("-" * 60)
+    print(f"Sequential sum of tasks: {report['task_time_ms']:8.1f} ms")
+    print(f"Critical path:           {report['critical_path_ms']:8.1f} ms  {report['critical_path']}")
+    print(f"Wall time:               {report['wall_time_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
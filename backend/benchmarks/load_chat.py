@@ -0,0 +1,506 @@
+"""
+Chat Load Test
+
+Drives POST /api/chat (SSE) at a fixed concurrency and reports per request
+time to first chunk (first "responding" frame), total latency, throughput,
+error rate and the resident memory of each server worker. Results are
+written as JSON so runs can be compared across commits.
+
+With --spawn (the default when no --url is given) it starts the mock LLM
+server (benchmarks/mock_llm_server.py) and `uvicorn main:app` pointed at it,
+waits for /health/ready, runs the load and shuts both down; no API key or
+network access is needed. Their output goes to benchmarks/results/logs/, and
+the run stops with the log tail if either exits before the load is done.
+With --url it drives an already running backend; pass --server-pid to also
+sample that server's memory.
+
+Run from backend/:
+    python benchmarks/load_chat.py --concurrency 32 --requests 500
+    python benchmarks/load_chat.py --workers 2 --mock-latency-ms 400 --mock-error-rate 0.02
+    python benchmarks/load_chat.py --url http://127.0.0.1:8000 --duration 30 --server-pid 1234
+    python benchmarks/load_chat.py --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Plain questions take the direct LLM path; action requests run the crew
+_QUESTIONS = [
+    "What should I bring on my first day? (#{i})",
+    "When will my laptop be ready? (#{i})",
+    "How do I enroll in benefits? (#{i})",
+    "Who do I contact about payroll setup? (#{i})",
+]
+_CREW_REQUESTS = [
+    "Please start onboarding for employee E{i} in engineering",
+    "Schedule IT provisioning for employee E{i}",
+]
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50": round(_percentile(values, 0.50), 2),
+        "p95": round(_percentile(values, 0.95), 2),
+        "p99": round(_percentile(values, 0.99), 2),
+        "max": round(values[-1], 2) if values else 0.0,
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+    }
+
+
+def _message(i: int, crew_fraction: float, unique: bool) -> str:
+    # Deterministic mix, so repeated runs send the same requests
+    n = i if unique else 0
+    if crew_fraction > 0 and (i % 100) < crew_fraction * 100:
+        return _CREW_REQUESTS[i % len(_CREW_REQUESTS)].format(i=n)
+    return _QUESTIONS[i % len(_QUESTIONS)].format(i=n)
+
+
+# Memory sampling
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _worker_pids(server_pid: int) -> List[int]:
+    """uvicorn --workers N runs the app in child processes; otherwise in the server itself."""
+    workers = [p for p in _children(server_pid) if _rss_mb(p) is not None and _rss_mb(p) > 30]
+    return workers or [server_pid]
+
+
+class RSSSampler:
+    """Samples resident memory of the server's worker processes in a thread."""
+
+    def __init__(self, server_pid: Optional[int], interval: float = 0.5):
+        self.server_pid = server_pid
+        self.interval = interval
+        self.samples: Dict[int, List[float]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "RSSSampler":
+        if self.server_pid is not None:
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for pid in _worker_pids(self.server_pid):
+                rss = _rss_mb(pid)
+                if rss is not None:
+                    self.samples.setdefault(pid, []).append(rss)
+            self._stop.wait(self.interval)
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if not self.samples:
+            return {}
+        return {
+            "workers": len(self.samples),
+            "per_worker": [
+                {"pid": pid, "start_mb": round(v[0], 1), "peak_mb": round(max(v), 1), "end_mb": round(v[-1], 1)}
+                for pid, v in sorted(self.samples.items())
+            ],
+            "peak_mb_per_worker": round(max(max(v) for v in self.samples.values()), 1),
+            "total_end_mb": round(sum(v[-1] for v in self.samples.values()), 1),
+        }
+
+
+# Load
+
+async def _one(client: httpx.AsyncClient, url: str, message: str, timeout: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"ok": False, "ttfc_ms": None, "total_ms": None, "bytes": 0, "status": None}
+    try:
+        async with client.stream("POST", url, json={"message": message}, timeout=timeout) as response:
+            result["status"] = response.status_code
+            if response.status_code != 200:
+                await response.aread()
+                result["error"] = f"HTTP {response.status_code}"
+                return result
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                result["bytes"] += len(line)
+                frame = json.loads(line[6:])
+                status = frame.get("status")
+                if status == "responding" and result["ttfc_ms"] is None:
+                    result["ttfc_ms"] = (time.perf_counter() - started) * 1000
+                elif status == "error":
+                    result["error"] = frame.get("chunk", "error frame")[:200]
+                elif status == "complete":
+                    result["ok"] = result["ttfc_ms"] is not None
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"[:200]
+    finally:
+        result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+async def run_load(
+    base_url: str,
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+    crew_fraction: float,
+    unique: bool,
+    timeout: float,
+    servers: Optional[List["SpawnedServer"]] = None,
+) -> Dict[str, Any]:
+    """
+    Closed loop: ``concurrency`` clients each send the next request when theirs completes.
+
+    With ``servers``, the run is aborted as soon as one of them exits.
+    """
+    url = base_url.rstrip("/") + "/api/chat"
+    results: List[Dict[str, Any]] = []
+    counter = iter(range(sys.maxsize))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def client_loop() -> None:
+            while True:
+                i = next(counter)
+                if requests is not None and i >= requests:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                results.append(await _one(client, url, _message(i, crew_fraction, unique), timeout))
+
+        clients = asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        if servers:
+            watchdog = asyncio.ensure_future(_watch(servers))
+            await asyncio.wait({clients, watchdog}, return_when=asyncio.FIRST_COMPLETED)
+            if watchdog.done():
+                clients.cancel()
+                await asyncio.gather(clients, return_exceptions=True)
+                watchdog.result()
+            watchdog.cancel()
+        await clients
+    elapsed = time.perf_counter() - started
+
+    ok = [r for r in results if r["ok"]]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            key = r.get("error") or f"HTTP {r['status']}"
+            errors[key[:80]] = errors.get(key[:80], 0) + 1
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "errors": dict(sorted(errors.items(), key=lambda kv: -kv[1])[:10]),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "ttfc_ms": _summary([r["ttfc_ms"] for r in ok]),
+        "total_ms": _summary([r["total_ms"] for r in ok]),
+        "bytes_per_response": round(sum(r["bytes"] for r in ok) / len(ok), 1) if ok else 0.0,
+    }
+
+
+# Spawned servers
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerExited(RuntimeError):
+    """A spawned server exited before the load test finished."""
+
+
+class SpawnedServer:
+    """A server process started for the run, with its output in a log file."""
+
+    def __init__(self, name: str, cmd: List[str], log_path: str, env: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.log_path = log_path
+        with open(log_path, "wb") as log:
+            self.process = subprocess.Popen(
+                cmd, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def check(self) -> None:
+        """Raise ServerExited, with the end of the log, if the server is gone."""
+        if self.process.poll() is None:
+            return
+        try:
+            with open(self.log_path, errors="replace") as f:
+                tail = "".join(f.readlines()[-20:])
+        except OSError:
+            tail = ""
+        code = self.process.returncode
+        if code < 0:
+            code = f"{code} ({signal.Signals(-code).name})"
+        raise ServerExited(f"{self.name} exited with {code}; last lines of {self.log_path}:\n{tail}")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+async def _watch(servers: List[SpawnedServer], interval: float = 0.5) -> None:
+    while True:
+        for server in servers:
+            server.check()
+        await asyncio.sleep(interval)
+
+
+def _wait_for(url: str, timeout: float, server: SpawnedServer) -> None:
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        server.check()
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit(f"{url} not ready after {timeout:.0f}s; see {server.log_path}")
+
+
+def spawn_servers(args: argparse.Namespace) -> tuple:
+    """Start the mock LLM and the backend; returns (base_url, backend, mock)."""
+    mock_port, app_port = _free_port(), _free_port()
+    log_dir = os.path.join(RESULTS_DIR, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    mock = SpawnedServer(
+        "mock LLM server",
+        [
+            sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "mock_llm_server.py"),
+            "--port", str(mock_port),
+            "--latency-ms", str(args.mock_latency_ms),
+            "--jitter-ms", str(args.mock_jitter_ms),
+            "--tokens-per-second", str(args.mock_tokens_per_second),
+            "--reply-tokens", str(args.mock_reply_tokens),
+            "--error-rate", str(args.mock_error_rate),
+            "--seed", "7",
+        ],
+        os.path.join(log_dir, f"{stamp}-mock.log"),
+    )
+    try:
+        _wait_for(f"http://127.0.0.1:{mock_port}/v1/models", 30, mock)
+    except BaseException:
+        mock.stop()
+        raise
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{mock_port}/v1",
+        "OPENAI_API_KEY": "mock",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+        # uvicorn --workers does not set it; the shared state backend follows it
+        "WORKERS": str(args.workers),
+        # The mock has no provider budget; set LLM_RATE_LIMIT_RPM to load-test the limiter
+        "LLM_RATE_LIMIT_RPM": env.get("LLM_RATE_LIMIT_RPM", "60000"),
+    })
+    backend = SpawnedServer(
+        "backend",
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(app_port),
+            "--workers", str(args.workers),
+            "--log-level", "warning",
+        ],
+        os.path.join(log_dir, f"{stamp}-backend.log"),
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{app_port}"
+    try:
+        _wait_for(f"{base_url}/health/ready", args.startup_timeout, backend)
+    except BaseException:
+        backend.stop()
+        mock.stop()
+        raise
+    print(f"backend log: {backend.log_path}\nmock log:    {mock.log_path}")
+    return base_url, backend, mock
+
+
+# Results
+
+def _git_revision() -> Dict[str, Any]:
+    def git(*cmd: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *cmd], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip()
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    load = result["load"]
+    print(
+        f"\n{load['requests']} requests, concurrency {result['config']['concurrency']}, "
+        f"{load['elapsed_s']:.1f}s, {load['throughput_rps']:.1f} req/s, error rate {load['error_rate']:.2%}"
+    )
+    print(f"{'':<16} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name in ("ttfc_ms", "total_ms"):
+        s = load[name]
+        print(f"{name:<16} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}")
+    for error, count in load["errors"].items():
+        print(f"  {count:>5} x {error}")
+    rss = result.get("rss")
+    if rss:
+        for worker in rss["per_worker"]:
+            print(
+                f"worker {worker['pid']}: RSS {worker['start_mb']:.0f} MB -> peak {worker['peak_mb']:.0f} MB, "
+                f"end {worker['end_mb']:.0f} MB"
+            )
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Side-by-side of two result files; positive deltas in latency are regressions."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    rows = [("throughput_rps", old["load"]["throughput_rps"], new["load"]["throughput_rps"])]
+    rows.append(("error_rate", old["load"]["error_rate"], new["load"]["error_rate"]))
+    for name in ("ttfc_ms", "total_ms"):
+        for q in ("p50", "p95", "p99"):
+            rows.append((f"{name} {q}", old["load"][name][q], new["load"][name][q]))
+    if old.get("rss") and new.get("rss"):
+        rows.append(("peak RSS MB/worker", old["rss"]["peak_mb_per_worker"], new["rss"]["peak_mb_per_worker"]))
+    print(f"{'':<22} {old['git']['commit'][:10]:>12} {new['git']['commit'][:10]:>12} {'change':>9}")
+    for name, a, b in rows:
+        change = f"{(b - a) / a:+.1%}" if a else "n/a"
+        print(f"{name:<22} {a:>12} {b:>12} {change:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test for /api/chat (SSE)")
+    parser.add_argument("--url", help="backend to drive; default: spawn mock LLM + backend")
+    parser.add_argument("--server-pid", type=int, help="with --url: sample this server's RSS")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=None, help="total requests (default 200)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds instead")
+    parser.add_argument("--crew-fraction", type=float, default=0.0, help="share of requests routed to the crew")
+    parser.add_argument("--repeat", action="store_true", help="send identical messages (cache / coalescing)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--warmup-requests", type=int, default=5, help="untimed requests before the run")
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mock-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--mock-tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--mock-reply-tokens", type=int, default=60)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--out", default=None, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    servers: List[SpawnedServer] = []
+    server_pid = args.server_pid
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            base_url, backend, mock = spawn_servers(args)
+            servers = [backend, mock]
+            server_pid = backend.pid
+        if args.warmup_requests:
+            asyncio.run(run_load(
+                base_url, min(args.concurrency, args.warmup_requests), args.warmup_requests, None,
+                args.crew_fraction, True, args.timeout, servers,
+            ))
+        sampler = RSSSampler(server_pid).start()
+        load = asyncio.run(run_load(
+            base_url, args.concurrency, args.requests, args.duration,
+            args.crew_fraction, not args.repeat, args.timeout, servers,
+        ))
+        rss = sampler.stop()
+        for server in servers:
+            server.check()
+    except ServerExited as e:
+        raise SystemExit(str(e))
+    finally:
+        for server in servers:
+            server.stop()
+
+    config = {
+        key: value for key, value in vars(args).items()
+        if key not in ("compare", "out", "server_pid") and not (key.startswith("mock_") and args.url)
+    }
+    config["url"] = args.url or "spawned"
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": config,
+        "load": load,
+        "rss": rss,
+    }
+    print_report(result)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{result['git']['commit'][:10] or 'nogit'}.json")
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nresults written to {out}")
+
+
+if __name__ == "__main__":
+    main()
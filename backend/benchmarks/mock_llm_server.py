@@ -0,0 +1,230 @@
+"""
+Mock LLM Server
+
+Local OpenAI-compatible endpoint for benchmarks and load tests, so they do
+not need OpenRouter or an API key and their timings do not depend on a
+remote provider. Serves:
+
+- POST /v1/chat/completions, streamed (SSE chunks) and non-streamed
+- GET /v1/models
+
+Behaviour is set on the command line: time to first token (--latency-ms,
+with optional --jitter-ms and a slow tail: --slow-rate of requests wait an
+extra --slow-ms), token rate (--tokens-per-second), reply length
+(--reply-tokens) and the fraction of requests answered with HTTP 500 or 429
+(--error-rate, --rate-limit-rate). --model-speed gives individual models
+their own latency and token rate, e.g. a fast small model next to a slower
+large one. When the prompt asks for CrewAI's
+"Final Answer:" format, the reply uses it, so crew kickoffs finish in one
+LLM call.
+
+Run from backend/:
+    python benchmarks/mock_llm_server.py --port 9100 --latency-ms 300 --tokens-per-second 60
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=mock python run.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "Welcome aboard! Your laptop and accounts will be ready on your first day. IT provisioning "
+    "starts once your documents are verified, and your manager will schedule orientation and "
+    "the first training sessions. Bring a photo ID for the I-9 check and reach out to HR with "
+    "any questions about benefits enrollment or payroll setup."
+).split()
+
+
+class MockLLM:
+    """Reply generator with configurable latency, token rate and failures."""
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        jitter_ms: float = 0.0,
+        tokens_per_second: float = 50.0,
+        reply_tokens: int = 60,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        model_speeds: Optional[Dict[str, Tuple[float, float]]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        # model -> (latency_ms, tokens_per_second)
+        self.model_speeds = model_speeds or {}
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+
+    def first_token_delay(self, model: str = "") -> float:
+        latency_ms = self.model_speeds.get(model, (self.latency_ms, 0.0))[0]
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            jitter += self.slow_ms
+        return max(0.0, latency_ms + jitter) / 1000
+
+    def token_delay(self, model: str = "") -> float:
+        tokens_per_second = self.model_speeds.get(model, (0.0, self.tokens_per_second))[1]
+        return 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    def failure(self) -> Optional[JSONResponse]:
+        """An error response for this request, or None."""
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.failures += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit exceeded (mock)", "type": "rate_limit_error"}},
+                headers={"Retry-After": "1"},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.failures += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Internal error (mock)", "type": "server_error"}},
+            )
+        return None
+
+    def reply_tokens_for(self, messages: List[Dict[str, Any]]) -> List[str]:
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        tokens = [w + " " for w in (_WORDS * (self.reply_tokens // len(_WORDS) + 1))[: self.reply_tokens]]
+        if "Final Answer:" in prompt:
+            tokens = ["Thought: ", "I now can give a great answer\n", "Final Answer: "] + tokens
+        return tokens
+
+
+def create_app(llm: MockLLM) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI-compatible LLM")
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock-model", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": llm.requests, "failures": llm.failures}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        llm.requests += 1
+        failure = llm.failure()
+        if failure is not None:
+            return failure
+        model = body.get("model", "mock-model")
+        tokens = llm.reply_tokens_for(body.get("messages") or [])
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {"prompt_tokens": 100, "completion_tokens": len(tokens), "total_tokens": 100 + len(tokens)}
+
+        if not body.get("stream"):
+            await asyncio.sleep(llm.first_token_delay(model) + llm.token_delay(model) * len(tokens))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        def frame(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(llm.first_token_delay(model))
+            yield frame({"role": "assistant", "content": ""})
+            delay = llm.token_delay(model)
+            for token in tokens:
+                yield frame({"content": token})
+                if delay:
+                    await asyncio.sleep(delay)
+            yield frame({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- jitter on the latency")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="0 = no delay between tokens")
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with HTTP 429")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests in the slow tail")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="extra latency of a slow request")
+    parser.add_argument(
+        "--model-speed", action="append", default=[], metavar="MODEL=LATENCY_MS:TOKENS_PER_SECOND",
+        help="per-model latency and token rate (repeatable)",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    model_speeds = {}
+    for spec in args.model_speed:
+        model, _, speed = spec.rpartition("=")
+        latency_ms, _, tokens_per_second = speed.partition(":")
+        model_speeds[model] = (float(latency_ms), float(tokens_per_second or args.tokens_per_second))
+
+    import uvicorn
+
+    llm = MockLLM(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        model_speeds=model_speeds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(llm), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Startup Profile
+
+Import-time profile of the application, from ``python -X importtime``:
+total time to import a module (``main`` by default), the slowest modules by
+cumulative and by self time, and the time per top-level package. Each run is
+a fresh interpreter, so nothing is cached in sys.modules; the median of
+several runs is reported.
+
+With --serve it also starts uvicorn and reports how long until /health
+answers (the server accepts liveness checks) and until it reports ready
+(crew manager built and warm-up done).
+
+Run from backend/:
+    python benchmarks/profile_imports.py
+    python benchmarks/profile_imports.py --module main --runs 5 --top 25
+    python benchmarks/profile_imports.py --budget-ms 2000   # exit 1 when over budget
+    python benchmarks/profile_imports.py --serve
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    # Importing must not need a real key; keep the profile offline
+    env.setdefault("OPENAI_API_KEY", "profile")
+    env.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    return env
+
+
+def profile_once(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, depth) for every import, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def _median_by(runs: List[List[Tuple[str, int, int, int]]], index: int) -> Dict[str, float]:
+    values: Dict[str, List[int]] = defaultdict(list)
+    for rows in runs:
+        for row in rows:
+            values[row[0]].append(row[index])
+    return {name: statistics.median(v) for name, v in values.items()}
+
+
+def report(module: str, runs: int, top: int) -> float:
+    profiles = [profile_once(module) for _ in range(runs)]
+    cumulative = _median_by(profiles, 2)
+    self_time = _median_by(profiles, 1)
+    total_ms = cumulative.get(module, 0) / 1000
+
+    by_package: Dict[str, float] = defaultdict(float)
+    for name, us in self_time.items():
+        by_package[name.split(".")[0]] += us
+
+    print(f"import {module}: {total_ms:.1f} ms (median of {runs} runs, {len(cumulative)} modules)\n")
+    print(f"{'slowest by cumulative time':<50} {'ms':>9}")
+    for name, us in sorted(cumulative.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{name:<50} {us / 1000:>9.1f}")
+    print(f"\n{'slowest by self time':<50} {'ms':>9}")
+    for name, us in sorted(self_time.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{name:<50} {us / 1000:>9.1f}")
+    print(f"\n{'top-level package (self time)':<50} {'ms':>9}")
+    for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{name:<50} {us / 1000:>9.1f}")
+    return total_ms
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_health(port: int) -> Optional[dict]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return json.loads(response.read())
+    except Exception:
+        return None
+
+
+def serve(timeout: float) -> None:
+    """Start uvicorn; time until /health answers and until it reports ready."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    live_s = ready_s = None
+    status = None
+    try:
+        while time.perf_counter() - started < timeout and process.poll() is None:
+            health = _get_health(port)
+            if health is not None:
+                if live_s is None:
+                    live_s = time.perf_counter() - started
+                status = "ready" if health.get("ready") else health.get("crew_manager")
+                if health.get("ready") or "failed" in (status, health.get("warmup")):
+                    ready_s = time.perf_counter() - started
+                    break
+            time.sleep(0.02)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    print("\nuvicorn main:app")
+    print(f"  /health answering after   {live_s:.2f} s" if live_s is not None else "  /health never answered")
+    if ready_s is not None:
+        print(f"  {status:<9} after {ready_s:.2f} s")
+    else:
+        print(f"  still {status} after {timeout:.0f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time and startup profile")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail when the import takes longer")
+    parser.add_argument("--serve", action="store_true", help="also time uvicorn startup via /health")
+    parser.add_argument("--serve-timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    total_ms = report(args.module, args.runs, args.top)
+    if args.serve:
+        serve(args.serve_timeout)
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nimport {args.module} took {total_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Trace Report
+
+Summarizes spans exported with TRACING_ENABLED=true TRACING_EXPORTER=file
+(see utils/tracing.py): per stage, the call count and latency percentiles,
+plus the stage breakdown of the slowest requests, to see where tail latency
+comes from.
+
+Run from backend/:
+    python benchmarks/trace_report.py traces.jsonl
+    python benchmarks/trace_report.py traces.jsonl --slowest 5
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from typing import Dict, List
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def load_spans(path: str) -> List[dict]:
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def stage_table(spans: List[dict]) -> None:
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    for span in spans:
+        by_name[span["name"]].append(span["duration_ms"])
+    print(f"{'stage':<28} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name, durations in sorted(by_name.items(), key=lambda kv: -sum(kv[1])):
+        durations.sort()
+        print(
+            f"{name:<28} {len(durations):>7} {_percentile(durations, 0.5):>10.2f} "
+            f"{_percentile(durations, 0.95):>10.2f} {_percentile(durations, 0.99):>10.2f} "
+            f"{durations[-1]:>10.2f}"
+        )
+
+
+def slowest_traces(spans: List[dict], count: int) -> None:
+    by_trace: Dict[str, List[dict]] = defaultdict(list)
+    for span in spans:
+        by_trace[span["context"]["trace_id"]].append(span)
+    roots = [s for s in spans if s["parent_id"] is None]
+    roots.sort(key=lambda s: -s["duration_ms"])
+    for root in roots[:count]:
+        print(f"\n{root['name']} {root['duration_ms']:.2f} ms  trace {root['context']['trace_id']}")
+        children: Dict[str, List[dict]] = defaultdict(list)
+        for span in by_trace[root["context"]["trace_id"]]:
+            if span["parent_id"] is not None:
+                children[span["parent_id"]].append(span)
+
+        def show(span_id: str, depth: int) -> None:
+            for child in sorted(children.get(span_id, []), key=lambda s: s["start_time"]):
+                print(f"{'  ' * depth}{child['name']:<{34 - 2 * depth}} {child['duration_ms']:>10.2f} ms")
+                show(child["context"]["span_id"], depth + 1)
+
+        show(root["context"]["span_id"], 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", nargs="?", default="traces.jsonl")
+    parser.add_argument("--slowest", type=int, default=3, help="slowest traces to break down")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    print(f"{len(spans)} spans from {args.path}\n")
+    stage_table(spans)
+    slowest_traces(spans, args.slowest)
+
+
+if __name__ == "__main__":
+    main()
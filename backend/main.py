@@ -10,45 +10,84 @@ Reference:
 """
 
 import os
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 import structlog
 
-from services.crew_manager import OnboardingCrewManager
+# crewai, langchain and the tools are imported by services.crew_manager when
+# the crew manager is built, not here, so the server can start accepting
+# connections before they have loaded
+from services.chat_sessions import get_chat_session_store
+from services.onboarding_batch import OnboardingBatchRunner
+from services.shared_state import close_shared_store
+from services.warmup import WARMUP_DEGRADED, WARMUP_OK, WARMUP_PENDING, run_warmup
 from api.chat import router as chat_router
+from api.metrics import MetricsMiddleware, router as metrics_router
+from api.onboarding import router as onboarding_router
 from utils.config import get_settings
-
-# Import tools to ensure they're registered
-import tools.stub_tools  # noqa: F401
+from utils.logging_config import configure_logging, shutdown_logging
+from utils.tracing import get_tracer
 
 # Load environment variables
 load_dotenv()
 
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+settings = get_settings()
 
+# Configure structured logging (rendered and written off the request path)
+configure_logging(
+    level=settings.LOG_LEVEL,
+    async_logging=settings.LOG_ASYNC,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+)
 logger = structlog.get_logger(__name__)
-settings = get_settings()
+
+
+def _build_crew_manager():
+    """Import crewai and build the crew manager (agents, crew pool, kickoff threads)."""
+    from services.crew_manager import OnboardingCrewManager
+    return OnboardingCrewManager()
+
+
+async def _init_crew_manager(app: FastAPI) -> None:
+    """Build the crew manager on a worker thread, then warm up; /health/ready waits for both."""
+    started = time.perf_counter()
+    try:
+        app.state.crew_manager = await asyncio.to_thread(_build_crew_manager)
+        app.state.crew_manager_status = "ready"
+        logger.info(
+            "CrewAI manager initialized successfully",
+            seconds=round(time.perf_counter() - started, 3),
+        )
+    except Exception as e:
+        logger.error("Failed to initialize CrewAI manager", error=str(e), exc_info=True)
+        # Set to None so we can handle the error in the endpoint
+        app.state.crew_manager = None
+        app.state.crew_manager_status = "failed"
+        logger.warning("Application started but crew manager initialization failed")
+        return
+    
+    if settings.WARMUP_ENABLED:
+        app.state.warmup = await run_warmup(app.state.crew_manager)
+    else:
+        app.state.warmup = {"status": WARMUP_OK, "skipped": True}
+
+
+def _readiness() -> dict:
+    """Ready once the crew manager is built and warm-up passed (ok or degraded)."""
+    crew_status = getattr(app.state, "crew_manager_status", "initializing")
+    warmup = getattr(app.state, "warmup", {"status": WARMUP_PENDING})
+    return {
+        "ready": crew_status == "ready" and warmup["status"] in (WARMUP_OK, WARMUP_DEGRADED),
+        "crew_manager": crew_status,
+        "warmup": warmup,
+    }
 
 
 @asynccontextmanager
@@ -57,20 +96,36 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting backend application", version="0.1.0")
     
-    # Initialize crew manager
+    # Initialize crew manager; in the background unless CREW_INIT_BACKGROUND=false
+    app.state.crew_manager = None
+    app.state.crew_manager_status = "initializing"
+    app.state.warmup = {"status": WARMUP_PENDING}
+    app.state.crew_manager_init = asyncio.create_task(_init_crew_manager(app))
+    if not settings.CREW_INIT_BACKGROUND:
+        await app.state.crew_manager_init
+    
     try:
-        app.state.crew_manager = OnboardingCrewManager()
-        logger.info("CrewAI manager initialized successfully")
+        app.state.batch_runner = OnboardingBatchRunner()
     except Exception as e:
-        logger.error("Failed to initialize CrewAI manager", error=str(e), exc_info=True)
-        # Set to None so we can handle the error in the endpoint
-        app.state.crew_manager = None
-        logger.warning("Application started but crew manager initialization failed")
+        logger.error("Failed to initialize onboarding batch runner", error=str(e), exc_info=True)
+        app.state.batch_runner = None
     
     yield
     
     # Shutdown
     logger.info("Shutting down backend application")
+    # The build thread cannot be interrupted; let it finish so its threads are shut down
+    await app.state.crew_manager_init
+    if app.state.crew_manager is not None:
+        app.state.crew_manager.shutdown()
+    if app.state.batch_runner is not None:
+        await app.state.batch_runner.shutdown()
+    get_chat_session_store().close()
+    close_shared_store()
+    from utils.llm_factory import aclose_http_clients
+    await aclose_http_clients()
+    get_tracer().shutdown()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -90,8 +145,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency histogram (outermost, so it includes CORS handling)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Register routers
 app.include_router(chat_router, prefix="/api", tags=["chat"])
+app.include_router(onboarding_router, prefix="/api", tags=["onboarding"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["metrics"])
 
 
 @app.get("/")
@@ -103,21 +165,44 @@ async def root():
         "version": "0.1.0",
         "endpoints": {
             "chat": "/api/chat",
+            "onboarding_batch": "/api/onboarding/batch",
             "docs": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
+            "metrics": "/metrics"
         }
     }
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health summary; answers while the crew manager is still being built."""
+    readiness = _readiness()
     return {
         "status": "healthy",
-        "crew_manager": "initialized" if hasattr(app.state, "crew_manager") else "not_initialized"
+        "ready": readiness["ready"],
+        # initializing | ready | failed
+        "crew_manager": readiness["crew_manager"],
+        "warmup": readiness["warmup"]["status"],
     }
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is up and the event loop is serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 503 until the crew manager is built and warm-up has passed."""
+    readiness = _readiness()
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content={"status": "not_ready", **readiness})
+    return {"status": "ready", **readiness}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -125,5 +210,6 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else max(1, settings.WORKERS),
         log_level=settings.LOG_LEVEL.lower(),
     )
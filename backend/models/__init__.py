@@ -3,29 +3,16 @@ Database Models
 
 Contains SQLAlchemy models for database entities.
 
-Note: Database models are stubbed for MVP. Full implementation
-will be added when database integration is implemented.
+Note: Only workflow state is persisted so far. Employee and task models
+will be added with the HRIS integration.
 
 Reference:
 - SAD Section 5.2: Database Architecture Specification
 """
 
-# Stub models - will be implemented when database is integrated
+from models.workflow import Base, OnboardingWorkflow
 
-# Example structure (not implemented in MVP):
-# from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-# from sqlalchemy.ext.declarative import declarative_base
-# 
-# Base = declarative_base()
-# 
-# class Employee(Base):
-#     __tablename__ = "employees"
-#     id = Column(Integer, primary_key=True)
-#     employee_id = Column(String, unique=True)
-#     # ... other fields
-# 
-# class OnboardingWorkflow(Base):
-#     __tablename__ = "onboarding_workflows"
-#     id = Column(Integer, primary_key=True)
-#     employee_id = Column(Integer, ForeignKey("employees.id"))
-#     # ... other fields
+__all__ = [
+    "Base",
+    "OnboardingWorkflow",
+]
@@ -0,0 +1,59 @@
+"""
+Onboarding Workflow Model
+
+Reference:
+- SAD Section 5.2: Database Architecture Specification
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, DateTime, Index, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OnboardingWorkflow(Base):
+    """One onboarding workflow and its current state."""
+
+    __tablename__ = "onboarding_workflows"
+
+    workflow_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    employee_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    state: Mapped[str] = mapped_column(String(32), nullable=False)
+    # "metadata" is reserved on declarative models, hence the attribute name
+    details: Mapped[dict] = mapped_column("metadata", JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow
+    )
+
+    __table_args__ = (
+        Index("ix_onboarding_workflows_employee_id", "employee_id"),
+        Index("ix_onboarding_workflows_state", "state"),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "workflow_id": self.workflow_id,
+            "employee_id": self.employee_id,
+            "state": self.state,
+            "metadata": dict(self.details or {}),
+            "created_at": _isoformat(self.created_at),
+            "updated_at": _isoformat(self.updated_at),
+        }
+
+
+def _isoformat(value: datetime) -> str:
+    if value is None:
+        return None
+    # SQLite hands back naive datetimes; all stored values are UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
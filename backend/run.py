@@ -2,6 +2,10 @@
 Backend Server Startup Script
 
 Convenience script to start the FastAPI backend server.
+
+WORKERS > 1 starts that many worker processes on the same port; see
+services/shared_state.py for what is shared between them. Auto-reload
+(DEBUG) always runs a single process.
 """
 
 import uvicorn
@@ -14,5 +18,6 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else max(1, settings.WORKERS),
         log_level=settings.LOG_LEVEL.lower(),
     )
@@ -0,0 +1,49 @@
+"""
+Chat Path Router
+
+Decides whether a chat message can be answered with a single direct LLM
+call on the event loop, or needs the full CrewAI crew (tools, workflow
+state, delegation).
+
+Reference:
+- SAD Section 3.2: Task Orchestration Specification
+"""
+
+import re
+from typing import Optional
+
+ROUTE_DIRECT = "direct"
+ROUTE_CREW = "crew"
+
+# Requests that act on a workflow rather than ask about onboarding in general:
+# these need the orchestrator's tools (state manager, scheduler, notifications)
+_ACTION_PATTERNS = [
+    r"\b(start|initiate|kick ?off|launch|begin)\b.*\b(onboarding|workflow|process)\b",
+    r"\b(status|progress)\b.*\b(my|the|this|our)\b.*\b(workflow|onboarding|ticket|request|task)s?\b",
+    r"\b(schedule|reschedule|book|cancel)\b.*\b(meeting|session|training|orientation|task)s?\b",
+    r"\b(notify|remind|email|message|escalate|alert)\b.*\b(manager|hr|it|team|buddy|stakeholders?)\b",
+    r"\b(update|mark|set|change)\b.*\b(state|status|task|workflow)\b",
+    r"\b(create|open|file|raise)\b.*\b(ticket|request)\b",
+    r"\b(assign|provision|grant|revoke)\b",
+    r"\bworkflow[-_ ]?id\b",
+]
+_ACTION_RE = re.compile("|".join(f"(?:{p})" for p in _ACTION_PATTERNS), re.IGNORECASE)
+
+
+def route_message(message: str, workflow_id: Optional[str] = None) -> str:
+    """
+    Pick the execution path for a chat message.
+
+    Args:
+        message: User's chat message
+        workflow_id: Workflow the user is asking about, if any
+
+    Returns:
+        ROUTE_CREW when the message references a workflow or asks for an
+        action the orchestrator's tools perform; ROUTE_DIRECT for plain Q&A
+    """
+    if workflow_id:
+        return ROUTE_CREW
+    if _ACTION_RE.search(message):
+        return ROUTE_CREW
+    return ROUTE_DIRECT
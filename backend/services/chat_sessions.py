@@ -0,0 +1,320 @@
+"""
+Chat Session Store
+
+Server-side conversation sessions, so clients send only a session id and
+the new message instead of re-uploading the whole transcript on every turn.
+
+Sessions live in a bounded in-memory LRU with an inactivity TTL. When
+CHAT_SESSION_SPILL_PATH is set, sessions pushed out of memory by capacity are
+spilled to a local SQLite file and restored on their next request; expired
+sessions are dropped from both.
+
+With several workers and a shared state backend (services/shared_state.py),
+every session is also kept there, so a conversation can continue on any
+worker; the in-memory copy is reused only while it matches the shared one.
+
+Async callers use ``acreate`` / ``aget`` / ``aappend`` / ``adelete``, which
+run in a worker thread whenever the store touches SQLite (shared backend or
+spill file).
+
+Reference:
+- SAD Section 4.3: Chat Interface Specifications
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import structlog
+
+from services.shared_state import get_shared_store
+from utils.config import get_settings
+from utils.lru_cache import TTLLRUCache
+
+logger = structlog.get_logger(__name__)
+
+# Expired rows are purged from the spill file every this many spills
+_PURGE_EVERY = 256
+
+SHARED_NAMESPACE = "chat_sessions"
+
+
+class ChatSession:
+    """One conversation: its messages in the role/content format of ChatRequest."""
+
+    def __init__(
+        self,
+        session_id: str,
+        employee_id: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None,
+    ):
+        self.session_id = session_id
+        self.employee_id = employee_id
+        self.messages: List[Dict[str, str]] = messages or []
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "employee_id": self.employee_id,
+            "message_count": len(self.messages),
+            "messages": list(self.messages),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+def _clean(messages: Optional[Iterable[Dict[str, str]]]) -> List[Dict[str, str]]:
+    return [
+        {"role": m.get("role") or "user", "content": m.get("content") or ""}
+        for m in messages or []
+        if m.get("content")
+    ]
+
+
+class ChatSessionStore:
+    """In-memory session store with TTL eviction and an optional SQLite spill."""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        ttl_seconds: float,
+        max_messages: int,
+        spill_path: Optional[str] = None,
+        shared: Optional[Any] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        # Cross-worker copy of every session (None with a single worker)
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._spill_db: Optional[sqlite3.Connection] = None
+        self._spills = 0
+        self._restores = 0
+        if spill_path:
+            self._spill_db = self._open_spill(spill_path)
+        self._sessions = TTLLRUCache(
+            max_entries=max_sessions,
+            ttl_seconds=ttl_seconds,
+            on_evict=self._spill if self._spill_db is not None else None,
+        )
+        logger.info(
+            "Chat session store initialized",
+            max_sessions=max_sessions,
+            ttl_seconds=ttl_seconds,
+            spill=bool(spill_path),
+            shared=shared is not None,
+        )
+
+    @staticmethod
+    def _open_spill(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            " session_id TEXT PRIMARY KEY, employee_id TEXT, messages TEXT NOT NULL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS ix_chat_sessions_updated_at ON chat_sessions (updated_at)")
+        return db
+
+    def create(
+        self,
+        employee_id: Optional[str] = None,
+        messages: Optional[Iterable[Dict[str, str]]] = None,
+    ) -> ChatSession:
+        """Start a session, optionally seeded with client-side history."""
+        session = ChatSession(
+            session_id=f"session-{uuid.uuid4().hex}",
+            employee_id=employee_id,
+            messages=_clean(messages)[-self.max_messages:],
+        )
+        self._sessions.set(session.session_id, session)
+        if self._shared is not None:
+            self._shared.set(
+                SHARED_NAMESPACE, session.session_id, self._shared_record(session), self._shared_ttl
+            )
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Return a live session from memory, or restore it from the spill file."""
+        if self._shared is not None:
+            return self._get_shared(session_id)
+        session = self._sessions.get(session_id)
+        if session is None and self._spill_db is not None:
+            session = self._restore(session_id)
+        return session
+
+    @property
+    def _shared_ttl(self) -> Optional[float]:
+        return self.ttl_seconds if self.ttl_seconds > 0 else None
+
+    @staticmethod
+    def _shared_record(session: ChatSession) -> Dict[str, Any]:
+        return {
+            "employee_id": session.employee_id,
+            "messages": session.messages,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+        }
+
+    def _get_shared(self, session_id: str) -> Optional[ChatSession]:
+        """The shared copy is authoritative; another worker may have appended to it."""
+        record = self._shared.get(SHARED_NAMESPACE, session_id)
+        if record is None:
+            self._sessions.delete(session_id)
+            return None
+        session = self._sessions.get(session_id)
+        if session is not None and session.updated_at == record["updated_at"]:
+            return session
+        session = ChatSession(
+            session_id,
+            record["employee_id"],
+            record["messages"],
+            record["created_at"],
+            record["updated_at"],
+        )
+        self._sessions.set(session_id, session)
+        return session
+
+    def append(self, session: ChatSession, messages: Iterable[Dict[str, str]]) -> None:
+        """Append messages and refresh the session's TTL."""
+        if self._shared is not None:
+            self._append_shared(session, _clean(messages))
+            return
+        with self._lock:
+            session.messages.extend(_clean(messages))
+            if len(session.messages) > self.max_messages:
+                del session.messages[:len(session.messages) - self.max_messages]
+            session.updated_at = time.time()
+        self._sessions.set(session.session_id, session)
+
+    def _append_shared(self, session: ChatSession, messages: List[Dict[str, str]]) -> None:
+        """Append atomically to the shared copy, so concurrent turns on two workers both land."""
+        def append(record: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            record = record or self._shared_record(session)
+            record["messages"] = (record["messages"] + messages)[-self.max_messages:]
+            record["updated_at"] = time.time()
+            return record
+
+        record = self._shared.update(SHARED_NAMESPACE, session.session_id, append, self._shared_ttl)
+        with self._lock:
+            session.messages = record["messages"]
+            session.updated_at = record["updated_at"]
+        self._sessions.set(session.session_id, session)
+
+    def delete(self, session_id: str) -> bool:
+        deleted = self._sessions.delete(session_id)
+        if self._shared is not None:
+            deleted = self._shared.delete(SHARED_NAMESPACE, session_id) or deleted
+        if self._spill_db is not None:
+            with self._lock:
+                cursor = self._spill_db.execute(
+                    "DELETE FROM chat_sessions WHERE session_id = ?", (session_id,)
+                )
+            deleted = deleted or cursor.rowcount > 0
+        return deleted
+
+    def _spill(self, session_id: str, session: ChatSession) -> None:
+        with self._lock:
+            self._spill_db.execute(
+                "INSERT OR REPLACE INTO chat_sessions VALUES (?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    session.employee_id,
+                    json.dumps(session.messages),
+                    session.created_at,
+                    session.updated_at,
+                ),
+            )
+            self._spills += 1
+            if self._spills % _PURGE_EVERY == 0 and self.ttl_seconds > 0:
+                self._spill_db.execute(
+                    "DELETE FROM chat_sessions WHERE updated_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+
+    def _restore(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            row = self._spill_db.execute(
+                "SELECT employee_id, messages, created_at, updated_at FROM chat_sessions"
+                " WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._spill_db.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+        employee_id, messages, created_at, updated_at = row
+        if self.ttl_seconds > 0 and time.time() - updated_at > self.ttl_seconds:
+            return None
+        session = ChatSession(session_id, employee_id, json.loads(messages), created_at, updated_at)
+        self._sessions.set(session_id, session)
+        self._restores += 1
+        return session
+
+    async def _offload(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a store call off the event loop when it may block on SQLite."""
+        if self._shared is None and self._spill_db is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def acreate(
+        self,
+        employee_id: Optional[str] = None,
+        messages: Optional[Iterable[Dict[str, str]]] = None,
+    ) -> ChatSession:
+        return await self._offload(self.create, employee_id, messages)
+
+    async def aget(self, session_id: str) -> Optional[ChatSession]:
+        return await self._offload(self.get, session_id)
+
+    async def aappend(self, session: ChatSession, messages: Iterable[Dict[str, str]]) -> None:
+        await self._offload(self.append, session, list(messages))
+
+    async def adelete(self, session_id: str) -> bool:
+        return await self._offload(self.delete, session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._sessions.stats(),
+            "ttl_seconds": self.ttl_seconds,
+            "spill_enabled": self._spill_db is not None,
+            "spilled": self._spills,
+            "restored": self._restores,
+            "shared": self._shared is not None,
+        }
+
+    def close(self) -> None:
+        if self._spill_db is not None:
+            self._spill_db.close()
+            self._spill_db = None
+
+
+_store: Optional[ChatSessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_chat_session_store() -> ChatSessionStore:
+    """Get the process-wide chat session store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                shared_store = get_shared_store()
+                _store = ChatSessionStore(
+                    max_sessions=settings.CHAT_SESSION_MAX_SESSIONS,
+                    ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+                    max_messages=settings.CHAT_SESSION_MAX_MESSAGES,
+                    spill_path=settings.CHAT_SESSION_SPILL_PATH or None,
+                    shared=shared_store if shared_store.shared else None,
+                )
+    return _store
@@ -9,15 +9,34 @@ Reference:
 - SAD Section 5.3: CrewAI Integration Layer Requirements
 """
 
-from typing import Dict, List, Any, Optional, AsyncGenerator
-import json
+from typing import Dict, List, Any, Optional, AsyncGenerator, Callable
+import asyncio
+import contextvars
+import time
+import litellm
 from crewai import Crew, Process
-from langchain_openai import ChatOpenAI
+from crewai.llm import LLM, suppress_warnings
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
 import structlog
 
+from services.chat_router import ROUTE_CREW, ROUTE_DIRECT, route_message
+from services.history_manager import CompactedHistory, HistoryManager
+from services.kickoff_executor import KickoffAdmission, KickoffExecutor
+from services.model_router import TIER_COMPLEX, ModelTier, load_model_router
+from services.response_cache import ResponseCache, context_key, history_digest, normalize_message
+from services.resilience import ERROR_PERMANENT, classify_error
+from services.shared_state import get_shared_store
+from services.single_flight import SingleFlight
+from services.workflow_state import get_workflow_state_manager, new_workflow_id
 from utils.agent_loader import load_agents_from_yaml, create_agent_from_config
 from utils.config import get_settings
+from utils.llm_factory import create_chat_llm, timed_llm_call
+from utils.metrics import RESPONSE_EXTRACTION_DURATION
+from utils.prompt_registry import get_prompt_registry
+from utils.token_counter import get_token_counter
+from utils.tracing import current_span, get_tracer
+from utils.response_parser import JSONMessageStream, extract_plain_message
 from tools import (
     workflow_state_manager,
     task_scheduler,
@@ -29,53 +48,209 @@ logger = structlog.get_logger(__name__)
 settings = get_settings()
 
 
-def _strip_markdown_code_blocks(s: str) -> str:
-    """Remove ```json ... ``` or ``` ... ``` blocks; return inner content. Handles blocks anywhere in string."""
-    t = s.strip()
-    for marker in ("```json", "```JSON", "```"):
-        i = t.find(marker)
-        if i >= 0:
-            start = i + len(marker)
-            t = t[start:].lstrip("\n\r")
-            j = t.find("```")
-            if j >= 0:
-                t = t[:j].rstrip()
-            break
-    return t.strip()
+# Marker CrewAI's ReAct prompt asks the model to put in front of its final reply
+_FINAL_ANSWER_MARKER = "Final Answer:"
 
+# Sentinel pushed onto the token queue between LLM generations
+_GENERATION_END = object()
 
-def _extract_json_object(s: str) -> Optional[str]:
-    """Find first {...} in string, return substring. Handles nested braces."""
-    start = s.find("{")
-    if start < 0:
-        return None
-    depth = 0
-    for i in range(start, len(s)):
-        if s[i] == "{":
-            depth += 1
-        elif s[i] == "}":
-            depth -= 1
-            if depth == 0:
-                return s[start : i + 1]
-    return None
+# Per-request token sink; bound in the executor context for the kickoff thread
+_token_sink: contextvars.ContextVar[Optional[Callable[[Any], None]]] = contextvars.ContextVar(
+    "token_sink", default=None
+)
+
+
+class _StreamingCrewLLM(LLM):
+    """
+    CrewAI LLM that streams its completions to the sink bound to the current request.
+
+    CrewAI keeps LLM instances of its own class as they are, but rebuilds any
+    other chat model (ChatOpenAI) as a plain LLM, dropping callbacks and the
+    streaming flag; the kickoff's LLM calls therefore have to stream here, on
+    litellm. Without a bound sink (non-streaming kickoffs) this is a plain LLM.
+    Each call is timed for LLM_CALL_DURATION and runs in an ``llm.call`` span
+    under the kickoff's span.
+    """
+
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        with timed_llm_call(self.model):
+            sink = _token_sink.get()
+            if sink is None:
+                return super().call(messages, callbacks)
+            return self._stream(messages, callbacks, sink)
+
+    def _stream(self, messages: List[Dict[str, str]], callbacks: List[Any], sink: Callable[[Any], None]) -> str:
+        with suppress_warnings():
+            if callbacks:
+                self.set_callbacks(callbacks)
+            params = {
+                "model": self.model,
+                "messages": messages,
+                "timeout": self.timeout,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+                "n": self.n,
+                "stop": self.stop,
+                "max_tokens": self.max_tokens or self.max_completion_tokens,
+                "presence_penalty": self.presence_penalty,
+                "frequency_penalty": self.frequency_penalty,
+                "logit_bias": self.logit_bias,
+                "response_format": self.response_format,
+                "seed": self.seed,
+                "api_base": self.base_url,
+                "api_version": self.api_version,
+                "api_key": self.api_key,
+                **self.kwargs,
+                "stream": True,
+            }
+            params = {k: v for k, v in params.items() if v is not None}
+            parts: List[str] = []
+            try:
+                for chunk in litellm.completion(**params):
+                    choices = getattr(chunk, "choices", None)
+                    token = choices[0].delta.content if choices else None
+                    if token:
+                        parts.append(token)
+                        sink(token)
+            finally:
+                # Also on errors, so a retried step starts from a clean extractor
+                sink(_GENERATION_END)
+            return "".join(parts)
 
 
-def _extract_plain_message_from_response(raw: str) -> str:
-    """Extract plain-text message from raw response (may be JSON or wrapped in markdown)."""
-    t = _strip_markdown_code_blocks(raw)
-    candidate = _extract_json_object(t) or (t if (t.startswith("{") or t.startswith("[")) else None)
-    if not candidate:
-        return raw
-    try:
-        data = json.loads(candidate)
-        if data and isinstance(data, dict):
-            for key in ("message", "content", "text", "response", "output"):
-                v = data.get(key)
-                if isinstance(v, str):
-                    return v
-    except Exception:
-        pass
-    return raw
+class _StreamingMessageExtractor:
+    """
+    Incremental counterpart of extract_plain_message.
+
+    Plain text after the final-answer marker is passed through as it arrives.
+    Replies that start as JSON or a markdown code block go through a
+    JSONMessageStream, which releases the message field while it is being
+    generated; if no message field turns up, the whole reply is run through
+    extract_plain_message once the generation is complete.
+    """
+
+    def __init__(self, require_marker: bool = True):
+        self.require_marker = require_marker
+        self.emitted_any = False
+        self.extract_seconds = 0.0
+        self._reported = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._buffer = ""
+        self._mode = "marker" if self.require_marker else "sniff"
+        self._json: Optional[JSONMessageStream] = None
+
+    def feed(self, token: str) -> str:
+        """Consume a token; return text that is safe to forward now."""
+        started = time.perf_counter()
+        try:
+            return self._feed(token)
+        finally:
+            self.extract_seconds += time.perf_counter() - started
+
+    def _feed(self, token: str) -> str:
+        if self._mode == "buffered":
+            self._buffer += token
+            out = self._json.feed(token)
+            if out:
+                self.emitted_any = True
+            return out
+        if self._mode == "marker":
+            # Only the tail that could still complete the marker is rescanned
+            scanned = max(0, len(self._buffer) - len(_FINAL_ANSWER_MARKER) + 1)
+            self._buffer += token
+            i = self._buffer.find(_FINAL_ANSWER_MARKER, scanned)
+            if i < 0:
+                return ""
+            self._buffer = self._buffer[i + len(_FINAL_ANSWER_MARKER):]
+            self._mode = "sniff"
+        else:
+            self._buffer += token
+        if self._mode == "sniff":
+            head = self._buffer.lstrip()
+            if not head:
+                return ""
+            if head[0] in "{[" or head.startswith("`"):
+                self._mode = "buffered"
+                self._buffer = ""
+                self._json = JSONMessageStream()
+                return self._feed(head)
+            self._buffer = head
+            self._mode = "passthrough"
+        if self._mode == "passthrough":
+            out, self._buffer = self._buffer, ""
+            if out:
+                self.emitted_any = True
+            return out
+        return ""
+
+    def end_generation(self) -> str:
+        """Handle the end of one LLM call; return any buffered reply text."""
+        if self._mode == "marker":
+            # Intermediate ReAct step (thought / tool call) - nothing to show
+            self._reset()
+            return ""
+        return self.finish()
+
+    def finish(self) -> str:
+        """Flush whatever is buffered once the stream is complete."""
+        out = ""
+        if self._mode == "buffered":
+            started = time.perf_counter()
+            out = "" if self._json.found else extract_plain_message(self._buffer.strip())
+            self.extract_seconds += time.perf_counter() - started
+            self._buffer = ""
+            self._mode = "done"
+            if out:
+                self.emitted_any = True
+        if not self._reported:
+            # Total extraction work for the response, recorded once
+            self._reported = True
+            RESPONSE_EXTRACTION_DURATION.observe(self.extract_seconds, "stream")
+            get_tracer().record("response.extract", self.extract_seconds, mode="stream")
+        return out
+
+
+class CrewPool:
+    """
+    Fixed-size pool of pre-built crews.
+    
+    CrewAI crews and agents carry per-execution state (tasks, executor, tool
+    cache), so a crew must never run two kickoffs at once. Each chat request
+    checks out an idle crew for exclusive use and returns it once its kickoff
+    has finished; when all crews are busy, callers wait for one to free up.
+    """
+    
+    def __init__(self, factory: Callable[[], Crew], size: int):
+        if size < 1:
+            raise ValueError("Crew pool size must be at least 1")
+        self.crews: List[Crew] = [factory() for _ in range(size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for crew in self.crews:
+            self._idle.put_nowait(crew)
+    
+    @property
+    def template(self) -> Crew:
+        """Reference crew for status reporting; do not kick it off directly."""
+        return self.crews[0]
+    
+    @property
+    def size(self) -> int:
+        return len(self.crews)
+    
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
+    
+    async def acquire(self) -> Crew:
+        """Wait for an idle crew and check it out."""
+        return await self._idle.get()
+    
+    def release(self, crew: Crew) -> None:
+        """Return a crew to the pool, dropping the finished request's tasks."""
+        crew.tasks = []
+        self._idle.put_nowait(crew)
 
 
 class OnboardingCrewManager:
@@ -90,31 +265,126 @@ class OnboardingCrewManager:
         """Initialize crew manager and load agent configurations."""
         self.settings = get_settings()
         self.agents_config = load_agents_from_yaml()
-        self.llm = self._create_llm()
-        self.crew = None
-        self._initialize_crew()
-        logger.info("OnboardingCrewManager initialized")
+        self.model_router = load_model_router()
+        # Crews and complex direct answers use the complex tier
+        self.llm = self._create_llm(self.model_router.complex)
+        self.tier_llms = self._create_tier_llms()
+        self.crew_llm = self._create_crew_llm(self.model_router.complex)
+        # One crew per kickoff worker: a running kickoff always holds a crew
+        self.kickoff_executor = KickoffExecutor(
+            max_workers=self.settings.KICKOFF_MAX_WORKERS,
+            queue_size=self.settings.KICKOFF_QUEUE_SIZE,
+            retry_after=self.settings.KICKOFF_RETRY_AFTER_SECONDS,
+        )
+        self.crew_pool = CrewPool(self._build_crew, self.settings.KICKOFF_MAX_WORKERS)
+        self.system_prompt = self._build_system_prompt()
+        # Compiled once; its version hash is part of the response cache key
+        self.chat_prompt = get_prompt_registry().get(self.settings.CHAT_PROMPT_ID)
+        self.history_manager = self._create_history_manager()
+        self._route_counts = {ROUTE_DIRECT: 0, ROUTE_CREW: 0}
+        self.response_cache: Optional[ResponseCache] = None
+        if self.settings.RESPONSE_CACHE_ENABLED:
+            shared_store = get_shared_store()
+            self.response_cache = ResponseCache(
+                max_entries=self.settings.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=self.settings.RESPONSE_CACHE_TTL_SECONDS,
+                similarity_threshold=self.settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+                shared=shared_store if shared_store.shared else None,
+            )
+        # Identical questions asked while one is being answered share its LLM call
+        self.single_flight: Optional[SingleFlight] = None
+        if self.settings.CHAT_SINGLE_FLIGHT_ENABLED:
+            self.single_flight = SingleFlight()
+        logger.info(
+            "OnboardingCrewManager initialized",
+            kickoff_workers=self.kickoff_executor.max_workers,
+            kickoff_queue_size=self.kickoff_executor.queue_size,
+        )
     
-    def _create_llm(self) -> BaseChatModel:
-        """Create LLM instance for agents (OpenRouter / OpenAI-compatible)."""
+    def _create_llm(self, tier: ModelTier) -> BaseChatModel:
+        """Create LLM instance for one model tier (OpenRouter / OpenAI-compatible)."""
         base_url = self.settings.OPENAI_BASE_URL or self.settings.OPENAI_API_BASE or None
-        model = self.settings.OPENAI_MODEL
+        streaming = self.settings.ENABLE_STREAMING
         
         logger.info(
             "Using OpenAI-compatible LLM (OpenRouter)",
             base_url=base_url or "default",
-            model=model,
+            tier=tier.name,
+            model=tier.model,
+            streaming=streaming,
+        )
+        
+        return create_chat_llm(
+            model=tier.model,
+            temperature=tier.temperature,
+            streaming=streaming,
+            max_tokens=tier.max_tokens,
         )
+    
+    def _create_crew_llm(self, tier: ModelTier) -> LLM:
+        """
+        Create the litellm-based LLM the crew agents run on.
         
-        return ChatOpenAI(
-            model=model,
-            temperature=self.settings.OPENAI_TEMPERATURE,
+        One instance serves every kickoff: tokens go to whichever request's
+        sink is bound in the calling context (see _start_kickoff).
+        """
+        base_url = self.settings.OPENAI_BASE_URL or self.settings.OPENAI_API_BASE or None
+        return _StreamingCrewLLM(
+            model=tier.model,
+            temperature=tier.temperature,
+            max_tokens=tier.max_tokens,
             api_key=self.settings.OPENAI_API_KEY,
             base_url=base_url,
         )
     
-    def _initialize_crew(self):
-        """Initialize CrewAI crew with MVP agents."""
+    def _create_tier_llms(self) -> Dict[str, BaseChatModel]:
+        """One LLM per model tier; tiers with identical settings share one."""
+        complex_tier = self.model_router.complex
+        llms = {TIER_COMPLEX: self.llm}
+        for name, tier in self.model_router.tiers.items():
+            if name not in llms:
+                same = tier.as_dict() == complex_tier.as_dict()
+                llms[name] = self.llm if same else self._create_llm(tier)
+        return llms
+    
+    def _create_history_manager(self) -> HistoryManager:
+        """History compaction; older turns are summarized by a non-streaming LLM."""
+        summarizer = None
+        if self.settings.CHAT_HISTORY_LLM_SUMMARY:
+            self.summary_prompt = get_prompt_registry().get("history_summary")
+            # Non-streaming: summaries run in the background, not in a chat stream
+            self.summary_llm = create_chat_llm(temperature=0)
+            summarizer = self._summarize_history
+        return HistoryManager(
+            budget_tokens=self.settings.CHAT_HISTORY_TOKEN_BUDGET,
+            summary_max_tokens=self.settings.CHAT_HISTORY_SUMMARY_MAX_TOKENS,
+            count_tokens=get_token_counter(self.settings.OPENAI_MODEL),
+            summarizer=summarizer,
+            cache_size=self.settings.CHAT_HISTORY_SUMMARY_CACHE_SIZE,
+            cache_ttl=self.settings.CHAT_HISTORY_SUMMARY_TTL_SECONDS,
+        )
+    
+    async def _summarize_history(self, previous_summary: str, transcript: str) -> str:
+        prompt = self.summary_prompt.render(
+            previous_summary=previous_summary or "(none yet)",
+            transcript=transcript,
+        )
+        result = await self.summary_llm.ainvoke([HumanMessage(content=prompt)])
+        return str(result.content)
+    
+    def _build_system_prompt(self) -> str:
+        """Orchestrator persona as a system prompt for the direct LLM path."""
+        config = self.agents_config.get('onboarding_orchestrator')
+        if not config:
+            raise ValueError("onboarding_orchestrator configuration not found")
+        # Same persona framing CrewAI uses for agent prompts
+        return (
+            f"You are {config.get('role', '')}.\n{config.get('backstory', '')}\n\n"
+            f"Your personal goal is: {config.get('goal', '')}"
+        )
+    
+    def _build_crew(self) -> Crew:
+        """Build one CrewAI crew with MVP agents (one per pool slot)."""
         # For MVP: Create orchestrator agent only
         orchestrator_config = self.agents_config.get('onboarding_orchestrator')
         if not orchestrator_config:
@@ -130,30 +400,33 @@ class OnboardingCrewManager:
         
         orchestrator = create_agent_from_config(
             orchestrator_config,
-            llm=self.llm,
+            llm=self.crew_llm,
             tools=orchestrator_tools
         )
         
         # Create simplified crew for MVP
         # Full hierarchical crew with all agents will be implemented in integration phase
-        self.crew = Crew(
+        crew = Crew(
             agents=[orchestrator],
             tasks=[],  # Tasks will be created dynamically per chat request
             process=Process.sequential,  # Simplified for MVP
             memory=self.settings.CREWAI_MEMORY,
             verbose=self.settings.CREWAI_VERBOSE,
             max_rpm=self.settings.CREWAI_MAX_RPM,
-            manager_llm=self.llm,
+            manager_llm=self.crew_llm,
         )
         
         logger.info("CrewAI crew initialized", agent_count=1, process="sequential")
+        return crew
     
     async def process_chat_message(
         self,
         message: str,
         employee_id: Optional[str] = None,
         workflow_id: Optional[str] = None,
-        conversation_history: Optional[List[Dict[str, str]]] = None
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        admission: Optional[KickoffAdmission] = None,
+        outcome: Optional[Dict[str, Any]] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Process chat message and stream response.
@@ -163,6 +436,11 @@ class OnboardingCrewManager:
             employee_id: Optional employee ID for context
             workflow_id: Optional workflow ID for context
             conversation_history: Optional conversation history
+            admission: Slot already reserved via kickoff_executor.admit() for a
+                crew kickoff (the API admits crew requests before streaming so
+                it can reject with 503); admitted here if needed and not given
+            outcome: Optional dict; "error" is set to the error class when the
+                reply is an error fallback rather than an answer
             
         Yields:
             Response chunks as strings
@@ -177,108 +455,379 @@ class OnboardingCrewManager:
             workflow_id=workflow_id
         )
         
-        # For MVP: Create a simple task for the orchestrator
-        from crewai import Task
-
+        tracer = get_tracer()
+        with tracer.span("chat.history_compact") as span:
+            history = self.history_manager.compact(conversation_history)
+            cache_ctx = self._cache_context(employee_id, workflow_id, history)
+            span.set_attributes(**{"history.tokens": history.tokens, "history.dropped": history.dropped})
+        route = self.choose_route(message, workflow_id)
+        # Crew answers run tools with side effects (tickets, emails, access
+        # grants), so only direct answers are served from the cache or shared
+        reusable = route == ROUTE_DIRECT
+        if reusable and admission is not None:
+            # No kickoff thread needed; free the slot for crew requests
+            admission.release()
+            admission = None
+        try:
+            if reusable and self.response_cache is not None:
+                cached = await self.response_cache.aget(message, cache_ctx)
+                if cached is not None:
+                    logger.info("Serving cached chat response", response_length=len(cached))
+                    current_span().set_attribute("chat.cache_hit", True)
+                    yield cached
+                    return
+            
+            if self.single_flight is None or not reusable:
+                generator = self._answer(
+                    message, employee_id, workflow_id, history, cache_ctx, route, admission
+                )
+            else:
+                key = (normalize_message(message), cache_ctx)
+                follower = self.single_flight.in_flight(key)
+                current_span().set_attribute("chat.single_flight", "follower" if follower else "leader")
+                generator = self.single_flight.stream(
+                    key,
+                    lambda: self._answer(message, employee_id, workflow_id, history, cache_ctx, route, None),
+                )
+            async for chunk in generator:
+                yield chunk
+                
+        except Exception as e:
+            error_class = classify_error(e)
+            logger.error("Error processing chat message", error=str(e), error_class=error_class, exc_info=True)
+            if outcome is not None:
+                outcome["error"] = error_class
+            if error_class == ERROR_PERMANENT:
+                yield f"I apologize, but I encountered an error: {str(e)}"
+            else:
+                # Still failing after retries, or the circuit is open
+                yield "The assistant is temporarily unavailable. Please try again in a moment."
+        finally:
+            # No-op once the kickoff has run; frees the slot if it never started
+            if admission is not None:
+                admission.release_if_unused()
+    
+    def choose_route(self, message: str, workflow_id: Optional[str] = None) -> str:
+        """Direct LLM call or crew kickoff for this message (crew when the fast path is off)."""
+        if not self.settings.CHAT_FAST_PATH_ENABLED:
+            return ROUTE_CREW
+        return route_message(message, workflow_id)
+    
+    async def _answer(
+        self,
+        message: str,
+        employee_id: Optional[str],
+        workflow_id: Optional[str],
+        history: CompactedHistory,
+        cache_ctx: str,
+        route: str,
+        admission: Optional[KickoffAdmission],
+    ) -> AsyncGenerator[str, None]:
+        """Generate the answer with the direct LLM or the crew; direct answers are cached."""
+        tracer = get_tracer()
+        try:
+            with tracer.span("chat.generate") as span:
+                with tracer.span("chat.prompt_build"):
+                    task_description = self._build_task_description(
+                        message, employee_id, workflow_id, history
+                    )
+                self._route_counts[route] += 1
+                tier = self.model_router.select(message, route, has_summary=bool(history.summary))
+                span.set_attributes(**{"chat.route": route, "chat.model_tier": tier.name})
+                
+                parts: List[str] = []
+                # Provider-reported token usage, when the response carries it
+                usage: Dict[str, int] = {}
+                started = time.perf_counter()
+                if route == ROUTE_DIRECT:
+                    generator = self._run_direct(task_description, tier, usage)
+                else:
+                    if admission is None:
+                        admission = self.kickoff_executor.admit()
+                    generator = self._run_crew(task_description, admission)
+                async for chunk in generator:
+                    parts.append(chunk)
+                    yield chunk
+                self._record_model_usage(
+                    tier, route, time.perf_counter() - started, task_description, "".join(parts), usage
+                )
+                
+                # Only complete, successful direct answers are cached
+                if route == ROUTE_DIRECT and self.response_cache is not None:
+                    await self.response_cache.aset(message, cache_ctx, "".join(parts))
+        finally:
+            if admission is not None:
+                admission.release_if_unused()
+    
+    def _record_model_usage(
+        self,
+        tier: ModelTier,
+        route: str,
+        seconds: float,
+        task_description: str,
+        answer: str,
+        usage: Dict[str, int],
+    ) -> None:
+        """Per-tier latency, tokens and cost; tokens are counted locally when not reported."""
+        count_tokens = get_token_counter(tier.model)
+        prompt_tokens = usage.get("input_tokens") or (
+            count_tokens(self.system_prompt) + count_tokens(task_description)
+        )
+        completion_tokens = usage.get("output_tokens") or count_tokens(answer)
+        self.model_router.record(tier, route, seconds, prompt_tokens, completion_tokens)
+    
+    def _cache_context(
+        self,
+        employee_id: Optional[str],
+        workflow_id: Optional[str],
+        history: CompactedHistory,
+    ) -> str:
+        """Cache key for everything besides the message that shapes the answer."""
+        return context_key(
+            model=self.model_router.complex.model,
+            temperature=self.model_router.complex.temperature,
+            # Which tier answers follows from the message and this context,
+            # so the routing table's version covers the other tier's model
+            model_routing=self.model_router.version,
+            prompt_version=self.chat_prompt.version,
+            employee_id=employee_id,
+            workflow_id=workflow_id,
+            history=history_digest(history.as_messages()),
+        )
+    
+    def _build_task_description(
+        self,
+        message: str,
+        employee_id: Optional[str],
+        workflow_id: Optional[str],
+        history: CompactedHistory,
+    ) -> str:
+        """Render the chat task prompt for one request."""
         ctx = []
         if employee_id:
             ctx.append(f"Employee ID: {employee_id}")
         if workflow_id:
             ctx.append(f"Workflow ID: {workflow_id}")
 
-        history_blob = ""
-        if conversation_history and len(conversation_history) > 0:
-            lines = []
-            for m in conversation_history[-10:]:  # last 10 turns
-                role = (m.get("role") or "user").strip().lower()
-                name = "User" if role == "user" else "Assistant"
-                content = (m.get("content") or "").strip()
-                if content:
-                    lines.append(f"{name}: {content}")
-            if lines:
-                history_blob = "\n\nPrevious conversation:\n" + "\n".join(lines) + "\n\n"
-
-        task_description = f"""You are an onboarding assistant. Answer based on general onboarding knowledge (documents, IT access, training, coordination).
-{history_blob}
-Current user message: "{message}"
-{f'Additional context: ' + '; '.join(ctx) if ctx else ''}
-
-Examples of good, varied answers (match the question type):
-- "What documents do I need?" → Give a concrete list: I-9, W-4, direct deposit form, ID. Brief note on where to submit.
-- "How does IT access work?" → Short steps: request triggered by HR, IT provisions email/VPN/tools, you receive credentials before day one.
-- "What training is required?" → List modules (e.g. security, code of conduct, role-specific) and how they're assigned.
-
-Instructions:
-1. ANSWER THE USER'S QUESTION DIRECTLY. Give concrete, specific information. Do NOT give the same generic overview every time.
-2. NEVER ask for Employee ID or Workflow ID. Do not say "Could you please provide Employee ID or Workflow ID" or similar.
-3. Vary your answer based on the question. Be concise and helpful.
-4. Reply in plain text only. No JSON, code blocks, or markdown. Write only the reply message."""
-
-        task = Task(
-            description=task_description,
-            agent=self.crew.agents[0],  # Orchestrator agent
-            expected_output="A direct, specific plain-text answer to the user's question; no JSON or formatting"
+        return self.chat_prompt.render(
+            history_blob=self.history_manager.render(history),
+            message=message,
+            context_line=f'Additional context: ' + '; '.join(ctx) if ctx else '',
         )
+    
+    async def _run_direct(
+        self,
+        task_description: str,
+        tier: ModelTier,
+        usage: Dict[str, int],
+    ) -> AsyncGenerator[str, None]:
+        """
+        Answer with one async LLM call on the event loop (no crew, no thread).
         
-        # Update crew with task
-        self.crew.tasks = [task]
+        Used for plain Q&A that needs neither tools nor delegation; the
+        orchestrator's role/goal/backstory become the system prompt. The
+        call goes to the given tier's model; token usage reported by the
+        provider is stored in ``usage``.
+        """
+        llm = self.tier_llms[tier.name]
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=task_description),
+        ]
+        if not self.settings.ENABLE_STREAMING:
+            result = await llm.ainvoke(messages)
+            usage.update(getattr(result, "usage_metadata", None) or {})
+            raw = str(result.content).strip()
+            logger.info("LLM response received", path=ROUTE_DIRECT, tier=tier.name, raw_length=len(raw))
+            with get_tracer().span("response.extract", mode="complete"):
+                text = extract_plain_message(raw)
+            yield text
+            return
         
-        # Execute crew and stream response
+        extractor = _StreamingMessageExtractor(require_marker=False)
+        async for message_chunk in llm.astream(messages):
+            if getattr(message_chunk, "usage_metadata", None):
+                usage.update(message_chunk.usage_metadata)
+            text = extractor.feed(str(message_chunk.content or ""))
+            if text:
+                yield text
+        tail = extractor.finish()
+        if tail:
+            yield tail
+        logger.info("LLM response streamed", path=ROUTE_DIRECT, tier=tier.name, streamed=extractor.emitted_any)
+    
+    async def _run_crew(
+        self,
+        task_description: str,
+        admission: KickoffAdmission,
+    ) -> AsyncGenerator[str, None]:
+        """Kick off a pooled crew for the task and yield the reply text."""
+        # For MVP: Create a simple task for the orchestrator
+        from crewai import Task
+
+        # Check out a crew for this request only; it goes back to the
+        # pool when its kickoff finishes (see _start_kickoff)
+        with get_tracer().span("crew.pool_acquire"):
+            crew = await self.crew_pool.acquire()
         try:
-            # For MVP: Execute crew and yield response chunks
-            # In production, this would use streaming API
-            import asyncio
-            
-            # Run crew execution in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self.crew.kickoff)
-            
-            # Stream plain text only; extract from JSON / markdown if model returns that
-            raw = str(result).strip()
-            logger.info(
-                "LLM response received",
-                raw_length=len(raw),
-                preview=(raw[:80] + "..." if len(raw) > 80 else raw),
+            task = Task(
+                description=task_description,
+                agent=crew.agents[0],  # Orchestrator agent
+                expected_output=self.chat_prompt.expected_output,
             )
-            response_text = _extract_plain_message_from_response(raw)
-            for char in response_text:
-                yield char
-                # Small delay to simulate streaming
-                await asyncio.sleep(0.02)
-                
-        except Exception as e:
-            logger.error("Error processing chat message", error=str(e), exc_info=True)
-            import asyncio
-            error_message = f"I apologize, but I encountered an error: {str(e)}"
-            for char in error_message:
-                yield char
-                await asyncio.sleep(0.02)
+            crew.tasks = [task]
+        except Exception:
+            self.crew_pool.release(crew)
+            raise
+        
+        if self.settings.ENABLE_STREAMING:
+            async for chunk in self._stream_kickoff(crew, admission):
+                yield chunk
+            return
+        
+        # Run crew execution on the kickoff executor to avoid blocking
+        result = await self._start_kickoff(crew, admission)
+        
+        # Stream plain text only; extract from JSON / markdown if model returns that
+        raw = str(result).strip()
+        logger.info(
+            "LLM response received",
+            raw_length=len(raw),
+            preview=(raw[:80] + "..." if len(raw) > 80 else raw),
+        )
+        # Framing into SSE events is left to the API layer (see api/chat.py)
+        with get_tracer().span("response.extract", mode="complete"):
+            text = extract_plain_message(raw)
+        yield text
+    
+    def _start_kickoff(
+        self,
+        crew: Crew,
+        admission: KickoffAdmission,
+        sink: Optional[Callable[[Any], None]] = None,
+    ) -> asyncio.Future:
+        """
+        Run crew.kickoff on the kickoff executor and release the crew when it finishes.
+        
+        The crew is released from the future's done callback rather than by the
+        caller, so a client that disconnects mid-stream cannot hand a crew back
+        to the pool while its kickoff is still running. The admission is
+        released by the executor once the kickoff returns.
+        """
+        # Bind the sink in a copied context so only this kickoff feeds it
+        ctx = contextvars.copy_context()
+        ctx.run(_token_sink.set, sink)
+        tracer = get_tracer()
+        queue_wait = tracer.start_span("kickoff.queue_wait")
+        
+        def kickoff() -> Any:
+            queue_wait.end()
+            # Active in the kickoff's context: LLM calls and tools nest under it
+            with tracer.span("crew.kickoff"):
+                return crew.kickoff()
+        
+        future = self.kickoff_executor.run(admission, ctx.run, kickoff)
+        future.add_done_callback(lambda _: self.crew_pool.release(crew))
+        return future
+    
+    async def _stream_kickoff(self, crew: Crew, admission: KickoffAdmission) -> AsyncGenerator[str, None]:
+        """
+        Run crew kickoff and forward LLM tokens as they arrive.
+        
+        Tokens reach the event loop through a queue fed by _StreamingCrewLLM from
+        the executor thread. Only the final answer is forwarded; intermediate ReAct
+        steps are dropped. If nothing usable was streamed (e.g. the model does
+        not support streaming), the extracted kickoff result is yielded instead.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def sink(item: Any) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        
+        future = self._start_kickoff(crew, admission, sink)
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        extractor = _StreamingMessageExtractor(require_marker=True)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if item is _GENERATION_END:
+                text = extractor.end_generation()
+            else:
+                text = extractor.feed(item)
+            if text:
+                yield text
+        
+        result = await future
+        raw = str(result).strip()
+        logger.info(
+            "LLM response received",
+            raw_length=len(raw),
+            streamed=extractor.emitted_any,
+            preview=(raw[:80] + "..." if len(raw) > 80 else raw),
+        )
+        tail = extractor.finish()
+        if tail:
+            yield tail
+        elif not extractor.emitted_any:
+            yield extract_plain_message(raw)
     
     def get_agent_status(self) -> Dict[str, Any]:
         """
         Get status of agents in the crew and LLM (OpenRouter) config.
         """
         base_url = self.settings.OPENAI_BASE_URL or self.settings.OPENAI_API_BASE or None
+        crew = self.crew_pool.template
         out = {
-            "crew_initialized": self.crew is not None,
-            "agent_count": len(self.crew.agents) if self.crew else 0,
+            "crew_initialized": crew is not None,
+            "agent_count": len(crew.agents),
             "agents": [
                 {
                     "role": agent.role,
                     "goal": agent.goal[:100] + "..." if len(agent.goal) > 100 else agent.goal,
                 }
-                for agent in (self.crew.agents if self.crew else [])
+                for agent in crew.agents
             ],
-            "process": str(self.crew.process) if self.crew else None,
+            "process": str(crew.process),
+            "crew_pool": {
+                "size": self.crew_pool.size,
+                "idle": self.crew_pool.idle,
+            },
+            "executor": {
+                **self.kickoff_executor.stats(),
+                "crewai_max_rpm": self.settings.CREWAI_MAX_RPM,
+            },
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "single_flight": self.single_flight.stats() if self.single_flight else None,
+            "workflow_state": get_workflow_state_manager().stats(),
+            "routes": {
+                "fast_path_enabled": self.settings.CHAT_FAST_PATH_ENABLED,
+                **self._route_counts,
+            },
+            "model_routing": self.model_router.stats(),
+            "history": self.history_manager.stats(),
+            "prompt": {
+                "id": self.chat_prompt.id,
+                "version": self.chat_prompt.version,
+            },
             "llm": {
                 "provider": "openrouter",
                 "base_url": base_url or "(default)",
-                "model": self.settings.OPENAI_MODEL,
+                "model": self.model_router.complex.model,
                 "api_key_set": bool(self.settings.OPENAI_API_KEY),
             },
         }
         return out
     
+    def shutdown(self) -> None:
+        """Release executor threads on application shutdown."""
+        self.kickoff_executor.shutdown()
+        self.history_manager.shutdown()
+        if self.single_flight is not None:
+            self.single_flight.shutdown()
+    
     # Stub methods for future implementation
     
     def initiate_onboarding(self, employee_data: Dict[str, Any]) -> str:
@@ -291,12 +840,16 @@ Instructions:
         Returns:
             Workflow ID
             
-        Note: Stub for future implementation - will create full workflow
+        Note: Creates the workflow record; task execution is not started yet
         """
-        logger.info("Initiate onboarding called (stub)", employee_id=employee_data.get("employee_id"))
-        workflow_id = f"workflow-{employee_data.get('employee_id', 'unknown')}"
-        logger.warning("initiate_onboarding is a stub - full implementation pending")
-        return workflow_id
+        employee_id = employee_data.get("employee_id", "unknown")
+        logger.info("Initiate onboarding called", employee_id=employee_id)
+        workflow = get_workflow_state_manager().create(
+            workflow_id=new_workflow_id(employee_id),
+            employee_id=employee_id,
+            metadata=employee_data,
+        )
+        return workflow["workflow_id"]
     
     def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """
@@ -307,13 +860,9 @@ Instructions:
             
         Returns:
             Dictionary with workflow status
-            
-        Note: Stub for future implementation - will query database
         """
-        logger.info("Get workflow status called (stub)", workflow_id=workflow_id)
-        logger.warning("get_workflow_status is a stub - database implementation pending")
-        return {
-            "workflow_id": workflow_id,
-            "status": "unknown",
-            "note": "Stub - database implementation pending"
-        }
+        logger.info("Get workflow status called", workflow_id=workflow_id)
+        workflow = get_workflow_state_manager().get(workflow_id)
+        if workflow is None:
+            return {"workflow_id": workflow_id, "status": "unknown"}
+        return {**workflow, "status": workflow["state"]}
@@ -0,0 +1,264 @@
+"""
+Conversation History Manager
+
+Keeps the chat prompt's history within a token budget. The most recent
+turns are kept verbatim as long as they fit; older turns are replaced by a
+rolling summary, so prompt size (and with it LLM latency and cost) stays
+bounded however long a conversation runs.
+
+Summaries are cached by a digest of the turns they cover. A request never
+waits for the LLM: it uses the longest cached summary of its older turns,
+adds a short extractive digest of anything that summary does not cover yet,
+and refreshes the rolling summary in the background for the next turn.
+
+Reference:
+- SAD Section 4.3: Chat Interface Specifications
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+
+from utils.lru_cache import TTLLRUCache
+
+logger = structlog.get_logger(__name__)
+
+# (previous summary, transcript of newly dropped turns) -> new summary
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+# Characters of each turn kept in the extractive digest, and how many of the
+# most recent uncovered turns it lists
+_DIGEST_USER_CHARS = 200
+_DIGEST_ASSISTANT_CHARS = 120
+_DIGEST_MAX_TURNS = 20
+# Below this many spare tokens the digest is left out
+_DIGEST_MIN_TOKENS = 16
+
+
+class CompactedHistory:
+    """History as it goes into the prompt."""
+
+    def __init__(self, turns: List[Tuple[str, str]], summary: str, tokens: int, dropped: int):
+        self.turns = turns  # (speaker, content), oldest first
+        self.summary = summary
+        self.tokens = tokens
+        self.dropped = dropped
+
+    def as_messages(self) -> List[Dict[str, str]]:
+        """Role/content dicts (summary first) for cache keys and logging."""
+        messages = [{"role": "summary", "content": self.summary}] if self.summary else []
+        messages.extend({"role": speaker, "content": content} for speaker, content in self.turns)
+        return messages
+
+
+def _normalize(conversation_history: Optional[Iterable[Dict[str, str]]]) -> List[Tuple[str, str]]:
+    turns = []
+    for m in conversation_history or []:
+        content = (m.get("content") or "").strip()
+        if content:
+            role = (m.get("role") or "user").strip().lower()
+            turns.append(("User" if role == "user" else "Assistant", content))
+    return turns
+
+
+def _transcript(turns: Iterable[Tuple[str, str]]) -> str:
+    return "\n".join(f"{speaker}: {content}" for speaker, content in turns)
+
+
+class HistoryManager:
+    """
+    Token-budgeted conversation history with a cached rolling summary.
+
+    Args:
+        budget_tokens: Tokens available for the verbatim recent turns
+        summary_max_tokens: Tokens available for the summary of older turns
+        count_tokens: Local tokenizer (see utils/token_counter.py)
+        summarizer: Async LLM summarizer; None keeps extractive digests only
+        cache_size: Rolling summaries kept in memory
+        cache_ttl: Seconds a summary stays cached
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        summary_max_tokens: int,
+        count_tokens: Callable[[str], int],
+        summarizer: Optional[Summarizer] = None,
+        cache_size: int = 2048,
+        cache_ttl: float = 0,
+    ):
+        self.budget_tokens = budget_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.count_tokens = count_tokens
+        self.summarizer = summarizer
+        self._summaries = TTLLRUCache(max_entries=cache_size, ttl_seconds=cache_ttl)
+        # Per-turn token counts: session turns are re-sent every request and
+        # their strings are the same objects, so lookups are hash-cached
+        self._turn_tokens = TTLLRUCache(max_entries=cache_size * 4)
+        # Formatted prompt sections by compacted window (summary + kept turns)
+        self._rendered = TTLLRUCache(max_entries=cache_size)
+        self._inflight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "compactions": 0,
+            "turns_dropped": 0,
+            "summary_full_hits": 0,
+            "summary_partial_hits": 0,
+            "summary_misses": 0,
+            "summaries_built": 0,
+            "summaries_failed": 0,
+            "history_tokens_total": 0,
+        }
+
+    def compact(self, conversation_history: Optional[Iterable[Dict[str, str]]]) -> CompactedHistory:
+        """Fit the history into the budget; older turns become the summary."""
+        turns = _normalize(conversation_history)
+        kept: List[Tuple[str, str]] = []
+        used = 0
+        # Newest first; tokenizing stops once the budget is spent
+        for speaker, content in reversed(turns):
+            cost = self._turn_cost(speaker, content)
+            if used + cost > self.budget_tokens:
+                if not kept:
+                    # The latest turn alone exceeds the budget: keep its start,
+                    # leaving room for the speaker label
+                    room = self.budget_tokens - self.count_tokens(f"{speaker}: ")
+                    content = self._truncate(content, max(1, room))
+                    kept.append((speaker, content))
+                    used = self.count_tokens(f"{speaker}: {content}\n")
+                break
+            kept.append((speaker, content))
+            used += cost
+        kept.reverse()
+
+        dropped = turns[:len(turns) - len(kept)]
+        summary = self._summary_for(dropped) if dropped else ""
+        if summary:
+            used += self.count_tokens(summary)
+
+        self._stats["compactions"] += 1
+        self._stats["turns_dropped"] += len(dropped)
+        self._stats["history_tokens_total"] += used
+        return CompactedHistory(kept, summary, used, len(dropped))
+
+    def render(self, history: CompactedHistory) -> str:
+        """History section of the chat prompt; reused while the window is unchanged."""
+        key = (history.summary, tuple(history.turns))
+        blob = self._rendered.get(key)
+        if blob is not None:
+            return blob
+        blob = ""
+        if history.summary:
+            blob += "\n\nSummary of earlier conversation:\n" + history.summary
+        if history.turns:
+            blob += "\n\nPrevious conversation:\n" + _transcript(history.turns)
+        if blob:
+            blob += "\n\n"
+        self._rendered.set(key, blob)
+        return blob
+
+    def _turn_cost(self, speaker: str, content: str) -> int:
+        key = (speaker, content)
+        cost = self._turn_tokens.get(key)
+        if cost is None:
+            cost = self.count_tokens(f"{speaker}: {content}\n")
+            self._turn_tokens.set(key, cost)
+        return cost
+
+    def _truncate(self, text: str, max_tokens: int, keep_end: bool = False) -> str:
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        # Shrink proportionally until it fits (converges in a few steps)
+        while text and self.count_tokens(text + " …") > max_tokens:
+            size = int(len(text) * max_tokens / max(1, self.count_tokens(text + " …")) * 0.95)
+            text = text[-size:] if keep_end else text[:size]
+        return ("… " + text) if keep_end else (text + " …")
+
+    def _summary_for(self, dropped: List[Tuple[str, str]]) -> str:
+        digests = self._prefix_digests(dropped)
+        covered, summary = 0, ""
+        for n in range(len(dropped), 0, -1):
+            cached = self._summaries.get(digests[n - 1])
+            if cached is not None:
+                covered, summary = n, cached
+                break
+
+        if covered == len(dropped):
+            self._stats["summary_full_hits"] += 1
+            return summary
+        self._stats["summary_partial_hits" if covered else "summary_misses"] += 1
+
+        uncovered = dropped[covered:]
+        if self.summarizer is not None:
+            self._refresh(digests[-1], summary, uncovered)
+        # The cached summary comes first; the digest of newer turns gets what is left
+        remaining = self.summary_max_tokens - (self.count_tokens(summary) if summary else 0)
+        if remaining < _DIGEST_MIN_TOKENS:
+            return summary
+        digest = self._truncate(self._extractive_digest(uncovered), remaining, keep_end=True)
+        return f"{summary}\n{digest}" if summary else digest
+
+    @staticmethod
+    def _prefix_digests(turns: List[Tuple[str, str]]) -> List[str]:
+        """Digest of turns[:1], turns[:2], ... in one pass."""
+        h = hashlib.sha256()
+        digests = []
+        for speaker, content in turns:
+            h.update(speaker.encode("utf-8"))
+            h.update(b"\x1f")
+            h.update(content.encode("utf-8"))
+            h.update(b"\x1e")
+            digests.append(h.copy().hexdigest()[:32])
+        return digests
+
+    @staticmethod
+    def _extractive_digest(turns: List[Tuple[str, str]]) -> str:
+        lines = []
+        for speaker, content in turns[-_DIGEST_MAX_TURNS:]:
+            limit = _DIGEST_USER_CHARS if speaker == "User" else _DIGEST_ASSISTANT_CHARS
+            text = " ".join(content.split())
+            lines.append(f"- {speaker}: {text[:limit]}{'…' if len(text) > limit else ''}")
+        return "\n".join(lines)
+
+    def _refresh(self, digest: str, previous: str, uncovered: List[Tuple[str, str]]) -> None:
+        """Build the rolling summary for these turns in the background."""
+        if digest in self._inflight:
+            return
+        self._inflight.add(digest)
+        # A first request with a very long history must not become a huge summary prompt
+        transcript = self._truncate(_transcript(uncovered), self.budget_tokens, keep_end=True)
+        task = asyncio.create_task(self._build_summary(digest, previous, transcript))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _build_summary(self, digest: str, previous: str, transcript: str) -> None:
+        try:
+            summary = (await self.summarizer(previous, transcript)).strip()
+            if summary:
+                self._summaries.set(digest, self._truncate(summary, self.summary_max_tokens))
+                self._stats["summaries_built"] += 1
+        except Exception as e:
+            self._stats["summaries_failed"] += 1
+            logger.warning("History summary failed", error=str(e))
+        finally:
+            self._inflight.discard(digest)
+
+    def stats(self) -> Dict[str, Any]:
+        compactions = self._stats["compactions"]
+        return {
+            "budget_tokens": self.budget_tokens,
+            "summary_max_tokens": self.summary_max_tokens,
+            "llm_summaries": self.summarizer is not None,
+            **{k: v for k, v in self._stats.items() if k != "history_tokens_total"},
+            "avg_history_tokens": round(self._stats["history_tokens_total"] / compactions, 1) if compactions else 0.0,
+            "cached_summaries": len(self._summaries),
+            "turn_token_cache": self._turn_tokens.stats(),
+            "render_cache": self._rendered.stats(),
+        }
+
+    def shutdown(self) -> None:
+        """Cancel summaries still being built."""
+        for task in list(self._tasks):
+            task.cancel()
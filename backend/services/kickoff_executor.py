@@ -0,0 +1,174 @@
+"""
+Crew Kickoff Executor
+
+Dedicated, bounded thread pool for blocking CrewAI kickoffs.
+
+Kickoffs used to run on the event loop's default executor, which is sized
+from the CPU count and shared with everything else in the process. This
+executor has its own workers plus a bounded admission queue: once
+``max_workers + queue_size`` requests are admitted, new ones are rejected
+immediately so the API can answer 503 with Retry-After instead of queueing
+without limit.
+
+Reference:
+- SAD Section 5.3: CrewAI Integration Layer Requirements
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import structlog
+
+from utils.metrics import KICKOFF_ACTIVE_WORKERS, KICKOFF_DURATION, KICKOFF_QUEUE_DEPTH
+
+logger = structlog.get_logger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the kickoff admission queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Kickoff queue is full")
+        self.retry_after = retry_after
+
+
+class KickoffAdmission:
+    """
+    Ticket for one admitted request.
+
+    Holds a slot in the executor from admission until the request's kickoff
+    finishes (or the request ends without one). Releasing is idempotent.
+    """
+
+    def __init__(self, executor: "KickoffExecutor"):
+        self._executor = executor
+        self.admitted_at = time.perf_counter()
+        self.started = False
+        self._released = False
+
+    def release(self) -> None:
+        self._executor._release(self)
+
+    def release_if_unused(self) -> None:
+        """Free the slot of a request that ended without reaching a kickoff."""
+        if not self.started:
+            self.release()
+
+
+class KickoffExecutor:
+    """Dedicated thread pool with a bounded admission queue for crew kickoffs."""
+
+    def __init__(self, max_workers: int, queue_size: int, retry_after: int):
+        if max_workers < 1:
+            raise ValueError("Kickoff executor needs at least one worker")
+        self.max_workers = max_workers
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-kickoff")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._active = 0
+        self._wait_ms: deque = deque(maxlen=512)
+        self._counters = {"admitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        KICKOFF_QUEUE_DEPTH.set_function(lambda: max(0, self._admitted - self._active))
+        KICKOFF_ACTIVE_WORKERS.set_function(lambda: self._active)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_size
+
+    def admit(self) -> KickoffAdmission:
+        """
+        Reserve a slot for a request, or fail fast when the queue is full.
+
+        Raises:
+            ExecutorSaturatedError: if max_workers + queue_size requests are
+                already admitted
+        """
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._counters["rejected"] += 1
+                raise ExecutorSaturatedError(self.retry_after)
+            self._admitted += 1
+            self._counters["admitted"] += 1
+        return KickoffAdmission(self)
+
+    def _release(self, admission: KickoffAdmission) -> None:
+        # Called from the event loop and from pool callbacks; only the first release counts
+        with self._lock:
+            if admission._released:
+                return
+            admission._released = True
+            self._admitted -= 1
+
+    def run(self, admission: KickoffAdmission, fn: Callable[..., Any], *args: Any) -> asyncio.Future:
+        """
+        Run ``fn(*args)`` on a kickoff worker; the admission is released when it finishes.
+
+        The release is a done-callback on the pool future, so it also happens
+        when the request is cancelled before a worker picks the call up.
+
+        Returns:
+            Awaitable future bound to the running event loop
+        """
+        admission.started = True
+
+        def call() -> Any:
+            started = time.perf_counter()
+            with self._lock:
+                self._active += 1
+                self._wait_ms.append((started - admission.admitted_at) * 1000)
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                KICKOFF_DURATION.observe(time.perf_counter() - started, "ok" if ok else "error")
+                with self._lock:
+                    self._active -= 1
+                    self._counters["completed" if ok else "failed"] += 1
+
+        try:
+            future = self._pool.submit(call)
+        except Exception:
+            admission.release()
+            raise
+        future.add_done_callback(lambda _: admission.release())
+        return asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait time and worker usage for sizing against CREWAI_MAX_RPM."""
+        with self._lock:
+            waits = sorted(self._wait_ms)
+            admitted = self._admitted
+            active = self._active
+            counters = dict(self._counters)
+        return {
+            "max_workers": self.max_workers,
+            "queue_capacity": self.queue_size,
+            "active_workers": active,
+            "queue_depth": max(0, admitted - active),
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "p95": round(_percentile(waits, 0.95), 2),
+                "max": round(waits[-1], 2) if waits else 0.0,
+            },
+            **counters,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running kickoffs are left to finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("Kickoff executor shut down")
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
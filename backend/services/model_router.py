@@ -0,0 +1,263 @@
+"""
+Chat Model Router
+
+Picks the model tier for each chat answer. A cheap local heuristic
+(message length, number of questions, reasoning and multi-step phrasing,
+long conversations) classifies direct-path messages as simple or complex:
+simple FAQs go to a small, fast model and everything else, including every
+crew kickoff, to the stronger one. Tiers (model, temperature, output cap
+and token prices) come from config/models.yaml; MODEL_SIMPLE and
+MODEL_COMPLEX override the tier models. Routing is off unless
+MODEL_ROUTING_ENABLED is set, and both tiers default to OPENAI_MODEL.
+
+Per tier, the router records generation latency, prompt and completion
+tokens and the estimated cost from the configured prices.
+
+Reference:
+- SAD Section 3.2: Task Orchestration Specification
+- SAD Section 3.3: CrewAI Framework Configuration
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+import yaml
+
+from services.chat_router import ROUTE_CREW
+from utils.config import get_settings
+from utils.metrics import CHAT_MODEL_COST, CHAT_MODEL_LATENCY, CHAT_MODEL_TOKENS
+from utils.token_counter import get_token_counter
+
+logger = structlog.get_logger(__name__)
+
+TIER_SIMPLE = "simple"
+TIER_COMPLEX = "complex"
+
+MODEL_TIERS = (TIER_SIMPLE, TIER_COMPLEX)
+
+
+class ModelTier:
+    """One row of the model table."""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        input_cost_per_mtok: float = 0.0,
+        output_cost_per_mtok: float = 0.0,
+    ):
+        self.name = name
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.input_cost_per_mtok = input_cost_per_mtok
+        self.output_cost_per_mtok = output_cost_per_mtok
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated USD cost of one call."""
+        return (
+            prompt_tokens * self.input_cost_per_mtok
+            + completion_tokens * self.output_cost_per_mtok
+        ) / 1_000_000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "input_cost_per_mtok": self.input_cost_per_mtok,
+            "output_cost_per_mtok": self.output_cost_per_mtok,
+        }
+
+
+class ComplexityClassifier:
+    """Local heuristic: simple unless any complexity signal fires."""
+
+    def __init__(
+        self,
+        simple_max_tokens: int,
+        max_questions: int,
+        complex_patterns: List[str],
+        count_tokens: Callable[[str], int],
+    ):
+        self.simple_max_tokens = simple_max_tokens
+        self.max_questions = max_questions
+        self.complex_patterns = list(complex_patterns)
+        self._complex_re = (
+            re.compile("|".join(f"(?:{p})" for p in complex_patterns), re.IGNORECASE)
+            if complex_patterns else None
+        )
+        self._count_tokens = count_tokens
+
+    def classify(self, message: str, has_summary: bool = False) -> str:
+        """
+        Classify a chat message.
+
+        Args:
+            message: User's chat message
+            has_summary: The conversation is long enough that older turns
+                were summarized; answers then depend on more context
+
+        Returns:
+            TIER_SIMPLE or TIER_COMPLEX
+        """
+        if has_summary:
+            return TIER_COMPLEX
+        if message.count("?") > self.max_questions:
+            return TIER_COMPLEX
+        if self._count_tokens(message) > self.simple_max_tokens:
+            return TIER_COMPLEX
+        if self._complex_re is not None and self._complex_re.search(message):
+            return TIER_COMPLEX
+        return TIER_SIMPLE
+
+
+class ModelRouter:
+    """Model tier selection plus per-tier latency, token and cost accounting."""
+
+    def __init__(
+        self,
+        tiers: Dict[str, ModelTier],
+        classifier: ComplexityClassifier,
+        enabled: bool = True,
+    ):
+        missing = [name for name in MODEL_TIERS if name not in tiers]
+        if missing:
+            raise ValueError(f"Model table is missing tiers: {missing}")
+        self.tiers = tiers
+        self.classifier = classifier
+        self.enabled = enabled
+        self.version = self._version()
+        self._lock = threading.Lock()
+        self._counters = {
+            name: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+            for name in tiers
+        }
+        self._latency_ms = {name: deque(maxlen=512) for name in tiers}
+
+    def _version(self) -> str:
+        """Digest of everything that changes which model writes an answer."""
+        parts = [f"enabled={self.enabled}"]
+        parts.extend(f"{name}={self.tiers[name].as_dict()!r}" for name in sorted(self.tiers))
+        parts.append(repr((
+            self.classifier.simple_max_tokens,
+            self.classifier.max_questions,
+            self.classifier.complex_patterns,
+        )))
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def complex(self) -> ModelTier:
+        return self.tiers[TIER_COMPLEX]
+
+    def select(self, message: str, route: str, has_summary: bool = False) -> ModelTier:
+        """Tier for one answer; crew kickoffs always use the complex tier."""
+        if not self.enabled or route == ROUTE_CREW:
+            return self.complex
+        return self.tiers[self.classifier.classify(message, has_summary)]
+
+    def record(
+        self,
+        tier: ModelTier,
+        route: str,
+        seconds: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """Account one finished answer."""
+        cost = tier.cost(prompt_tokens, completion_tokens)
+        CHAT_MODEL_LATENCY.observe(seconds, tier.name, route)
+        CHAT_MODEL_TOKENS.inc(tier.name, "prompt", amount=prompt_tokens)
+        CHAT_MODEL_TOKENS.inc(tier.name, "completion", amount=completion_tokens)
+        CHAT_MODEL_COST.inc(tier.name, amount=cost)
+        with self._lock:
+            counters = self._counters[tier.name]
+            counters["requests"] += 1
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+            counters["cost_usd"] += cost
+            self._latency_ms[tier.name].append(seconds * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {name: dict(c) for name, c in self._counters.items()}
+            samples = {name: sorted(values) for name, values in self._latency_ms.items()}
+        tiers = {}
+        for name, tier in self.tiers.items():
+            c = counters[name]
+            values = samples[name]
+            tiers[name] = {
+                **tier.as_dict(),
+                **c,
+                "cost_usd": round(c["cost_usd"], 6),
+                "avg_cost_usd": round(c["cost_usd"] / c["requests"], 8) if c["requests"] else 0.0,
+                "p50_ms": round(values[len(values) // 2], 1) if values else 0.0,
+                "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 1) if values else 0.0,
+            }
+        return {"enabled": self.enabled, "version": self.version, "tiers": tiers}
+
+
+def load_model_router(config_path: str = None) -> ModelRouter:
+    """
+    Build the model router from the YAML model table and settings.
+
+    Args:
+        config_path: Path to models.yaml. Defaults to MODEL_ROUTING_CONFIG,
+            or backend/config/models.yaml when that is empty
+
+    Returns:
+        ModelRouter with every tier resolved
+    """
+    settings = get_settings()
+    if config_path is None:
+        config_path = settings.MODEL_ROUTING_CONFIG or Path(__file__).parent.parent / "config" / "models.yaml"
+
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Model configuration file not found: {config_path}")
+
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+
+    overrides = {TIER_SIMPLE: settings.MODEL_SIMPLE, TIER_COMPLEX: settings.MODEL_COMPLEX}
+    tiers = {}
+    for name, tier_config in (config.get('tiers') or {}).items():
+        tier_config = tier_config or {}
+        temperature = tier_config.get('temperature')
+        tiers[name] = ModelTier(
+            name,
+            # An empty model falls back to OPENAI_MODEL
+            overrides.get(name) or tier_config.get('model') or settings.OPENAI_MODEL,
+            settings.OPENAI_TEMPERATURE if temperature is None else float(temperature),
+            max_tokens=tier_config.get('max_tokens'),
+            input_cost_per_mtok=float(tier_config.get('input_cost_per_mtok', 0.0)),
+            output_cost_per_mtok=float(tier_config.get('output_cost_per_mtok', 0.0)),
+        )
+
+    classifier_config = config.get('classifier') or {}
+    classifier = ComplexityClassifier(
+        simple_max_tokens=int(classifier_config.get('simple_max_tokens', 40)),
+        max_questions=int(classifier_config.get('max_questions', 1)),
+        complex_patterns=classifier_config.get('complex_patterns') or [],
+        count_tokens=get_token_counter(settings.OPENAI_MODEL),
+    )
+    router = ModelRouter(tiers, classifier, enabled=settings.MODEL_ROUTING_ENABLED)
+    if router.enabled and router.tiers[TIER_SIMPLE].model == router.complex.model:
+        logger.warning(
+            "Model routing is enabled but both tiers use the same model; set MODEL_SIMPLE",
+            model=router.complex.model,
+        )
+    logger.info(
+        "Loaded model routing table",
+        enabled=router.enabled,
+        models={name: tier.model for name, tier in tiers.items()},
+        path=str(config_path),
+    )
+    return router
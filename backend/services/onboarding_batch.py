@@ -0,0 +1,308 @@
+"""
+Onboarding Batch Runner
+
+Starts onboarding for a whole cohort at once. All workflow records of a
+batch are created in one database transaction, then the workflows are fanned
+out across the DAG orchestrator with bounded concurrency. Every state change
+is appended to the batch's event log, which clients can follow as SSE.
+
+Batch progress and the event log are kept in the shared state backend
+(services/shared_state.py), so any worker can answer status requests and
+stream events for a batch running on another one. Followers on the worker
+running the batch are woken on each event; others poll.
+
+Reference:
+- SAD Section 3.2: Task Orchestration Specification
+- SAD Section 5.1: API Architecture Requirements
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+import structlog
+
+from services.shared_state import get_shared_store
+from services.workflow_orchestrator import STATUS_COMPLETED, FullWorkflowOrchestrator
+from services.workflow_state import (
+    STATE_COMPLETED,
+    STATE_FAILED,
+    STATE_IN_PROGRESS,
+    WorkflowStateManager,
+    get_workflow_state_manager,
+    new_workflow_id,
+)
+from utils.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+BATCH_RUNNING = "running"
+BATCH_COMPLETED = "completed"
+
+SHARED_NAMESPACE = "onboarding_batches"
+
+# How often followers on other workers check the shared store for new events
+_POLL_SECONDS = 0.25
+
+
+def _workflows_key(batch_id: str) -> str:
+    return f"{batch_id}:workflows"
+
+
+def _event_key(batch_id: str, seq: int) -> str:
+    return f"{batch_id}:event:{seq}"
+
+
+def _summary(progress: Dict[str, Any], workflows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    finished_at = progress["finished_at"] or time.time()
+    return {
+        "batch_id": progress["batch_id"],
+        "status": progress["status"],
+        "total": progress["total"],
+        "in_progress": progress["in_progress"],
+        "completed": progress["completed"],
+        "failed": progress["failed"],
+        "elapsed_seconds": round(finished_at - progress["created_at"], 3),
+        "workflows": workflows,
+    }
+
+
+class OnboardingBatch:
+    """One running cohort: its workflows and counters, on the worker that runs it."""
+
+    def __init__(self, batch_id: str, workflows: List[Dict[str, Any]]):
+        self.batch_id = batch_id
+        self.workflows = [
+            {"workflow_id": w["workflow_id"], "employee_id": w["employee_id"]} for w in workflows
+        ]
+        self.status = BATCH_RUNNING
+        self.counts = {STATE_IN_PROGRESS: 0, STATE_COMPLETED: 0, STATE_FAILED: 0}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Bumped after each event is stored; wakes local followers
+        self.published = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self) -> Dict[str, Any]:
+        """The counters as stored in the shared backend."""
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "total": len(self.workflows),
+            "in_progress": self.counts[STATE_IN_PROGRESS],
+            "completed": self.counts[STATE_COMPLETED],
+            "failed": self.counts[STATE_FAILED],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return _summary(self.progress(), self.workflows)
+
+
+class OnboardingBatchRunner:
+    """
+    Runs cohorts of onboarding workflows.
+
+    At most ``max_concurrency`` workflows of all batches run at once; their
+    tasks share the orchestrator's worker pool (WORKFLOW_MAX_WORKERS), so
+    throughput scales with the number of workers.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Optional[FullWorkflowOrchestrator] = None,
+        state_manager: Optional[WorkflowStateManager] = None,
+        max_concurrency: Optional[int] = None,
+        store: Optional[Any] = None,
+    ):
+        settings = get_settings()
+        self.orchestrator = orchestrator or FullWorkflowOrchestrator()
+        self.state_manager = state_manager or get_workflow_state_manager()
+        self.max_concurrency = max_concurrency or settings.ONBOARDING_BATCH_CONCURRENCY
+        self.store = store if store is not None else get_shared_store()
+        # Batches stay queryable this long after their last event
+        self.retention_seconds = settings.ONBOARDING_BATCH_RETENTION_SECONDS
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._running: Dict[str, OnboardingBatch] = {}
+        logger.info("Onboarding batch runner initialized", max_concurrency=self.max_concurrency)
+
+    async def start(self, employees: List[Dict[str, Any]]) -> OnboardingBatch:
+        """
+        Create all workflow records in one transaction and start the batch.
+
+        Args:
+            employees: Onboarding inputs (employee_id, role, department, start_date)
+
+        Returns:
+            The running batch
+        """
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        records = [
+            {
+                "workflow_id": new_workflow_id(employee["employee_id"]),
+                "employee_id": employee["employee_id"],
+                "metadata": {**employee, "batch_id": batch_id},
+            }
+            for employee in employees
+        ]
+        workflows = await asyncio.to_thread(self.state_manager.create_many, records)
+        batch = OnboardingBatch(batch_id, workflows)
+        await asyncio.to_thread(self._save, batch)
+        self._running[batch_id] = batch
+        batch.task = asyncio.create_task(self._run_batch(batch, employees))
+        logger.info("Onboarding batch started", batch_id=batch_id, size=len(workflows))
+        return batch
+
+    async def summary(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Progress counters and workflow ids of a batch run by any worker; None when unknown."""
+        batch = self._running.get(batch_id)
+        if batch is not None:
+            return batch.summary()
+        return await asyncio.to_thread(self._load_summary, batch_id)
+
+    async def follow(self, batch_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Replay all events so far, then yield new ones until the batch finishes."""
+        seen = 0
+        while True:
+            batch = self._running.get(batch_id)
+            published = batch.published if batch is not None else 0
+            progress, events = await asyncio.to_thread(self._load_events, batch_id, seen)
+            if progress is None:
+                return
+            for event in events:
+                yield event
+                if event["event"] == "batch_finished":
+                    return
+            seen += len(events)
+            if batch is not None:
+                async with batch.changed:
+                    await batch.changed.wait_for(lambda: batch.published != published)
+            else:
+                await asyncio.sleep(_POLL_SECONDS)
+
+    def _save(self, batch: OnboardingBatch) -> None:
+        """Store the workflow list and counters (blocking)."""
+        self.store.set(SHARED_NAMESPACE, _workflows_key(batch.batch_id), batch.workflows, self.retention_seconds)
+        self.store.update(
+            SHARED_NAMESPACE,
+            batch.batch_id,
+            lambda stored: {**batch.progress(), "events": (stored or {}).get("events", 0)},
+            self.retention_seconds,
+        )
+
+    def _append(self, batch: OnboardingBatch, event: Dict[str, Any]) -> None:
+        """Store the current counters and the next event of the log (blocking)."""
+        progress = self.store.update(
+            SHARED_NAMESPACE,
+            batch.batch_id,
+            lambda stored: {**batch.progress(), "events": (stored or {}).get("events", 0) + 1},
+            self.retention_seconds,
+        )
+        self.store.set(
+            SHARED_NAMESPACE, _event_key(batch.batch_id, progress["events"]), event, self.retention_seconds
+        )
+
+    def _load_summary(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        progress = self.store.get(SHARED_NAMESPACE, batch_id)
+        if progress is None:
+            return None
+        return _summary(progress, self.store.get(SHARED_NAMESPACE, _workflows_key(batch_id)) or [])
+
+    def _load_events(self, batch_id: str, seen: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Counters and the stored events after the first ``seen`` (blocking)."""
+        progress = self.store.get(SHARED_NAMESPACE, batch_id)
+        if progress is None:
+            return None, []
+        events = []
+        for seq in range(seen + 1, progress["events"] + 1):
+            event = self.store.get(SHARED_NAMESPACE, _event_key(batch_id, seq))
+            if event is None:
+                # Being written by the worker running the batch; read it next round
+                break
+            events.append(event)
+        return progress, events
+
+    async def _publish(self, batch: OnboardingBatch, event: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._append, batch, {"batch_id": batch.batch_id, **event})
+        async with batch.changed:
+            batch.published += 1
+            batch.changed.notify_all()
+
+    async def _run_batch(self, batch: OnboardingBatch, employees: List[Dict[str, Any]]) -> None:
+        try:
+            await asyncio.gather(*(
+                self._run_workflow(batch, workflow, employee)
+                for workflow, employee in zip(batch.workflows, employees)
+            ))
+        finally:
+            batch.status = BATCH_COMPLETED
+            batch.finished_at = time.time()
+            try:
+                await asyncio.to_thread(self._save, batch)
+                await self._publish(batch, {"event": "batch_finished", **batch.summary()})
+            finally:
+                self._running.pop(batch.batch_id, None)
+            logger.info(
+                "Onboarding batch finished",
+                batch_id=batch.batch_id,
+                completed=batch.counts[STATE_COMPLETED],
+                failed=batch.counts[STATE_FAILED],
+            )
+
+    async def _run_workflow(
+        self,
+        batch: OnboardingBatch,
+        workflow: Dict[str, Any],
+        employee: Dict[str, Any],
+    ) -> None:
+        workflow_id = workflow["workflow_id"]
+        async with self._slots:
+            await self._set_state(batch, workflow_id, workflow["employee_id"], STATE_IN_PROGRESS)
+            try:
+                report = await self.orchestrator.run(employee)
+            except Exception as e:
+                logger.error("Batch workflow failed", workflow_id=workflow_id, error=str(e), exc_info=True)
+                report = {"status": STATE_FAILED, "error": str(e)}
+            batch.counts[STATE_IN_PROGRESS] -= 1
+            state = STATE_COMPLETED if report["status"] == STATUS_COMPLETED else STATE_FAILED
+            result = {
+                "wall_time_ms": report.get("wall_time_ms"),
+                "task_status": {
+                    task_id: task["status"] for task_id, task in report.get("tasks", {}).items()
+                },
+            }
+            if "error" in report:
+                result["error"] = report["error"]
+            await self._set_state(batch, workflow_id, workflow["employee_id"], state, result)
+
+    async def _set_state(
+        self,
+        batch: OnboardingBatch,
+        workflow_id: str,
+        employee_id: str,
+        state: str,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        try:
+            await asyncio.to_thread(self.state_manager.transition, workflow_id, state, result)
+        except Exception as e:
+            logger.error("Failed to persist workflow state", workflow_id=workflow_id, error=str(e))
+        batch.counts[state] += 1
+        await self._publish(batch, {
+            "event": "workflow_state",
+            "workflow_id": workflow_id,
+            "employee_id": employee_id,
+            "state": state,
+            **(result or {}),
+        })
+
+    async def shutdown(self) -> None:
+        """Cancel running batches and release the orchestrator's workers."""
+        tasks = [batch.task for batch in list(self._running.values()) if batch.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.orchestrator.shutdown()
@@ -0,0 +1,431 @@
+"""
+LLM Rate Limiter
+
+One requests-per-minute and tokens-per-minute budget for every LLM call the
+service makes: fast-path chat, history summaries, chat crews and onboarding
+workflow crews, in every worker. CREWAI_MAX_RPM alone is enforced per
+``Crew`` object, so with a pool of crews (and several workers) the provider
+saw a multiple of it and answered 429s, each of which cost a full retry.
+
+The limiter sits in the shared httpx transports (utils/llm_factory.py), which
+LangChain clients and CrewAI's litellm calls both use, so nothing has to
+remember to call it. Each chat-completion request is charged one request and
+its estimated tokens (prompt tokens counted locally, plus ``max_tokens`` or
+LLM_RATE_LIMIT_COMPLETION_TOKENS) before it is sent.
+
+Budgets are token buckets refilled continuously at limit/60 per second and
+holding at most LLM_RATE_LIMIT_BURST_SECONDS worth of budget. Bucket levels
+live in the shared state store (services/shared_state.py), so all workers
+draw from the same budget. Async callers debit them with the store's async
+``aupdate``, so a SQLite lock wait never blocks the event loop.
+
+Priority lanes: chat runs in the ``interactive`` lane (the default) and
+onboarding workflows in ``background``. Within a worker, waiting calls are
+served interactive first, then in arrival order. Across workers, background
+calls may not take the last LLM_RATE_LIMIT_INTERACTIVE_RESERVE of a bucket,
+which is kept for chat. A call that cannot get budget within
+LLM_RATE_LIMIT_MAX_WAIT_SECONDS gets a local 429 instead of being sent.
+
+Reference:
+- SAD Section 3.3: CrewAI Framework Configuration
+- SAD Section 5.3: CrewAI Integration Layer Requirements
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import structlog
+
+from services.shared_state import get_shared_store
+from utils.config import get_settings
+from utils.metrics import LLM_RATE_LIMIT_TIMEOUTS, LLM_RATE_LIMIT_UTILIZATION, LLM_RATE_LIMIT_WAIT
+from utils.token_counter import get_token_counter
+
+logger = structlog.get_logger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+# Highest priority first
+LANES = (LANE_INTERACTIVE, LANE_BACKGROUND)
+
+SHARED_NAMESPACE = "llm_rate_limit"
+_BUCKETS_KEY = "buckets"
+
+# How often a waiting call that is not first in line checks again
+_POLL_SECONDS = 0.02
+# Longest single sleep of the first waiter, so a refill is not overslept
+_MAX_SLEEP_SECONDS = 0.25
+
+_lane: ContextVar[str] = ContextVar("llm_priority_lane", default=LANE_INTERACTIVE)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+@contextmanager
+def priority_lane(lane: str) -> Iterator[None]:
+    """Run LLM calls made in this context (and contexts copied from it) in ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown priority lane '{lane}'")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class RateLimitTimeoutError(Exception):
+    """Raised when a call waited LLM_RATE_LIMIT_MAX_WAIT_SECONDS without getting budget."""
+
+    def __init__(self, lane: str, retry_after: float):
+        super().__init__(f"LLM rate limit budget not available ({lane} lane)")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Requests/min and tokens/min token buckets with priority lanes."""
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int = 0,
+        burst_seconds: float = 10.0,
+        interactive_reserve: float = 0.2,
+        max_wait_seconds: float = 30.0,
+        completion_tokens: int = 256,
+        store: Optional[Any] = None,
+    ):
+        self.limits = {"requests": rpm, "tokens": tpm}
+        # A bucket holds burst_seconds of budget, and at least one request
+        self.capacity = {
+            "requests": max(1.0, rpm * burst_seconds / 60),
+            "tokens": max(1.0, tpm * burst_seconds / 60),
+        }
+        self.burst_seconds = burst_seconds
+        self.interactive_reserve = interactive_reserve
+        self.max_wait_seconds = max_wait_seconds
+        self.completion_tokens = completion_tokens
+        self._store = store if store is not None else get_shared_store()
+        # Local queue of waiting calls: (lane priority, arrival)
+        self._waiters: List[Tuple[int, int]] = []
+        self._arrivals = itertools.count()
+        self._lock = threading.Lock()
+        self._wait_ms: Dict[str, deque] = {lane: deque(maxlen=1024) for lane in LANES}
+        self._counters = {lane: {"granted": 0, "delayed": 0, "timeouts": 0} for lane in LANES}
+        # Bucket levels after this worker's last debit (see headroom)
+        self._last_state: Optional[Dict[str, float]] = None
+
+    def _refill(self, state: Optional[Dict[str, float]], now: float) -> Dict[str, float]:
+        if state is None:
+            return {**self.capacity, "ts": now}
+        elapsed = max(0.0, now - state["ts"])
+        refilled = {"ts": now}
+        for name, limit in self.limits.items():
+            refilled[name] = min(self.capacity[name], state[name] + elapsed * limit / 60)
+        return refilled
+
+    def _debit(self, tokens: int, lane: str) -> Tuple[Callable[[Any], Dict[str, float]], List[float]]:
+        """
+        Bucket update debiting one request and ``tokens`` if the buckets allow.
+
+        Returns the update function and a one-item list that receives the
+        seconds to wait (0.0 when granted) once the update has run.
+        """
+        wait = [0.0]
+
+        def take(state: Optional[Dict[str, float]]) -> Dict[str, float]:
+            wait[0] = 0.0
+            state = self._refill(state, time.time())
+            costs = {"requests": 1.0, "tokens": float(tokens)}
+            for name, limit in self.limits.items():
+                if not limit:
+                    continue
+                floor = self.capacity[name] * self.interactive_reserve if lane != LANE_INTERACTIVE else 0.0
+                # A call larger than the bucket could never run; charge it a full bucket
+                cost = min(costs[name], self.capacity[name] - floor)
+                shortfall = cost + floor - state[name]
+                if shortfall > 0:
+                    wait[0] = max(wait[0], shortfall / (limit / 60))
+            if wait[0] == 0.0:
+                for name, limit in self.limits.items():
+                    if limit:
+                        state[name] -= min(costs[name], self.capacity[name])
+            return state
+
+        return take, wait
+
+    def _take(self, tokens: int, lane: str) -> float:
+        """Debit the buckets (blocking); 0.0 when granted, else seconds to wait."""
+        take, wait = self._debit(tokens, lane)
+        state = self._store.update(SHARED_NAMESPACE, _BUCKETS_KEY, take, ttl=self.burst_seconds * 10)
+        return self._taken(state, wait[0])
+
+    async def _atake(self, tokens: int, lane: str) -> float:
+        """``_take`` for the event loop."""
+        take, wait = self._debit(tokens, lane)
+        state = await self._store.aupdate(SHARED_NAMESPACE, _BUCKETS_KEY, take, ttl=self.burst_seconds * 10)
+        return self._taken(state, wait[0])
+
+    def _taken(self, state: Dict[str, float], wait: float) -> float:
+        self._last_state = state
+        if wait == 0.0 and self.limits["requests"]:
+            LLM_RATE_LIMIT_UTILIZATION.set(1 - state["requests"] / self.capacity["requests"])
+        return wait
+
+    def _enter(self, lane: str) -> Tuple[int, int]:
+        entry = (LANES.index(lane), next(self._arrivals))
+        with self._lock:
+            heapq.heappush(self._waiters, entry)
+        return entry
+
+    def _leave(self, entry: Tuple[int, int]) -> None:
+        with self._lock:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _is_first(self, entry: Tuple[int, int]) -> bool:
+        with self._lock:
+            return self._waiters[0] == entry
+
+    def _attempt(self, entry: Tuple[int, int], tokens: int, lane: str, deadline: float) -> Optional[float]:
+        """None when granted, else how long to sleep; raises once the deadline has passed."""
+        delay = self._take(tokens, lane) if self._is_first(entry) else _POLL_SECONDS
+        return self._next_sleep(delay, lane, deadline)
+
+    async def _aattempt(self, entry: Tuple[int, int], tokens: int, lane: str, deadline: float) -> Optional[float]:
+        """``_attempt`` for the event loop."""
+        delay = await self._atake(tokens, lane) if self._is_first(entry) else _POLL_SECONDS
+        return self._next_sleep(delay, lane, deadline)
+
+    @staticmethod
+    def _next_sleep(delay: float, lane: str, deadline: float) -> Optional[float]:
+        if delay == 0.0:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RateLimitTimeoutError(lane, retry_after=max(delay, 1.0))
+        return min(delay, _MAX_SLEEP_SECONDS, remaining)
+
+    def _can_skip_line(self) -> bool:
+        with self._lock:
+            return not self._waiters
+
+    def acquire(self, tokens: int, lane: Optional[str] = None) -> float:
+        """Block until the budget allows one call of ``tokens``; returns seconds waited."""
+        lane = lane or current_lane()
+        started = time.monotonic()
+        if self._can_skip_line() and self._take(tokens, lane) == 0.0:
+            return self._granted(lane, started)
+        entry = self._enter(lane)
+        try:
+            while True:
+                delay = self._attempt(entry, tokens, lane, started + self.max_wait_seconds)
+                if delay is None:
+                    return self._granted(lane, started)
+                time.sleep(delay)
+        except RateLimitTimeoutError:
+            self._timed_out(lane)
+            raise
+        finally:
+            self._leave(entry)
+
+    async def aacquire(self, tokens: int, lane: Optional[str] = None) -> float:
+        """Async ``acquire``: waits without blocking the event loop."""
+        lane = lane or current_lane()
+        started = time.monotonic()
+        if self._can_skip_line() and await self._atake(tokens, lane) == 0.0:
+            return self._granted(lane, started)
+        entry = self._enter(lane)
+        try:
+            while True:
+                delay = await self._aattempt(entry, tokens, lane, started + self.max_wait_seconds)
+                if delay is None:
+                    return self._granted(lane, started)
+                await asyncio.sleep(delay)
+        except RateLimitTimeoutError:
+            self._timed_out(lane)
+            raise
+        finally:
+            self._leave(entry)
+
+    def _granted(self, lane: str, started: float) -> float:
+        waited = time.monotonic() - started
+        LLM_RATE_LIMIT_WAIT.observe(waited, lane)
+        with self._lock:
+            counters = self._counters[lane]
+            counters["granted"] += 1
+            if waited >= _POLL_SECONDS:
+                counters["delayed"] += 1
+            self._wait_ms[lane].append(waited * 1000)
+        return waited
+
+    def _timed_out(self, lane: str) -> None:
+        LLM_RATE_LIMIT_TIMEOUTS.inc(lane)
+        with self._lock:
+            self._counters[lane]["timeouts"] += 1
+        logger.warning("LLM call rejected by rate limiter", lane=lane, max_wait_seconds=self.max_wait_seconds)
+
+    def cost(self, request: httpx.Request) -> Optional[int]:
+        """Estimated tokens for a completion request, or None for calls that are not limited."""
+        if request.method != "POST" or not request.url.path.endswith("completions"):
+            return None
+        if not self.limits["tokens"]:
+            return 0
+        try:
+            body = json.loads(request.content or b"{}")
+        except (ValueError, httpx.RequestNotRead):
+            return self.completion_tokens
+        count = get_token_counter(str(body.get("model") or ""))
+        prompt_tokens = 0
+        for message in body.get("messages") or []:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            prompt_tokens += count(content or "") if isinstance(content, str) else 0
+        if isinstance(body.get("prompt"), str):
+            prompt_tokens += count(body["prompt"])
+        completion = body.get("max_completion_tokens") or body.get("max_tokens") or self.completion_tokens
+        return prompt_tokens + int(completion)
+
+    def headroom(self) -> float:
+        """
+        Fraction of the emptiest bucket still available (1.0 = full budget).
+
+        Estimated from the levels this worker saw at its last debit, refilled
+        to now, so it can be asked on the event loop without a store read.
+        """
+        state = self._refill(self._last_state, time.time())
+        levels = [state[name] / self.capacity[name] for name, limit in self.limits.items() if limit]
+        return min(levels, default=1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current bucket levels (all workers) and this worker's waits per lane."""
+        state = self._refill(self._store.get(SHARED_NAMESPACE, _BUCKETS_KEY), time.time())
+        budgets = {}
+        for name, limit in self.limits.items():
+            if not limit:
+                continue
+            budgets[name] = {
+                "per_minute": limit,
+                "capacity": round(self.capacity[name], 1),
+                "available": round(state[name], 1),
+                "utilization": round(1 - state[name] / self.capacity[name], 4),
+            }
+        with self._lock:
+            waiting = {lane: 0 for lane in LANES}
+            for priority, _ in self._waiters:
+                waiting[LANES[priority]] += 1
+            lanes = {}
+            for lane in LANES:
+                waits = sorted(self._wait_ms[lane])
+                lanes[lane] = {
+                    **self._counters[lane],
+                    "waiting": waiting[lane],
+                    "wait_ms": {
+                        "avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                        "p95": round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 2) if waits else 0.0,
+                        "max": round(waits[-1], 2) if waits else 0.0,
+                    },
+                }
+        return {
+            "enabled": True,
+            "shared": bool(getattr(self._store, "shared", False)),
+            "burst_seconds": self.burst_seconds,
+            "interactive_reserve": self.interactive_reserve,
+            "budgets": budgets,
+            "lanes": lanes,
+        }
+
+
+def _rejected(request: httpx.Request, error: RateLimitTimeoutError) -> httpx.Response:
+    """Local 429 for a call that never got budget; x-should-retry stops the OpenAI client retrying it."""
+    return httpx.Response(
+        429,
+        headers={"Retry-After": str(int(error.retry_after + 0.5)), "x-should-retry": "false"},
+        json={"error": {"message": str(error), "type": "rate_limit_error", "code": "local_rate_limit"}},
+        request=request,
+    )
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Sync httpx transport that takes budget from the limiter before each completion call."""
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = self._limiter.cost(request)
+        if tokens is not None:
+            try:
+                self._limiter.acquire(tokens)
+            except RateLimitTimeoutError as e:
+                return _rejected(request, e)
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async httpx transport that takes budget from the limiter before each completion call."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = self._limiter.cost(request)
+        if tokens is not None:
+            try:
+                await self._limiter.aacquire(tokens)
+            except RateLimitTimeoutError as e:
+                return _rejected(request, e)
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+_limiter_resolved = False
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Get the process-wide LLM rate limiter (None when disabled or without a budget)."""
+    global _limiter, _limiter_resolved
+    if not _limiter_resolved:
+        with _limiter_lock:
+            if not _limiter_resolved:
+                settings = get_settings()
+                rpm = settings.LLM_RATE_LIMIT_RPM or settings.CREWAI_MAX_RPM
+                tpm = settings.LLM_RATE_LIMIT_TPM
+                if settings.LLM_RATE_LIMIT_ENABLED and (rpm > 0 or tpm > 0):
+                    _limiter = RateLimiter(
+                        rpm=max(0, rpm),
+                        tpm=max(0, tpm),
+                        burst_seconds=settings.LLM_RATE_LIMIT_BURST_SECONDS,
+                        interactive_reserve=settings.LLM_RATE_LIMIT_INTERACTIVE_RESERVE,
+                        max_wait_seconds=settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS,
+                        completion_tokens=settings.LLM_RATE_LIMIT_COMPLETION_TOKENS,
+                    )
+                    logger.info(
+                        "LLM rate limiter initialized",
+                        rpm=rpm,
+                        tpm=tpm,
+                        shared=_limiter.stats()["shared"],
+                    )
+                _limiter_resolved = True
+    return _limiter
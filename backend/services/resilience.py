@@ -0,0 +1,657 @@
+"""
+Resilience Layer
+
+Retries, circuit breakers and hedged requests for LLM and tool calls, so a
+transient provider error no longer reaches the user as a failed chat.
+
+- Classified retries: connection errors, timeouts, 408/5xx responses
+  (transient) and 429s (rate limited) are retried with exponential backoff
+  and full jitter, honoring Retry-After; other 4xx responses and errors
+  (permanent) are not.
+- Circuit breaker per upstream (LLM host, tool): after
+  CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive transient failures, calls
+  fail fast for CIRCUIT_BREAKER_RECOVERY_SECONDS, then one probe call
+  decides whether to close it again.
+- Hedged LLM requests (async calls, LLM_HEDGE_ENABLED): when an attempt has
+  not produced its first bytes within the upstream's observed
+  LLM_HEDGE_PERCENTILE latency, a second attempt is sent and whichever
+  answers first is used. Hedges are capped at LLM_HEDGE_MAX_RATIO of calls
+  and only sent while the rate limiter has LLM_HEDGE_MIN_HEADROOM of its
+  budget left. Calls that offer tools or carry tool results are never
+  hedged: their answer decides which side effects run.
+- Tools with side effects (emails, tickets, provisioning, ...) are called
+  once behind their circuit breaker (``idempotent=False``); only reads and
+  idempotent tools are retried.
+
+For LLM calls the layer is an httpx transport around the rate-limited one
+(utils/llm_factory.py), so every retry and hedge takes its own rate budget
+and the OpenAI client's built-in retries are turned off. Tools use
+``ExceptionHandler.call``.
+
+Reference:
+- SAD Section 3.2: Task Orchestration Specification
+- SAD Section 5.3: CrewAI Integration Layer Requirements
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+import structlog
+
+from utils.config import get_settings
+from utils.metrics import CIRCUIT_BREAKER_TRANSITIONS, LLM_HEDGED_REQUESTS, UPSTREAM_RETRIES
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+ERROR_TRANSIENT = "transient"
+ERROR_RATE_LIMITED = "rate_limited"
+ERROR_PERMANENT = "permanent"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+_TRANSIENT_STATUS = {408, 425, 500, 502, 503, 504}
+# Exception class names (from httpx, openai, litellm, sqlalchemy, ...) that
+# mean the call may succeed when repeated
+_TRANSIENT_NAMES = ("Timeout", "Connection", "ServiceUnavailable", "InternalServerError", "OperationalError")
+
+
+def classify_status(status_code: int) -> Optional[str]:
+    """Failure class of an HTTP status, or None for success."""
+    if status_code < 400:
+        return None
+    if status_code == 429:
+        return ERROR_RATE_LIMITED
+    if status_code in _TRANSIENT_STATUS or status_code >= 520:
+        return ERROR_TRANSIENT
+    return ERROR_PERMANENT
+
+
+def classify_error(error: BaseException) -> str:
+    """Failure class of an exception raised by an LLM client, httpx or a tool."""
+    if isinstance(error, CircuitOpenError):
+        return ERROR_TRANSIENT
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return classify_status(status_code) or ERROR_PERMANENT
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError)):
+        return ERROR_TRANSIENT
+    names = [cls.__name__ for cls in type(error).__mro__]
+    if any("RateLimit" in name for name in names):
+        return ERROR_RATE_LIMITED
+    if any(marker in name for name in names for marker in _TRANSIENT_NAMES):
+        return ERROR_TRANSIENT
+    return ERROR_PERMANENT
+
+
+def retry_after_seconds(headers: httpx.Headers) -> Optional[float]:
+    """Retry-After (seconds or HTTP date) from response headers."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its upstream's circuit is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Circuit open for {upstream}; retry in {retry_after:.0f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Attempt limit and exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number ``attempt + 1``; None when out of attempts."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            # The server's hint wins, unless it is longer than we are willing to wait
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream."""
+
+    def __init__(self, upstream: str, failure_threshold: int = 10, recovery_seconds: float = 30.0):
+        self.upstream = upstream
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one probe at a time."""
+        with self._lock:
+            if self.state == CIRCUIT_OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_seconds:
+                    self._rejected += 1
+                    return False
+                self._transition(CIRCUIT_HALF_OPEN)
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._probing:
+                    self._rejected += 1
+                    return False
+                self._probing = True
+            return True
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(1.0, self.recovery_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self.state != CIRCUIT_CLOSED:
+                self._transition(CIRCUIT_CLOSED)
+
+    def release_probe(self) -> None:
+        """The call let through did not reach the upstream; let another one probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != CIRCUIT_OPEN:
+                    self._transition(CIRCUIT_OPEN)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_BREAKER_TRANSITIONS.inc(self.upstream, state)
+        log = logger.warning if state == CIRCUIT_OPEN else logger.info
+        log("Circuit breaker state changed", upstream=self.upstream, state=state)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures, "rejected": self._rejected}
+
+
+class LatencyTracker:
+    """Recent successful call latencies of one upstream, for the hedge delay."""
+
+    def __init__(self, size: int = 256):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ExceptionHandler:
+    """
+    Retry policy, circuit breakers and latency tracking per upstream.
+
+    ``call``/``acall`` run a function with classified retries behind the
+    upstream's circuit breaker; the LLM transports use the same pieces.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 10,
+        recovery_seconds: float = 30.0,
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_max_ratio: float = 0.1,
+        hedge_min_headroom: float = 0.5,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_ratio = hedge_max_ratio
+        self.hedge_min_headroom = hedge_min_headroom
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "retries": 0, "gave_up": 0, "hedges": 0, "hedges_won": 0}
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        breaker = self._breakers.get(upstream)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    upstream, CircuitBreaker(upstream, self.failure_threshold, self.recovery_seconds)
+                )
+        return breaker
+
+    def latency(self, upstream: str) -> LatencyTracker:
+        tracker = self._latency.get(upstream)
+        if tracker is None:
+            with self._lock:
+                tracker = self._latency.setdefault(upstream, LatencyTracker())
+        return tracker
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def record_retry(self, upstream: str, kind: str, attempt: int, delay: float) -> None:
+        UPSTREAM_RETRIES.inc(kind)
+        self.count("retries")
+        logger.info("Retrying upstream call", upstream=upstream, kind=kind, attempt=attempt + 1, delay_s=round(delay, 3))
+
+    def hedge_delay(self, upstream: str) -> Optional[float]:
+        """Seconds after which a call to ``upstream`` gets a hedge; None when not hedging."""
+        if not self.hedge_enabled:
+            return None
+        return self.latency(upstream).percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def may_hedge(self, headroom: float) -> bool:
+        """Within the hedge ratio and with enough rate budget left; counts the hedge when True."""
+        with self._lock:
+            calls, hedges = self._counters["calls"], self._counters["hedges"]
+            if headroom < self.hedge_min_headroom or hedges + 1 > self.hedge_max_ratio * max(1, calls):
+                return False
+            self._counters["hedges"] += 1
+            return True
+
+    def _failure(
+        self,
+        upstream: str,
+        breaker: CircuitBreaker,
+        error: BaseException,
+        attempt: int,
+        idempotent: bool = True,
+    ) -> float:
+        """Record a failed attempt; returns the retry delay or re-raises when giving up."""
+        kind = classify_error(error)
+        if kind == ERROR_TRANSIENT:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        delay = None
+        if kind != ERROR_PERMANENT and idempotent:
+            delay = self.policy.delay(attempt, getattr(error, "retry_after", None))
+        if delay is None:
+            if kind != ERROR_PERMANENT:
+                self.count("gave_up")
+            raise error
+        self.record_retry(upstream, kind, attempt, delay)
+        return delay
+
+    def call(self, fn: Callable[..., T], upstream: str, *args: Any, idempotent: bool = True, **kwargs: Any) -> T:
+        """
+        Run ``fn`` with retries behind the upstream's circuit breaker (blocking).
+
+        With ``idempotent=False`` a failure is recorded but never retried: a
+        write that timed out may still have happened.
+        """
+        breaker = self.breaker(upstream)
+        self.count("calls")
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(upstream, breaker.retry_after())
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                time.sleep(self._failure(upstream, breaker, e, attempt, idempotent))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        upstream: str,
+        *args: Any,
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """Async ``call``."""
+        breaker = self.breaker(upstream)
+        self.count("calls")
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(upstream, breaker.retry_after())
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._failure(upstream, breaker, e, attempt, idempotent))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            breakers = dict(self._breakers)
+            latency = dict(self._latency)
+        upstreams = {}
+        for name, breaker in breakers.items():
+            p50 = latency[name].percentile(0.5) if name in latency else None
+            p95 = latency[name].percentile(0.95) if name in latency else None
+            upstreams[name] = {
+                **breaker.stats(),
+                "latency_ms": {
+                    "p50": round(p50 * 1000, 1) if p50 is not None else None,
+                    "p95": round(p95 * 1000, 1) if p95 is not None else None,
+                },
+            }
+        return {
+            "max_attempts": self.policy.max_attempts,
+            "hedge_enabled": self.hedge_enabled,
+            **counters,
+            "upstreams": upstreams,
+        }
+
+
+def _is_llm_call(request: httpx.Request) -> bool:
+    return request.method == "POST" and request.url.path.endswith("completions")
+
+
+def _may_hedge(request: httpx.Request) -> bool:
+    """
+    True for completion calls without tool use.
+
+    A hedge race picks one of two answers; when the call offers tools or
+    continues after a tool result, that answer decides which tool calls (and
+    side effects) follow, so it must come from the single attempt sent.
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return False
+    if not isinstance(body, dict) or body.get("tools") or body.get("functions"):
+        return False
+    messages = body.get("messages") or []
+    return not any(
+        isinstance(message, dict) and (message.get("role") in ("tool", "function") or message.get("tool_calls"))
+        for message in messages
+    )
+
+
+def _final(response: httpx.Response) -> httpx.Response:
+    """Tell the OpenAI client not to retry what this layer already retried."""
+    response.headers["x-should-retry"] = "false"
+    return response
+
+
+def _unavailable(request: httpx.Request, error: CircuitOpenError) -> httpx.Response:
+    return httpx.Response(
+        503,
+        headers={"Retry-After": str(int(error.retry_after + 0.5)), "x-should-retry": "false"},
+        json={"error": {"message": str(error), "type": "server_error", "code": "circuit_open"}},
+        request=request,
+    )
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """Sync transport with classified retries and a circuit breaker per host."""
+
+    def __init__(self, transport: httpx.BaseTransport, handler: ExceptionHandler):
+        self._transport = transport
+        self._handler = handler
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_llm_call(request):
+            return self._transport.handle_request(request)
+        handler = self._handler
+        upstream = request.url.host
+        breaker = handler.breaker(upstream)
+        handler.count("calls")
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                return _unavailable(request, CircuitOpenError(upstream, breaker.retry_after()))
+            started = time.perf_counter()
+            try:
+                response = self._transport.handle_request(request)
+            except Exception as e:
+                time.sleep(handler._failure(upstream, breaker, e, attempt))
+                attempt += 1
+                continue
+            delay = _on_response(handler, upstream, breaker, response, attempt, started)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def _on_response(
+    handler: ExceptionHandler,
+    upstream: str,
+    breaker: CircuitBreaker,
+    response: httpx.Response,
+    attempt: int,
+    started: float,
+) -> Optional[float]:
+    """Retry delay for a failed response, or None to hand the response to the caller."""
+    if response.headers.get("x-should-retry") == "false":
+        # Produced locally (rate limiter, breaker); repeating it changes nothing
+        breaker.release_probe()
+        return None
+    kind = classify_status(response.status_code)
+    if kind is None:
+        breaker.record_success()
+        handler.latency(upstream).observe(time.perf_counter() - started)
+        return None
+    if kind == ERROR_TRANSIENT:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    delay = handler.policy.delay(attempt, retry_after_seconds(response.headers)) if kind != ERROR_PERMANENT else None
+    if delay is None:
+        if kind != ERROR_PERMANENT:
+            handler.count("gave_up")
+        _final(response)
+        return None
+    handler.record_retry(upstream, kind, attempt, delay)
+    return delay
+
+
+class _PrefetchedStream(httpx.AsyncByteStream):
+    """Response body whose first chunk was already read (to time the first bytes)."""
+
+    def __init__(self, first: bytes, iterator: Any, response: httpx.Response):
+        self._first = first
+        self._iterator = iterator
+        self._response = response
+
+    async def __aiter__(self):
+        if self._first:
+            yield self._first
+        async for chunk in self._iterator:
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """Async transport with classified retries, a circuit breaker per host and hedged requests."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        handler: ExceptionHandler,
+        headroom: Optional[Callable[[], float]] = None,
+    ):
+        self._transport = transport
+        self._handler = handler
+        # Rate budget left (0..1); hedges are only sent while it is high enough
+        self._headroom = headroom or (lambda: 1.0)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_llm_call(request):
+            return await self._transport.handle_async_request(request)
+        self._handler.count("calls")
+        delay = self._handler.hedge_delay(request.url.host)
+        if delay is None or not _may_hedge(request):
+            return await self._send(request)
+        return await self._send_hedged(request, delay)
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        handler = self._handler
+        upstream = request.url.host
+        breaker = handler.breaker(upstream)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                return _unavailable(request, CircuitOpenError(upstream, breaker.retry_after()))
+            started = time.perf_counter()
+            try:
+                response = await self._transport.handle_async_request(request)
+                if response.status_code < 400 and handler.hedge_enabled:
+                    response = await self._prefetch(response)
+            except asyncio.CancelledError:
+                # A hedge race loser; it says nothing about the upstream
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                await asyncio.sleep(handler._failure(upstream, breaker, e, attempt))
+                attempt += 1
+                continue
+            delay = _on_response(handler, upstream, breaker, response, attempt, started)
+            if delay is None:
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    async def _prefetch(response: httpx.Response) -> httpx.Response:
+        """Wait for the first body bytes, so a streamed reply counts as started only once tokens flow."""
+        iterator = response.stream.__aiter__()
+        try:
+            first = await iterator.__anext__()
+        except StopAsyncIteration:
+            first = b""
+        except BaseException:
+            await response.aclose()
+            raise
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_PrefetchedStream(first, iterator, response),
+            extensions=response.extensions,
+        )
+
+    async def _send_hedged(self, request: httpx.Request, delay: float) -> httpx.Response:
+        primary = asyncio.ensure_future(self._send(request))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._handler.may_hedge(self._headroom()):
+            return await primary
+        hedge = asyncio.ensure_future(self._send(request))
+        pending = {primary, hedge}
+        failed = []
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif task.result().status_code >= 400:
+                        # Keep waiting for the other attempt; fall back to this answer
+                        failed.append(task)
+                    else:
+                        LLM_HEDGED_REQUESTS.inc("hedge" if task is hedge else "primary")
+                        if task is hedge:
+                            self._handler.count("hedges_won")
+                        for other in (done - {task}) | set(failed):
+                            _discard(other)
+                        return task.result()
+            if failed:
+                for other in failed[1:]:
+                    _discard(other)
+                return failed[0].result()
+            raise error
+        finally:
+            for task in pending:
+                _discard(task)
+
+
+def _discard(task: asyncio.Future) -> None:
+    """Cancel a losing attempt and close its response if it already has one."""
+    def close(finished: asyncio.Future) -> None:
+        if not finished.cancelled() and finished.exception() is None:
+            asyncio.ensure_future(finished.result().aclose())
+
+    if task.done():
+        close(task)
+    else:
+        task.cancel()
+        task.add_done_callback(close)
+
+
+_handler: Optional[ExceptionHandler] = None
+_handler_lock = threading.Lock()
+
+
+def get_exception_handler() -> ExceptionHandler:
+    """Get the process-wide exception handler (LLM_RETRY_*, CIRCUIT_BREAKER_*, LLM_HEDGE_*)."""
+    global _handler
+    if _handler is None:
+        with _handler_lock:
+            if _handler is None:
+                settings = get_settings()
+                _handler = ExceptionHandler(
+                    policy=RetryPolicy(
+                        max_attempts=settings.LLM_RETRY_MAX_ATTEMPTS,
+                        base_delay=settings.LLM_RETRY_BASE_DELAY,
+                        max_delay=settings.LLM_RETRY_MAX_DELAY,
+                    ),
+                    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    recovery_seconds=settings.CIRCUIT_BREAKER_RECOVERY_SECONDS,
+                    hedge_enabled=settings.LLM_HEDGE_ENABLED,
+                    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+                    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+                    hedge_max_ratio=settings.LLM_HEDGE_MAX_RATIO,
+                    hedge_min_headroom=settings.LLM_HEDGE_MIN_HEADROOM,
+                )
+    return _handler
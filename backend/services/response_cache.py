@@ -0,0 +1,227 @@
+"""
+Chat Response Cache
+
+Caches final chat answers for frequently asked onboarding questions so
+repeated questions skip the CrewAI + LLM round trip.
+
+Two tiers:
+- Exact: normalized message + context key (model, temperature, prompt
+  template version, employee/workflow context, conversation history).
+- Similarity (optional): cosine similarity over local hashed n-gram
+  embeddings, restricted to entries with the same context key.
+
+Both tiers share one bounded LRU with TTL. With several workers and a
+shared state backend (services/shared_state.py), exact entries are also
+written there and read on a local miss, so an answer cached by one worker
+serves all of them; similarity matching stays per worker.
+
+Reference:
+- SAD Section 5.3: CrewAI Integration Layer Requirements
+"""
+
+import hashlib
+import math
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from utils.lru_cache import TTLLRUCache
+
+logger = structlog.get_logger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Dimensionality of the hashed embedding space
+_EMBEDDING_DIM = 2048
+
+SHARED_NAMESPACE = "response_cache"
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = _PUNCTUATION_RE.sub(" ", message.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def embed(normalized: str) -> Dict[int, float]:
+    """
+    Local embedding: hashed word unigrams/bigrams and character trigrams.
+
+    Returns a sparse, L2-normalized vector as {dimension: weight}. Cheap and
+    dependency-free; good enough to match rephrasings of short FAQ questions.
+    """
+    words = normalized.split()
+    features: List[str] = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    padded = f" {normalized} "
+    features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    counts = Counter(zlib.crc32(f.encode("utf-8")) % _EMBEDDING_DIM for f in features)
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {dim: c / norm for dim, c in counts.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(dim, 0.0) for dim, w in a.items())
+
+
+def context_key(**context: Any) -> str:
+    """Stable digest of everything besides the message that shapes the answer."""
+    parts = "\x1f".join(f"{k}={context[k]!r}" for k in sorted(context))
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()[:32]
+
+
+def history_digest(conversation_history: Optional[Iterable[Dict[str, str]]]) -> str:
+    """Digest of the conversation turns that end up in the prompt."""
+    if not conversation_history:
+        return ""
+    h = hashlib.sha256()
+    for m in conversation_history:
+        h.update((m.get("role") or "").encode("utf-8"))
+        h.update(b"\x1f")
+        h.update((m.get("content") or "").strip().encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()[:32]
+
+
+class ResponseCache:
+    """Exact-match + optional similarity cache for final chat answers."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        similarity_threshold: float = 0.0,
+        shared: Optional[Any] = None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries = TTLLRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # Cross-worker tier for exact matches (None with a single worker)
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._counters = {"hits_exact": 0, "hits_shared": 0, "hits_similar": 0, "misses": 0, "stores": 0}
+
+    @property
+    def similarity_enabled(self) -> bool:
+        return self.similarity_threshold > 0
+
+    @staticmethod
+    def _key(ctx_key: str, normalized: str) -> Tuple[str, str]:
+        return (ctx_key, normalized)
+
+    def get(self, message: str, ctx_key: str) -> Optional[str]:
+        """Return a cached answer for the message in this context, if any."""
+        normalized = normalize_message(message)
+        answer = self._get_local(ctx_key, normalized)
+        if answer is None and self._shared is not None:
+            answer = self._adopt(ctx_key, normalized, self._shared.get(SHARED_NAMESPACE, f"{ctx_key}:{normalized}"))
+        return answer if answer is not None else self._get_similar(ctx_key, normalized)
+
+    async def aget(self, message: str, ctx_key: str) -> Optional[str]:
+        """``get`` for async callers; the shared tier is read off the event loop."""
+        normalized = normalize_message(message)
+        answer = self._get_local(ctx_key, normalized)
+        if answer is None and self._shared is not None:
+            shared_answer = await self._shared.aget(SHARED_NAMESPACE, f"{ctx_key}:{normalized}")
+            answer = self._adopt(ctx_key, normalized, shared_answer)
+        return answer if answer is not None else self._get_similar(ctx_key, normalized)
+
+    def _get_local(self, ctx_key: str, normalized: str) -> Optional[str]:
+        answer = self._entries.get(self._key(ctx_key, normalized))
+        if answer is None:
+            return None
+        self._count("hits_exact")
+        return answer[0]
+
+    def _adopt(self, ctx_key: str, normalized: str, shared_answer: Optional[str]) -> Optional[str]:
+        """Keep an answer another worker stored in the local tier too."""
+        if shared_answer is None:
+            return None
+        vector = embed(normalized) if self.similarity_enabled else None
+        self._entries.set(self._key(ctx_key, normalized), (shared_answer, vector))
+        self._count("hits_shared")
+        return shared_answer
+
+    def _get_similar(self, ctx_key: str, normalized: str) -> Optional[str]:
+        if self.similarity_enabled:
+            match = self._nearest(normalized, ctx_key)
+            if match is not None:
+                self._count("hits_similar")
+                return match
+
+        self._count("misses")
+        return None
+
+    def _nearest(self, normalized: str, ctx_key: str) -> Optional[str]:
+        query = embed(normalized)
+        best_score, best_key, best_answer = 0.0, None, None
+        for (entry_ctx, entry_text), (answer, vector) in self._entries.items():
+            if entry_ctx != ctx_key:
+                continue
+            score = cosine(query, vector)
+            if score > best_score:
+                best_score, best_key, best_answer = score, (entry_ctx, entry_text), answer
+        if best_key is None or best_score < self.similarity_threshold:
+            return None
+        # Refresh recency of the matched entry
+        self._entries.get(best_key)
+        logger.debug("Similarity cache hit", score=round(best_score, 3))
+        return best_answer
+
+    def set(self, message: str, ctx_key: str, answer: str) -> None:
+        """Store a final answer."""
+        if not answer:
+            return
+        normalized = self._set_local(ctx_key, message, answer)
+        if self._shared is not None:
+            self._shared.set(SHARED_NAMESPACE, f"{ctx_key}:{normalized}", answer, ttl=self._shared_ttl)
+
+    async def aset(self, message: str, ctx_key: str, answer: str) -> None:
+        """``set`` for async callers; the shared tier is written off the event loop."""
+        if not answer:
+            return
+        normalized = self._set_local(ctx_key, message, answer)
+        if self._shared is not None:
+            await self._shared.aset(SHARED_NAMESPACE, f"{ctx_key}:{normalized}", answer, ttl=self._shared_ttl)
+
+    @property
+    def _shared_ttl(self) -> Optional[float]:
+        return self.ttl_seconds if self.ttl_seconds > 0 else None
+
+    def _set_local(self, ctx_key: str, message: str, answer: str) -> str:
+        normalized = normalize_message(message)
+        vector = embed(normalized) if self.similarity_enabled else None
+        self._entries.set(self._key(ctx_key, normalized), (answer, vector))
+        self._count("stores")
+        return normalized
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        entries = self._entries.stats()
+        hits = counters["hits_exact"] + counters["hits_shared"] + counters["hits_similar"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "size": entries["size"],
+            "max_entries": entries["max_entries"],
+            "evictions": entries["evictions"],
+            "expirations": entries["expirations"],
+            "similarity_threshold": self.similarity_threshold,
+            "shared": self._shared is not None,
+        }
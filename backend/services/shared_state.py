@@ -0,0 +1,291 @@
+"""
+Shared State Backend
+
+Key-value store for state that must be consistent across uvicorn workers
+(WORKERS > 1): the response cache, chat sessions, workflow cache versions
+and rate-limit budgets. Process-local pieces (crew manager, crew pool,
+kickoff threads, HTTP pools, in-flight coalescing) stay per worker.
+
+Two backends with the same interface:
+
+- InProcessStore: dict guarded by a lock; the default for a single worker,
+  where sharing is not needed and nothing is serialized.
+- SQLiteStore: one table in a local SQLite file (WAL mode) opened by every
+  worker on the node; reads are point lookups, and ``update`` runs the
+  read-modify-write in an IMMEDIATE transaction, so it is atomic across
+  processes.
+
+Values must be JSON-serializable. Entries can carry a TTL; expired entries
+read as missing and are purged periodically.
+
+Async callers use the ``a``-prefixed methods (``aget``, ``aset``, ...): the
+SQLite store runs them in a worker thread, since a write may wait up to
+``busy_timeout`` for another worker's lock, which must not stall the event
+loop; the in-process store answers inline.
+
+SHARED_STATE_BACKEND=auto (default) picks the SQLite store when WORKERS > 1.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+- SAD Section 5.2: Database Architecture Specification
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from utils.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Expired entries are purged every this many writes
+_PURGE_EVERY = 1024
+
+
+class _AsyncMethods:
+    """Async variants of the store interface; ``_run`` decides where the blocking call runs."""
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return fn(*args)
+
+    async def aget(self, namespace: str, key: str, default: Any = None) -> Any:
+        return await self._run(self.get, namespace, key, default)
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._run(self.set, namespace, key, value, ttl)
+
+    async def adelete(self, namespace: str, key: str) -> bool:
+        return await self._run(self.delete, namespace, key)
+
+    async def aupdate(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        return await self._run(self.update, namespace, key, fn, ttl)
+
+    async def aincr(self, namespace: str, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        return await self._run(self.incr, namespace, key, amount, ttl)
+
+
+class InProcessStore(_AsyncMethods):
+    """Shared-state interface backed by a dict; visible to this process only."""
+
+    shared = False
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, str], Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self, item: Optional[Tuple[Any, Optional[float]]], now: float) -> bool:
+        return item is not None and (item[1] is None or item[1] > now)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get((namespace, key))
+            return item[0] if self._live(item, time.time()) else default
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[(namespace, key)] = (value, now + ttl if ttl else None)
+            self._after_write(now)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._data.pop((namespace, key), None) is not None
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Atomically replace the value with ``fn(current)`` (None when missing); returns it."""
+        now = time.time()
+        with self._lock:
+            item = self._data.get((namespace, key))
+            value = fn(item[0] if self._live(item, now) else None)
+            self._data[(namespace, key)] = (value, now + ttl if ttl else None)
+            self._after_write(now)
+            return value
+
+    def incr(self, namespace: str, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        return self.update(namespace, key, lambda value: (value or 0) + amount, ttl)
+
+    def _after_write(self, now: float) -> None:
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            expired = [k for k, item in self._data.items() if not self._live(item, now)]
+            for k in expired:
+                del self._data[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "shared": False, "entries": len(self._data)}
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStore(_AsyncMethods):
+    """Shared-state interface backed by a SQLite file shared by all workers on the node."""
+
+    shared = True
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Each worker thread gets its own connection (see _conn)
+        return await asyncio.to_thread(fn, *args)
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = os.path.abspath(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS shared_state ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL,"
+            " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        logger.info("Shared state store opened", backend="sqlite", path=self.path)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections must not be shared while in a transaction."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, namespace: str, key: str, now: float) -> Any:
+        row = conn.execute(
+            "SELECT value, expires_at FROM shared_state WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return json.loads(row[0])
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: Optional[float],
+        now: float,
+    ) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO shared_state VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), now + ttl if ttl else None),
+        )
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            conn.execute("DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        value = self._read(self._conn(), namespace, key, time.time())
+        return default if value is None else value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._write(self._conn(), namespace, key, value, ttl, time.time())
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cursor = self._conn().execute(
+            "DELETE FROM shared_state WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+        return cursor.rowcount > 0
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Atomically replace the value with ``fn(current)`` (None when missing); returns it."""
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so no other worker can
+        # change the row between the read and the write
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            value = fn(self._read(conn, namespace, key, now))
+            self._write(conn, namespace, key, value, ttl, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def incr(self, namespace: str, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        return self.update(namespace, key, lambda value: (value or 0) + amount, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._conn().execute("SELECT COUNT(*) FROM shared_state").fetchone()[0]
+        return {"backend": "sqlite", "shared": True, "path": self.path, "entries": entries}
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def resolve_backend(backend: str, workers: int) -> str:
+    """``auto`` means memory for a single worker and sqlite for several."""
+    if backend == "auto":
+        return "sqlite" if workers > 1 else "memory"
+    return backend
+
+
+_store: Optional[Any] = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """Get the process-wide shared state store (SHARED_STATE_BACKEND, SHARED_STATE_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                backend = resolve_backend(settings.SHARED_STATE_BACKEND, settings.WORKERS)
+                if backend == "sqlite":
+                    _store = SQLiteStore(settings.SHARED_STATE_PATH)
+                else:
+                    if settings.WORKERS > 1:
+                        logger.warning(
+                            "WORKERS > 1 with in-process shared state; caches, sessions and "
+                            "rate limits are not shared between workers"
+                        )
+                    _store = InProcessStore()
+    return _store
+
+
+def close_shared_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
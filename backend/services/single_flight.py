@@ -0,0 +1,139 @@
+"""
+Single-Flight Request Coalescing
+
+When a cohort starts, many new hires ask the same question within seconds.
+The response cache only helps once the first answer is complete; until then
+every copy of the question would start its own LLM call or crew kickoff.
+
+SingleFlight runs one producer per key. The first request for a key (the
+leader) starts it as a background task; identical requests that arrive while
+it is running (followers) subscribe to the same flight. Every subscriber
+gets the chunks produced so far replayed, then the rest as they arrive, on
+its own stream. The producer runs to completion even if its subscribers go
+away, so its answer still reaches the response cache.
+
+Reference:
+- SAD Section 4.3: Chat Interface Specifications
+- SAD Section 5.3: CrewAI Integration Layer Requirements
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Set
+
+import structlog
+
+from utils.metrics import CHAT_SINGLE_FLIGHT
+
+logger = structlog.get_logger(__name__)
+
+
+class _Flight:
+    """One in-flight producer and the chunks it has produced so far."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk: str) -> None:
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None) -> None:
+        async with self._changed:
+            self.error = error
+            self.done = True
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Replay the chunks so far, then stream new ones until the flight ends."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.done or len(self.chunks) > sent)
+                pending = self.chunks[sent:]
+                done, error = self.done, self.error
+            for chunk in pending:
+                yield chunk
+            sent += len(pending)
+            if done and sent == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """Coalesces concurrent identical requests onto one producer per key."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"leaders": 0, "followers": 0, "failed": 0}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """True if a request for ``key`` would join a running flight."""
+        return key in self._flights
+
+    async def stream(
+        self,
+        key: Hashable,
+        produce: Callable[[], AsyncIterator[str]],
+    ) -> AsyncIterator[str]:
+        """
+        Stream the answer for ``key``, starting ``produce()`` only if no
+        flight for it is running. Errors raised by the producer are re-raised
+        to every subscriber.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            self._stats["leaders"] += 1
+            CHAT_SINGLE_FLIGHT.inc("leader")
+            task = asyncio.create_task(self._run(key, flight, produce()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self._stats["followers"] += 1
+            CHAT_SINGLE_FLIGHT.inc("follower")
+            logger.info("Coalesced chat request onto in-flight answer", subscribers=flight.subscribers + 1)
+        flight.subscribers += 1
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        finally:
+            flight.subscribers -= 1
+
+    async def _run(self, key: Hashable, flight: _Flight, producer: AsyncIterator[str]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            async for chunk in producer:
+                await flight.publish(chunk)
+        except BaseException as e:
+            error = e
+            self._stats["failed"] += 1
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            # New requests start a fresh flight from here on
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            await flight.finish(error)
+
+    def stats(self) -> Dict[str, Any]:
+        leaders, followers = self._stats["leaders"], self._stats["followers"]
+        total = leaders + followers
+        return {
+            **self._stats,
+            "in_flight": len(self._flights),
+            "subscribers": sum(f.subscribers for f in self._flights.values()),
+            "coalescing_rate": round(followers / total, 4) if total else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Cancel producers still running."""
+        for task in list(self._tasks):
+            task.cancel()
@@ -0,0 +1,193 @@
+"""
+Startup Warm-up
+
+Work done once after the crew manager is built and before the instance
+reports ready, so the first user request after a deploy does not pay the
+cold-path costs:
+
+- agents.yaml and tasks.yaml are loaded and validated (required fields,
+  numeric limits, task agents and dependencies). Problems here fail
+  readiness.
+- Connections to the OpenAI-compatible endpoint (OpenRouter, OpenAI or a
+  local stand-in) are opened in the shared sync and async pools with a
+  cheap ``GET /models``, so TLS handshakes are done before the first chat.
+  Any HTTP response counts; an unreachable endpoint only marks the warm-up
+  degraded unless WARMUP_REQUIRE_LLM is set.
+- Caches are primed: the tokenizer, the prompt templates and the workflow
+  state database connection.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+- SAD Section 3.1: Agent Architecture Requirements
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from services.workflow_orchestrator import WorkflowConfigError, plan_levels
+from services.workflow_state import get_workflow_state_manager
+from utils.agent_loader import load_agents_from_yaml, load_tasks_from_yaml
+from utils.config import get_settings
+from utils.prompt_registry import get_prompt_registry
+
+logger = structlog.get_logger(__name__)
+
+WARMUP_PENDING = "pending"
+WARMUP_OK = "ok"
+WARMUP_DEGRADED = "degraded"
+WARMUP_FAILED = "failed"
+
+_REQUIRED_AGENT_FIELDS = ("role", "goal", "backstory")
+# The chat crew and the direct LLM path are built from this agent
+_CHAT_AGENT = "onboarding_orchestrator"
+
+
+def validate_agent_config(
+    agents_config: Dict[str, Dict[str, Any]],
+    tasks_config: Dict[str, Dict[str, Any]],
+) -> List[str]:
+    """Return the problems found in agents.yaml / tasks.yaml (empty when valid)."""
+    problems = []
+    if _CHAT_AGENT not in agents_config:
+        problems.append(f"agent '{_CHAT_AGENT}' is missing")
+    for agent_id, config in agents_config.items():
+        for field in _REQUIRED_AGENT_FIELDS:
+            if not str(config.get(field) or "").strip():
+                problems.append(f"agent '{agent_id}' has no {field}")
+        for field in ("max_iter", "max_execution_time"):
+            value = config.get(field)
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                problems.append(f"agent '{agent_id}' {field} must be a positive integer, got {value!r}")
+        if not isinstance(config.get("tools", []), list):
+            problems.append(f"agent '{agent_id}' tools must be a list")
+    for task_id, config in tasks_config.items():
+        if config.get("agent") not in agents_config:
+            problems.append(f"task '{task_id}' uses unknown agent '{config.get('agent')}'")
+    try:
+        plan_levels(tasks_config)
+    except WorkflowConfigError as e:
+        problems.append(str(e))
+    return problems
+
+
+def _check_config() -> Dict[str, Any]:
+    agents_config = load_agents_from_yaml()
+    tasks_config = load_tasks_from_yaml()
+    problems = validate_agent_config(agents_config, tasks_config)
+    return {
+        "status": WARMUP_FAILED if problems else WARMUP_OK,
+        "agents": len(agents_config),
+        "tasks": len(tasks_config),
+        "problems": problems,
+    }
+
+
+def _models_url() -> str:
+    settings = get_settings()
+    base_url = settings.OPENAI_BASE_URL or settings.OPENAI_API_BASE or "https://api.openai.com/v1"
+    return base_url.rstrip("/") + "/models"
+
+
+async def _warm_connections(count: int, timeout: float) -> Dict[str, Any]:
+    """Open ``count`` connections in each shared pool; any HTTP response counts."""
+    from utils.llm_factory import get_async_http_client, get_http_client
+
+    settings = get_settings()
+    url = _models_url()
+    headers = {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"} if settings.OPENAI_API_KEY else {}
+    async_client = get_async_http_client()
+    sync_client = get_http_client()
+
+    async def async_probe() -> int:
+        return (await async_client.get(url, headers=headers, timeout=timeout)).status_code
+
+    def sync_probe() -> int:
+        return sync_client.get(url, headers=headers, timeout=timeout).status_code
+
+    # Concurrent requests, so each one opens its own connection (one is
+    # enough with HTTP/2, which multiplexes)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(async_probe() for _ in range(count)),
+        *(asyncio.to_thread(sync_probe) for _ in range(count)),
+        return_exceptions=True,
+    )
+    errors = [f"{type(r).__name__}: {r}" for r in results if isinstance(r, BaseException)]
+    statuses = sorted({r for r in results if not isinstance(r, BaseException)})
+    return {
+        "status": WARMUP_OK if not errors else WARMUP_FAILED,
+        "url": url,
+        "opened": len(results) - len(errors),
+        "http_status": statuses,
+        "errors": errors[:3],
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def _prime_caches(crew_manager: Any) -> Dict[str, Any]:
+    """First-use costs: tokenizer tables, prompt templates, database connection."""
+    primed = []
+    if crew_manager is not None:
+        crew_manager.history_manager.count_tokens("Warm-up: how do I get my laptop on day one?")
+        primed.append("tokenizer")
+    for prompt_id in get_prompt_registry().versions():
+        template = get_prompt_registry().get(prompt_id)
+        template.render(**{name: "" for name in template.placeholders})
+    primed.append("prompts")
+    get_workflow_state_manager().list_for_employee("__warmup__")
+    primed.append("workflow_state")
+    return {"status": WARMUP_OK, "primed": primed}
+
+
+async def run_warmup(crew_manager: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Run all warm-up steps and report each one.
+
+    Returns:
+        Report with the overall ``status`` (ok, degraded or failed), the
+        duration and one entry per step
+    """
+    settings = get_settings()
+    started = time.perf_counter()
+    steps: Dict[str, Dict[str, Any]] = {}
+
+    async def step(name: str, coro) -> None:
+        try:
+            steps[name] = await coro
+        except Exception as e:
+            logger.warning("Warm-up step failed", step=name, error=str(e))
+            steps[name] = {"status": WARMUP_FAILED, "errors": [f"{type(e).__name__}: {e}"]}
+
+    await asyncio.gather(
+        step("config", asyncio.to_thread(_check_config)),
+        step(
+            "llm_connections",
+            _warm_connections(settings.WARMUP_LLM_CONNECTIONS, settings.WARMUP_TIMEOUT_SECONDS),
+        ),
+        step("caches", asyncio.to_thread(_prime_caches, crew_manager)),
+    )
+
+    status = WARMUP_OK
+    for name, result in steps.items():
+        if result["status"] != WARMUP_FAILED:
+            continue
+        if name == "llm_connections" and not settings.WARMUP_REQUIRE_LLM:
+            status = WARMUP_DEGRADED if status == WARMUP_OK else status
+        else:
+            status = WARMUP_FAILED
+    report = {
+        "status": status,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "steps": steps,
+    }
+    log = logger.info if status == WARMUP_OK else logger.warning
+    log(
+        "Warm-up finished",
+        status=status,
+        ms=report["ms"],
+        failed=[name for name, result in steps.items() if result["status"] == WARMUP_FAILED],
+    )
+    return report
@@ -0,0 +1,267 @@
+"""
+Full Workflow Orchestrator
+
+Runs the onboarding task graph from config/tasks.yaml as a parallel DAG.
+Each task is executed by its agent from config/agents.yaml; independent
+branches (training, stakeholder coordination, document collection) run
+concurrently and dependent tasks (IT provisioning after documents) start as
+soon as their dependencies finish, so wall time approaches the critical
+path instead of the sum of all tasks.
+
+Reference:
+- SAD Section 3.2: Task Orchestration Specification
+- PRD Section 4: Functional Requirements
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+from services.rate_limiter import LANE_BACKGROUND, priority_lane
+from utils.agent_loader import create_agent_from_config, load_agents_from_yaml, load_tasks_from_yaml
+from utils.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Runs one task synchronously: (task_config, agent_config, context) -> output text
+TaskRunner = Callable[[Dict[str, Any], Dict[str, Any], Dict[str, Any]], str]
+
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed_out"
+STATUS_SKIPPED = "skipped"
+
+
+class WorkflowConfigError(ValueError):
+    """Raised when tasks.yaml references unknown agents/tasks or has a cycle."""
+
+
+def plan_levels(tasks_config: Dict[str, Dict[str, Any]]) -> List[List[str]]:
+    """
+    Topologically sort tasks into levels (Kahn's algorithm).
+
+    Tasks in the same level have no dependencies on each other.
+
+    Raises:
+        WorkflowConfigError: on unknown dependencies or cycles
+    """
+    remaining = {}
+    for task_id, config in tasks_config.items():
+        deps = list(config.get("dependencies") or [])
+        unknown = [d for d in deps if d not in tasks_config]
+        if unknown:
+            raise WorkflowConfigError(f"Task '{task_id}' depends on unknown task(s): {unknown}")
+        remaining[task_id] = set(deps)
+
+    levels = []
+    while remaining:
+        ready = [task_id for task_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise WorkflowConfigError(f"Dependency cycle between tasks: {sorted(remaining)}")
+        levels.append(ready)
+        for task_id in ready:
+            del remaining[task_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels
+
+
+class FullWorkflowOrchestrator:
+    """
+    Full multi-agent workflow orchestrator.
+
+    Schedules the tasks of config/tasks.yaml as a DAG: every task waits only
+    for its own dependencies and runs on a dedicated worker pool, bounded by
+    its agent's ``max_execution_time``. A task whose dependency failed is
+    skipped. Each run reports per-task timings and the critical path.
+    """
+
+    def __init__(
+        self,
+        agents_config: Optional[Dict[str, Dict[str, Any]]] = None,
+        tasks_config: Optional[Dict[str, Dict[str, Any]]] = None,
+        task_runner: Optional[TaskRunner] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.settings = get_settings()
+        self.agents_config = agents_config if agents_config is not None else load_agents_from_yaml()
+        self.tasks_config = tasks_config if tasks_config is not None else load_tasks_from_yaml()
+        self.levels = plan_levels(self.tasks_config)
+        for task_id, config in self.tasks_config.items():
+            if config.get("agent") not in self.agents_config:
+                raise WorkflowConfigError(f"Task '{task_id}' uses unknown agent '{config.get('agent')}'")
+        self.task_runner = task_runner or self._run_crew_task
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or self.settings.WORKFLOW_MAX_WORKERS,
+            thread_name_prefix="workflow-task",
+        )
+        logger.info("Workflow orchestrator initialized", levels=self.levels)
+
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the whole task graph for one employee.
+
+        Args:
+            inputs: Workflow inputs (employee_id, role, department, start_date, ...)
+
+        Returns:
+            Dictionary with overall status, wall time, critical path and
+            per-task status/timings/output
+        """
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        done: Dict[str, asyncio.Event] = {task_id: asyncio.Event() for task_id in self.tasks_config}
+
+        async def run_task(task_id: str) -> None:
+            config = self.tasks_config[task_id]
+            deps = list(config.get("dependencies") or [])
+            for dep in deps:
+                await done[dep].wait()
+            ready_at = time.perf_counter()
+            try:
+                results[task_id] = await self._execute(task_id, config, deps, results, inputs, started, ready_at)
+            finally:
+                done[task_id].set()
+
+        await asyncio.gather(*(run_task(task_id) for task_id in self.tasks_config))
+
+        wall_ms = (time.perf_counter() - started) * 1000
+        critical_path, critical_ms = self._critical_path(results)
+        status = STATUS_COMPLETED if all(
+            r["status"] == STATUS_COMPLETED for r in results.values()
+        ) else STATUS_FAILED
+        report = {
+            "status": status,
+            "wall_time_ms": round(wall_ms, 1),
+            "task_time_ms": round(sum(r["duration_ms"] for r in results.values()), 1),
+            "critical_path": critical_path,
+            "critical_path_ms": round(critical_ms, 1),
+            "tasks": {task_id: results[task_id] for task_id in self.tasks_config},
+        }
+        logger.info(
+            "Workflow run finished",
+            employee_id=inputs.get("employee_id"),
+            status=status,
+            wall_time_ms=report["wall_time_ms"],
+            task_time_ms=report["task_time_ms"],
+            critical_path=critical_path,
+        )
+        return report
+
+    async def _execute(
+        self,
+        task_id: str,
+        config: Dict[str, Any],
+        deps: List[str],
+        results: Dict[str, Dict[str, Any]],
+        inputs: Dict[str, Any],
+        run_started: float,
+        ready_at: float,
+    ) -> Dict[str, Any]:
+        agent_id = config["agent"]
+        agent_config = self.agents_config[agent_id]
+        result = {
+            "agent": agent_id,
+            "dependencies": deps,
+            "status": STATUS_SKIPPED,
+            "started_ms": round((ready_at - run_started) * 1000, 1),
+            "duration_ms": 0.0,
+        }
+        failed_deps = [d for d in deps if results[d]["status"] != STATUS_COMPLETED]
+        if failed_deps:
+            result["error"] = f"Dependencies did not complete: {failed_deps}"
+            return result
+
+        context = {
+            "inputs": inputs,
+            "dependency_outputs": {d: results[d].get("output") for d in deps},
+        }
+        timeout = agent_config.get("max_execution_time")
+        loop = asyncio.get_running_loop()
+
+        def run_task() -> str:
+            # Workflow LLM calls queue behind interactive chat for rate limit budget
+            with priority_lane(LANE_BACKGROUND):
+                return self.task_runner(config, agent_config, context)
+
+        try:
+            output = await asyncio.wait_for(loop.run_in_executor(self._pool, run_task), timeout=timeout)
+            result["status"] = STATUS_COMPLETED
+            result["output"] = output
+        except asyncio.TimeoutError:
+            # The worker thread cannot be interrupted; its result is discarded
+            result["status"] = STATUS_TIMED_OUT
+            result["error"] = f"Exceeded max_execution_time of {timeout}s"
+        except Exception as e:
+            logger.error("Workflow task failed", task_id=task_id, error=str(e), exc_info=True)
+            result["status"] = STATUS_FAILED
+            result["error"] = str(e)
+        result["duration_ms"] = round((time.perf_counter() - ready_at) * 1000, 1)
+        logger.info(
+            "Workflow task finished",
+            task_id=task_id,
+            agent=agent_id,
+            status=result["status"],
+            duration_ms=result["duration_ms"],
+        )
+        return result
+
+    def _critical_path(self, results: Dict[str, Dict[str, Any]]):
+        """Longest chain of measured task durations through the DAG."""
+        best: Dict[str, tuple] = {}
+        for level in self.levels:
+            for task_id in level:
+                deps = self.tasks_config[task_id].get("dependencies") or []
+                prior_ms, prior_path = max(
+                    (best[d] for d in deps), default=(0.0, []), key=lambda item: item[0]
+                )
+                best[task_id] = (prior_ms + results[task_id]["duration_ms"], prior_path + [task_id])
+        if not best:
+            return [], 0.0
+        total_ms, path = max(best.values(), key=lambda item: item[0])
+        return path, total_ms
+
+    def _run_crew_task(
+        self,
+        task_config: Dict[str, Any],
+        agent_config: Dict[str, Any],
+        context: Dict[str, Any],
+    ) -> str:
+        """Default runner: a single-agent crew for the task (runs in a worker thread)."""
+        from crewai import Crew, Process, Task
+
+        import tools as tool_registry
+        from utils.llm_factory import create_chat_llm
+
+        agent_tools = [
+            getattr(tool_registry, name)
+            for name in agent_config.get("tools", [])
+            if hasattr(tool_registry, name)
+        ]
+        agent = create_agent_from_config(agent_config, llm=create_chat_llm(), tools=agent_tools)
+
+        inputs = context["inputs"]
+        lines = [task_config.get("description", "")]
+        lines.append("Employee: " + ", ".join(f"{k}={v}" for k, v in inputs.items() if v is not None))
+        for dep, output in context["dependency_outputs"].items():
+            lines.append(f"Result of {dep}: {output}")
+        task = Task(
+            description="\n".join(lines),
+            expected_output=task_config.get("expected_output", ""),
+            agent=agent,
+        )
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            memory=self.settings.CREWAI_MEMORY,
+            verbose=self.settings.CREWAI_VERBOSE,
+            max_rpm=self.settings.CREWAI_MAX_RPM,
+        )
+        return str(crew.kickoff()).strip()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,263 @@
+"""
+Workflow State Manager
+
+Database-backed onboarding workflow state with a state machine and a
+bounded write-through LRU cache.
+
+Storage goes through SQLAlchemy, so DATABASE_URL selects the backend:
+SQLite by default for local runs, PostgreSQL (psycopg2) in production.
+Every write updates the database first and then the cache, so reads of hot
+workflows are served from memory without touching the database. With
+several workers, each write also bumps the workflow's version in the shared
+state backend (services/shared_state.py) and a cached copy is only served
+while its version is current, so a worker never returns a status another
+worker has since changed.
+
+Reference:
+- SAD Section 5.2: Database Architecture Specification
+- SAD Section 3.2: Task Orchestration Specification
+"""
+
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, OnboardingWorkflow
+from services.shared_state import get_shared_store
+from utils.config import get_settings
+from utils.lru_cache import TTLLRUCache
+
+logger = structlog.get_logger(__name__)
+
+SHARED_NAMESPACE = "workflow_version"
+
+STATE_INITIATED = "initiated"
+STATE_IN_PROGRESS = "in_progress"
+STATE_COMPLETED = "completed"
+STATE_FAILED = "failed"
+
+WORKFLOW_STATES = (STATE_INITIATED, STATE_IN_PROGRESS, STATE_COMPLETED, STATE_FAILED)
+
+# Allowed transitions; a failed workflow may be resumed
+_TRANSITIONS = {
+    STATE_INITIATED: {STATE_IN_PROGRESS, STATE_FAILED},
+    STATE_IN_PROGRESS: {STATE_COMPLETED, STATE_FAILED},
+    STATE_FAILED: {STATE_IN_PROGRESS},
+    STATE_COMPLETED: set(),
+}
+
+
+class WorkflowNotFoundError(KeyError):
+    """Raised when a workflow ID does not exist."""
+
+
+class InvalidTransitionError(ValueError):
+    """Raised when a state change is not allowed by the state machine."""
+
+
+def new_workflow_id(employee_id: str) -> str:
+    """Unique workflow ID; an employee may be onboarded more than once."""
+    return f"workflow-{employee_id}-{uuid.uuid4().hex[:8]}"
+
+
+class WorkflowStateManager:
+    """
+    Database-backed workflow state management.
+
+    - SQLite/PostgreSQL storage via SQLAlchemy, indexed by workflow_id
+      (primary key) and employee_id
+    - State machine: initiated -> in_progress -> completed | failed
+    - Bounded write-through LRU cache for status reads
+    - Cache hit ratio and per-operation store latency in stats()
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        shared: Optional[Any] = None,
+    ):
+        settings = get_settings()
+        url = database_url or settings.DATABASE_URL
+        self.engine = self._create_engine(url)
+        Base.metadata.create_all(self.engine)
+        self._session = sessionmaker(self.engine, expire_on_commit=False)
+        # workflow_id -> (version, workflow); versions are only tracked when shared
+        self._cache = TTLLRUCache(max_entries=cache_size or settings.WORKFLOW_STATE_CACHE_SIZE)
+        self._shared = shared
+        self._latency_lock = threading.Lock()
+        self._latency_ms: Dict[str, deque] = defaultdict(lambda: deque(maxlen=512))
+        logger.info("Workflow state store initialized", backend=self.engine.dialect.name)
+
+    @staticmethod
+    def _create_engine(url: str):
+        if url.startswith("sqlite"):
+            engine = create_engine(url, connect_args={"check_same_thread": False})
+
+            @event.listens_for(engine, "connect")
+            def _sqlite_pragmas(dbapi_connection, _):
+                # WAL lets readers proceed while a writer commits
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.close()
+
+            return engine
+        return create_engine(url, pool_pre_ping=True)
+
+    def _remember(self, workflow: Dict[str, Any]) -> None:
+        """Cache a workflow just written, or publish a new version to the other workers."""
+        workflow_id = workflow["workflow_id"]
+        if self._shared is None:
+            self._cache.set(workflow_id, (0, workflow))
+            return
+        # Another worker may commit a newer row before the increment below,
+        # so this copy is not cached; the next get() reads it back
+        self._shared.incr(SHARED_NAMESPACE, workflow_id)
+        self._cache.delete(workflow_id)
+
+    def _record(self, operation: str, started: float) -> None:
+        with self._latency_lock:
+            self._latency_ms[operation].append((time.perf_counter() - started) * 1000)
+
+    def create(
+        self,
+        workflow_id: str,
+        employee_id: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a workflow in the initiated state."""
+        return self.create_many([
+            {"workflow_id": workflow_id, "employee_id": employee_id, "metadata": metadata}
+        ])[0]
+
+    def create_many(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several workflows in one transaction (all or nothing).
+
+        Args:
+            records: Dicts with workflow_id, employee_id and optional metadata
+
+        Returns:
+            The created workflows as dictionaries
+        """
+        started = time.perf_counter()
+        rows = [
+            OnboardingWorkflow(
+                workflow_id=r["workflow_id"],
+                employee_id=r["employee_id"],
+                state=STATE_INITIATED,
+                details=dict(r.get("metadata") or {}),
+            )
+            for r in records
+        ]
+        with self._session.begin() as session:
+            session.add_all(rows)
+        self._record("create", started)
+        created = [row.to_dict() for row in rows]
+        for workflow in created:
+            self._remember(workflow)
+        return [dict(workflow) for workflow in created]
+
+    def transition(
+        self,
+        workflow_id: str,
+        state: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Move a workflow to a new state, merging metadata.
+
+        Raises:
+            WorkflowNotFoundError: if the workflow does not exist
+            InvalidTransitionError: if the state machine forbids the change
+        """
+        if state not in WORKFLOW_STATES:
+            raise InvalidTransitionError(f"Unknown workflow state '{state}'")
+        started = time.perf_counter()
+        with self._session.begin() as session:
+            row = session.get(OnboardingWorkflow, workflow_id, with_for_update=True)
+            if row is None:
+                raise WorkflowNotFoundError(workflow_id)
+            if state != row.state and state not in _TRANSITIONS[row.state]:
+                raise InvalidTransitionError(f"Cannot move workflow from '{row.state}' to '{state}'")
+            row.state = state
+            if metadata:
+                row.details = {**(row.details or {}), **metadata}
+            session.flush()
+            workflow = row.to_dict()
+        self._record("transition", started)
+        self._remember(workflow)
+        return dict(workflow)
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Return a workflow, from the cache when possible."""
+        cached = self._cache.get(workflow_id)
+        version = 0
+        if self._shared is not None:
+            # Read before the database: a write landing in between bumps the
+            # version again, so the copy cached below is not served later
+            version = self._shared.get(SHARED_NAMESPACE, workflow_id, 0)
+        if cached is not None and cached[0] == version:
+            return dict(cached[1])
+        started = time.perf_counter()
+        with self._session() as session:
+            row = session.get(OnboardingWorkflow, workflow_id)
+            workflow = row.to_dict() if row is not None else None
+        self._record("get", started)
+        if workflow is None:
+            return None
+        self._cache.set(workflow_id, (version, workflow))
+        return dict(workflow)
+
+    def list_for_employee(self, employee_id: str) -> List[Dict[str, Any]]:
+        """All workflows of one employee (indexed lookup, not cached)."""
+        started = time.perf_counter()
+        with self._session() as session:
+            rows = session.scalars(
+                select(OnboardingWorkflow)
+                .where(OnboardingWorkflow.employee_id == employee_id)
+                .order_by(OnboardingWorkflow.created_at)
+            ).all()
+            workflows = [row.to_dict() for row in rows]
+        self._record("list_for_employee", started)
+        return workflows
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit ratio and store latency per operation."""
+        with self._latency_lock:
+            samples = {op: sorted(values) for op, values in self._latency_ms.items()}
+        latency = {}
+        for op, values in samples.items():
+            if values:
+                latency[op] = {
+                    "count": len(values),
+                    "avg_ms": round(sum(values) / len(values), 3),
+                    "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+                }
+        return {
+            "backend": self.engine.dialect.name,
+            "cache": self._cache.stats(),
+            "store_latency": latency,
+        }
+
+
+_state_manager: Optional[WorkflowStateManager] = None
+_state_manager_lock = threading.Lock()
+
+
+def get_workflow_state_manager() -> WorkflowStateManager:
+    """Get the process-wide workflow state manager."""
+    global _state_manager
+    if _state_manager is None:
+        with _state_manager_lock:
+            if _state_manager is None:
+                shared_store = get_shared_store()
+                _state_manager = WorkflowStateManager(shared=shared_store if shared_store.shared else None)
+    return _state_manager
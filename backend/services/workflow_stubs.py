@@ -2,56 +2,22 @@
 Workflow Orchestration Stubs
 
 Stub implementations for advanced workflow features that will be
-implemented in future phases.
+implemented in future phases. Implemented features are re-exported here
+from their own modules.
 
 Reference:
 - SAD Section 3.2: Task Orchestration Specification
 - PRD Section 4: Functional Requirements
 """
 
-# Future: Full workflow orchestration with all agents
-class FullWorkflowOrchestrator:
-    """
-    Full multi-agent workflow orchestrator.
-    
-    Future Implementation:
-    - Parallel task execution (training + stakeholder coordination)
-    - Sequential dependencies (documents before IT provisioning)
-    - Exception handling and retry logic
-    - Real-time status updates via WebSocket
-    
-    Status: Stub - Full implementation pending
-    """
-    pass
+# Full workflow orchestration with all agents (parallel DAG executor)
+from services.workflow_orchestrator import FullWorkflowOrchestrator  # noqa: F401
 
 
-# Future: Database-backed workflow state management
-class WorkflowStateManager:
-    """
-    Database-backed workflow state management.
-    
-    Future Implementation:
-    - PostgreSQL storage for workflow state
-    - Redis caching for performance
-    - State machine for workflow transitions
-    - Audit logging
-    
-    Status: Stub - Database integration pending
-    """
-    pass
+# Database-backed workflow state management (SQLAlchemy + write-through LRU)
+from services.workflow_state import WorkflowStateManager  # noqa: F401,E402
 
 
-# Future: Advanced exception handling
-class ExceptionHandler:
-    """
-    Advanced exception handling system.
-    
-    Future Implementation:
-    - Exponential backoff retry logic
-    - Human escalation workflows
-    - Error categorization and routing
-    - Notification system integration
-    
-    Status: Stub - Full implementation pending
-    """
-    pass
+# Exception handling: classified retries with jittered backoff, circuit
+# breakers per upstream and hedged LLM requests
+from services.resilience import ExceptionHandler  # noqa: F401,E402
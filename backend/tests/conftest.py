@@ -0,0 +1,111 @@
+"""
+Shared pytest setup for the backend tests.
+
+Run from backend/:
+    python -m pytest -q
+
+No LLM endpoint or API key is needed: crew kickoffs and chat models are
+replaced by echoes in the tests that reach them.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, List, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set before utils.config builds the settings singleton
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-not-used")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+# History summaries would call the real LLM in the background
+os.environ.setdefault("CHAT_HISTORY_LLM_SUMMARY", "false")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from crewai import Crew  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+from services.crew_manager import OnboardingCrewManager  # noqa: E402
+from utils.config import get_settings  # noqa: E402
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """The settings singleton; use ``settings.set(NAME=value)`` to override for one test."""
+    current = get_settings()
+
+    class _Overrides:
+        def __getattr__(self, name):
+            return getattr(current, name)
+
+        def set(self, **values):
+            for name, value in values.items():
+                monkeypatch.setattr(current, name, value)
+
+    return _Overrides()
+
+
+_MESSAGE_RE = re.compile(r'Current user message: "(.*)"')
+
+
+def _answer_for(prompt: str) -> str:
+    match = _MESSAGE_RE.search(prompt)
+    return f"Answer to: {match.group(1) if match else '<missing>'}"
+
+
+class _EchoChatModel(BaseChatModel):
+    """Stand-in for the direct-path LLM: answer the question in the prompt."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        text = _answer_for(str(messages[-1].content))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(random.uniform(0.001, 0.02))
+        return self._generate(messages, stop, **kwargs)
+
+
+@pytest.fixture
+def kickoffs(monkeypatch):
+    """Replace Crew.kickoff with an echo; returns the answers it gave, in order."""
+    answered: List[str] = []
+    lock = threading.Lock()
+
+    def echo_kickoff(self, *args, **kwargs):
+        time.sleep(random.uniform(0.001, 0.02))
+        answer = _answer_for(self.tasks[0].description)
+        with lock:
+            answered.append(answer)
+        return answer
+
+    monkeypatch.setattr(Crew, "kickoff", echo_kickoff)
+    return answered
+
+
+@pytest.fixture
+def manager(settings, kickoffs):
+    """A real crew manager whose LLM calls and kickoffs are echoes."""
+    # Admit every request unless a test lowers kickoff_executor.queue_size
+    settings.set(KICKOFF_QUEUE_SIZE=100000, CHAT_FAST_PATH_ENABLED=True)
+    manager = OnboardingCrewManager()
+    echo = _EchoChatModel()
+    manager.tier_llms = {tier: echo for tier in manager.tier_llms}
+    yield manager
+    manager.shutdown()
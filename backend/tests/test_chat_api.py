@@ -0,0 +1,171 @@
+"""
+Tests for the /api/chat endpoints in api/chat.py, against a real crew
+manager whose LLM calls and kickoffs are echoes (see conftest.py).
+"""
+
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.chat import coalesce_chunks, router
+from services.kickoff_executor import ExecutorSaturatedError
+
+DIRECT = "When does orientation start?"
+CREW = "Please schedule my security training"
+
+
+@pytest.fixture
+def client(manager):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.crew_manager = manager
+    with TestClient(app) as client:
+        yield client
+
+
+def chat(client, message, **body):
+    response = client.post("/api/chat", json={"message": message, **body})
+    frames = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    return response, frames
+
+
+def answer(frames):
+    return "".join(frame.get("chunk", "") for frame in frames)
+
+
+def saturate(executor):
+    executor.queue_size = 0
+    held = []
+    while True:
+        try:
+            held.append(executor.admit())
+        except ExecutorSaturatedError:
+            return held
+
+
+def test_direct_answer_streams(client):
+    response, frames = chat(client, DIRECT)
+
+    assert response.status_code == 200
+    assert answer(frames) == f"Answer to: {DIRECT}"
+    assert frames[0]["status"] == "thinking"
+    assert frames[-1]["status"] == "complete"
+
+
+def test_direct_answers_do_not_need_a_kickoff_slot(client, manager):
+    held = saturate(manager.kickoff_executor)
+
+    response, frames = chat(client, DIRECT)
+    assert response.status_code == 200
+    assert answer(frames) == f"Answer to: {DIRECT}"
+
+    response, _ = chat(client, CREW)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(manager.settings.KICKOFF_RETRY_AFTER_SECONDS)
+
+    for admission in held:
+        admission.release()
+    response, frames = chat(client, CREW)
+    assert response.status_code == 200
+    assert answer(frames) == f"Answer to: {CREW}"
+
+
+def test_slots_are_returned_after_each_request(client, manager):
+    for _ in range(3):
+        chat(client, DIRECT)
+        chat(client, CREW)
+
+    stats = manager.kickoff_executor.stats()
+    # Only the crew requests were admitted, and none still holds a slot
+    assert stats["admitted"] == 3
+    assert (stats["queue_depth"], stats["active_workers"]) == (0, 0)
+
+
+def test_no_session_unless_requested(client):
+    response, frames = chat(client, DIRECT)
+
+    assert "x-session-id" not in response.headers
+    assert "session_id" not in frames[0]
+
+
+def test_session_keeps_successful_turns(client):
+    response, frames = chat(client, DIRECT, create_session=True)
+    session_id = response.headers["x-session-id"]
+    assert frames[0]["session_id"] == session_id
+
+    response, _ = chat(client, CREW, session_id=session_id)
+    assert response.headers["x-session-id"] == session_id
+
+    messages = client.get(f"/api/chat/sessions/{session_id}").json()["messages"]
+    assert [m["content"] for m in messages] == [
+        DIRECT, f"Answer to: {DIRECT}", CREW, f"Answer to: {CREW}",
+    ]
+
+
+def test_unknown_session_is_reported(client, manager):
+    response, _ = chat(client, DIRECT, session_id="expired-session")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Session not found or expired"
+    # A crew request gives its kickoff slot back
+    response, _ = chat(client, CREW, session_id="expired-session")
+    assert response.status_code == 409
+    assert manager.kickoff_executor.stats()["queue_depth"] == 0
+
+    # The client starts over from the transcript it shows
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+    response, _ = chat(client, DIRECT, conversation_history=history, create_session=True)
+    session_id = response.headers["x-session-id"]
+    messages = client.get(f"/api/chat/sessions/{session_id}").json()["messages"]
+    assert [m["content"] for m in messages] == ["Hi", "Hello!", DIRECT, f"Answer to: {DIRECT}"]
+
+
+def test_failed_turns_are_not_recorded(client, manager, monkeypatch):
+    response, _ = chat(client, DIRECT, create_session=True)
+    session_id = response.headers["x-session-id"]
+
+    async def fail(*args, **kwargs):
+        raise ValueError("bad request")
+        yield
+
+    monkeypatch.setattr(manager, "_run_direct", fail)
+    response, frames = chat(client, "When does payroll start?", session_id=session_id)
+    assert answer(frames).startswith("I apologize")
+
+    messages = client.get(f"/api/chat/sessions/{session_id}").json()["messages"]
+    assert len(messages) == 2
+
+
+async def frames_for(text, flush_bytes, step=1):
+    async def source():
+        for i in range(0, len(text), step):
+            yield text[i:i + step]
+
+    return [frame async for frame in coalesce_chunks(source(), flush_bytes, flush_interval=0)]
+
+
+@pytest.mark.parametrize("text", [
+    pytest.param("word " * 40, id="ascii"),
+    pytest.param("Schulung für Neueinsteiger: Überblick " * 10, id="latin"),
+    pytest.param("入职培训从周一开始。" * 20, id="no spaces"),
+    pytest.param("😀 ok " * 30, id="emoji"),
+])
+async def test_frames_are_cut_on_utf8_byte_limits(text):
+    frames = await frames_for(text, flush_bytes=16)
+
+    assert "".join(frames) == text
+    assert all(len(frame.encode("utf-8")) <= 16 for frame in frames)
+
+
+async def test_one_large_chunk_is_split_in_linear_time():
+    text = "ein längerer Satz " * 20_000
+    started = time.perf_counter()
+    frames = await frames_for(text, flush_bytes=48, step=len(text))
+    assert "".join(frames) == text
+    assert time.perf_counter() - started < 1
@@ -0,0 +1,115 @@
+"""
+Tests for OnboardingCrewManager.process_chat_message.
+
+Crew.kickoff and the direct-path chat models are replaced by echoes (see
+conftest.py); everything else (routing, crew pool, task creation, kickoff
+executor, response cache, single-flight, streaming extraction) is real.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import List
+
+import litellm
+
+from services.chat_router import ROUTE_CREW, ROUTE_DIRECT
+from services.crew_manager import OnboardingCrewManager
+from services.model_router import TIER_SIMPLE
+
+async def ask(manager: OnboardingCrewManager, question: str) -> str:
+    return "".join([chunk async for chunk in manager.process_chat_message(message=question)])
+
+
+def _direct(i: int) -> str:
+    return f"question #{i}: when does training {i} start?"
+
+
+def _crew(i: int) -> str:
+    return f"question #{i}: please schedule training {i}"
+
+
+def test_questions_are_routed(manager):
+    assert manager.choose_route(_direct(1)) == ROUTE_DIRECT
+    assert manager.choose_route(_crew(1)) == ROUTE_CREW
+    assert manager.choose_route(_direct(1), workflow_id="workflow-1") == ROUTE_CREW
+
+
+async def test_concurrent_requests_get_their_own_answers(manager):
+    manager.response_cache = None
+    questions = [_direct(i) if i % 2 else _crew(i) for i in range(200)]
+
+    answers = await asyncio.gather(*(ask(manager, q) for q in questions))
+
+    assert answers == [f"Answer to: {q}" for q in questions]
+    routes = manager.get_agent_status()["routes"]
+    assert (routes[ROUTE_DIRECT], routes[ROUTE_CREW]) == (100, 100)
+    # Every crew went back to the pool
+    assert manager.crew_pool.idle == manager.crew_pool.size
+
+
+async def test_direct_answers_are_cached(manager):
+    question = _direct(1)
+
+    assert await ask(manager, question) == f"Answer to: {question}"
+    assert await ask(manager, question) == f"Answer to: {question}"
+
+    assert manager.response_cache.stats()["hits_exact"] == 1
+    assert manager.tier_llms[TIER_SIMPLE].calls == 1
+
+
+async def test_crew_answers_are_never_cached(manager, kickoffs):
+    question = _crew(1)
+
+    await ask(manager, question)
+    await ask(manager, question)
+
+    # Tools with side effects run for every request
+    assert len(kickoffs) == 2
+    assert manager.response_cache.stats()["stores"] == 0
+
+
+async def test_identical_crew_requests_are_not_coalesced(manager, kickoffs):
+    question = _crew(1)
+
+    answers = await asyncio.gather(*(ask(manager, question) for _ in range(5)))
+
+    assert answers == [f"Answer to: {question}"] * 5
+    assert len(kickoffs) == 5
+    assert manager.single_flight.stats()["followers"] == 0
+
+
+def _chunk(text: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+async def test_crew_replies_stream_before_the_kickoff_finishes(settings, monkeypatch):
+    # A real crew and agent; only litellm's completion call is replaced
+    settings.set(ENABLE_STREAMING=True, KICKOFF_QUEUE_SIZE=100, CHAT_FAST_PATH_ENABLED=True)
+    release = threading.Event()
+    received: List[str] = []
+
+    def completion(**params):
+        assert params["stream"] is True
+        yield _chunk("Thought: I now can give a great answer\n")
+        yield _chunk("Final Answer: Hello")
+        yield _chunk(" there")
+        # Held until the client has seen the first chunks
+        released = release.wait(timeout=5)
+        yield _chunk(", welcome aboard." if released else " (not streamed)")
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    manager = OnboardingCrewManager()
+    outcome = {}
+    try:
+        async for chunk in manager.process_chat_message(message=_crew(1), outcome=outcome):
+            received.append(chunk)
+            if len(received) == 2:
+                release.set()
+    finally:
+        release.set()
+        manager.shutdown()
+
+    assert "error" not in outcome
+    assert received[:2] == ["Hello", " there"]
+    assert "".join(received) == "Hello there, welcome aboard."
@@ -0,0 +1,141 @@
+"""
+Tests for the token-budgeted conversation history in services/history_manager.py.
+"""
+
+import asyncio
+
+from services.history_manager import HistoryManager
+
+
+def words(text: str) -> int:
+    """Whitespace tokenizer: token counts are easy to reason about."""
+    return len(text.split())
+
+
+def make_manager(**kwargs) -> HistoryManager:
+    options = {"budget_tokens": 50, "summary_max_tokens": 30, "count_tokens": words}
+    options.update(kwargs)
+    return HistoryManager(**options)
+
+
+def test_rendered_history_is_reused_while_the_window_is_unchanged():
+    manager = make_manager()
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+
+    first = manager.render(manager.compact(history))
+    second = manager.render(manager.compact(history))
+
+    assert first == "\n\nPrevious conversation:\nUser: Hi\nAssistant: Hello!\n\n"
+    assert second is first
+    assert manager.stats()["render_cache"]["hits"] == 1
+    assert manager.render(manager.compact([])) == ""
+
+
+def turns(n: int, words_each: int = 4):
+    """n alternating turns; turn i reads "tI wI wI ..." (its cost is words_each + 1)."""
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": " ".join([f"t{i}"] + [f"w{i}"] * (words_each - 1))}
+        for i in range(n)
+    ]
+
+
+def test_newest_turns_are_kept_within_the_budget():
+    manager = make_manager(budget_tokens=12)
+
+    history = manager.compact(turns(5))
+
+    # Each turn costs 5 tokens ("User:" + 4 words): only the last two fit
+    assert [content.split()[0] for _, content in history.turns] == ["t3", "t4"]
+    assert history.dropped == 3
+    assert history.tokens - words(history.summary) == 10
+    assert history.tokens <= manager.budget_tokens + manager.summary_max_tokens
+
+
+def test_short_history_is_kept_verbatim():
+    manager = make_manager()
+
+    history = manager.compact(turns(3))
+
+    assert len(history.turns) == 3
+    assert (history.summary, history.dropped) == ("", 0)
+
+
+def test_dropped_turns_become_an_extractive_digest():
+    manager = make_manager(budget_tokens=12)
+
+    history = manager.compact(turns(5))
+
+    assert history.summary.splitlines() == [
+        "- User: t0 w0 w0 w0",
+        "- Assistant: t1 w1 w1 w1",
+        "- User: t2 w2 w2 w2",
+    ]
+    assert manager.stats()["summary_misses"] == 1
+
+
+async def test_summaries_are_reused_from_the_cache():
+    calls = []
+
+    async def summarize(previous: str, transcript: str) -> str:
+        calls.append((previous, transcript))
+        return f"summary {len(calls)}"
+
+    # Three turns fit; the older ones are summarized
+    manager = make_manager(budget_tokens=15, summarizer=summarize)
+    try:
+        # First request: digest now, rolling summary built in the background
+        assert manager.compact(turns(6)).summary.startswith("- User: t0")
+        await asyncio.gather(*manager._tasks)
+        assert calls == [("", "User: t0 w0 w0 w0\nAssistant: t1 w1 w1 w1\nUser: t2 w2 w2 w2")]
+
+        # Same older turns: the cached summary, no new LLM call
+        assert manager.compact(turns(6)).summary == "summary 1"
+        assert len(calls) == 1
+
+        # One more turn dropped: cached summary plus a digest of the new one
+        summary = manager.compact(turns(7)).summary
+        assert summary.splitlines() == ["summary 1", "- Assistant: t3 w3 w3 w3"]
+        await asyncio.gather(*manager._tasks)
+        assert calls[1] == ("summary 1", "Assistant: t3 w3 w3 w3")
+
+        stats = manager.stats()
+        assert (stats["summary_misses"], stats["summary_full_hits"], stats["summary_partial_hits"]) == (1, 1, 1)
+    finally:
+        manager.shutdown()
+
+
+def test_oversized_turn_is_truncated_to_the_budget():
+    manager = make_manager(budget_tokens=20)
+
+    history = manager.compact(turns(1, words_each=100))
+
+    (speaker, content), = history.turns
+    assert content.startswith("t0 w0") and content.endswith(" …")
+    assert history.tokens <= manager.budget_tokens
+    assert history.dropped == 0
+
+
+def test_oversized_latest_turn_drops_older_ones():
+    manager = make_manager(budget_tokens=20)
+
+    history = manager.compact(turns(3) + turns(1, words_each=100))
+
+    assert len(history.turns) == 1
+    assert history.dropped == 3
+    assert history.tokens - words(history.summary) <= manager.budget_tokens
+
+
+def test_turn_token_counts_are_cached():
+    counted = []
+
+    def count(text: str) -> int:
+        counted.append(text)
+        return words(text)
+
+    manager = make_manager(count_tokens=count)
+    manager.compact(turns(4))
+    first = len(counted)
+    manager.compact(turns(4))
+
+    assert first == 4
+    assert len(counted) == first
@@ -0,0 +1,69 @@
+"""
+Tests for services/kickoff_executor.py: admission, saturation and slot release.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.kickoff_executor import ExecutorSaturatedError, KickoffExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = KickoffExecutor(max_workers=1, queue_size=1, retry_after=3)
+    yield executor
+    executor.shutdown()
+
+
+
+def test_full_queue_is_rejected(executor):
+    first, second = executor.admit(), executor.admit()
+    with pytest.raises(ExecutorSaturatedError) as exc:
+        executor.admit()
+    assert exc.value.retry_after == 3
+
+    first.release()
+    first.release()
+    executor.admit()
+    second.release_if_unused()
+    assert executor.stats()["rejected"] == 1
+
+
+async def test_slot_is_released_when_the_kickoff_finishes(executor):
+    admission = executor.admit()
+    assert await executor.run(admission, lambda x: x * 2, 21) == 42
+    assert executor.stats()["completed"] == 1
+    executor.admit()
+    executor.admit()
+
+
+async def test_failed_kickoff_releases_its_slot(executor):
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await executor.run(executor.admit(), fail)
+    assert executor.stats()["failed"] == 1
+    executor.admit()
+    executor.admit()
+
+
+async def test_cancel_before_a_worker_starts_releases_the_slot(executor):
+    gate = threading.Event()
+    running = executor.run(executor.admit(), gate.wait)
+    queued_calls = []
+    try:
+        queued = executor.run(executor.admit(), lambda: queued_calls.append(1))
+        queued.cancel()
+        await asyncio.sleep(0.05)
+        # The queued request's slot is free again even though it never ran
+        third = executor.admit()
+        with pytest.raises(ExecutorSaturatedError):
+            executor.admit()
+        third.release()
+    finally:
+        gate.set()
+        await running
+    assert queued_calls == []
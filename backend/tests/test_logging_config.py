@@ -0,0 +1,120 @@
+"""
+Tests for the queued JSON logging in utils/logging_config.py.
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+import structlog
+
+from utils import logging_config
+from utils.logging_config import QueueWriter, configure_logging, shutdown_logging
+from utils.metrics import Counter
+
+
+@pytest.fixture
+def output():
+    """Logging configured to write into a buffer; restored to structlog defaults afterwards."""
+    stream = io.StringIO()
+    yield stream
+    with logging_config._lock:
+        logging_config._stop_locked()
+    structlog.reset_defaults()
+
+
+def lines(stream: io.StringIO):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class _BlockingRenderer:
+    """Holds the writer thread on its first item until ``release`` is set."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def render_safe(self, item):
+        self.started.set()
+        self.release.wait(timeout=10)
+        return str(item)
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    renderer = _BlockingRenderer()
+    dropped = Counter("test_dropped_total", "Dropped.")
+    stream = io.StringIO()
+    writer = QueueWriter(stream, renderer, queue_size=2, dropped=dropped, name="test-writer")
+    try:
+        writer.put("first")
+        assert renderer.started.wait(timeout=5)
+
+        started = time.perf_counter()
+        for i in range(5):
+            writer.put(f"queued {i}")
+        assert time.perf_counter() - started < 0.5
+        assert dropped.render()[-1] == "test_dropped_total 3"
+    finally:
+        renderer.release.set()
+        writer.stop()
+
+    assert stream.getvalue().splitlines() == ["first", "queued 0", "queued 1"]
+
+
+def test_shutdown_flushes_queued_events(output):
+    configure_logging(level="INFO", async_logging=True, stream=output)
+    logger = structlog.get_logger("test.shutdown")
+    for i in range(1000):
+        logger.info("Queued event", n=i)
+
+    shutdown_logging()
+
+    assert [event["n"] for event in lines(output)] == list(range(1000))
+    # Later events are written directly
+    structlog.get_logger("test.shutdown").warning("After shutdown")
+    assert lines(output)[-1]["event"] == "After shutdown"
+
+
+def test_stdlib_records_and_exceptions_share_the_layout(output):
+    configure_logging(level="INFO", async_logging=False, stream=output)
+    try:
+        raise ValueError("bad value")
+    except ValueError:
+        structlog.get_logger("app.module").error("App failed", exc_info=True)
+        logging.getLogger("some.library").error("Library failed: %s", "disk", exc_info=True)
+    # exc_info=True outside an exception handler adds nothing
+    structlog.get_logger("app.module").error("No exception", exc_info=True)
+
+    app, library, plain = lines(output)
+    assert app["event"] == "App failed"
+    assert library["event"] == "Library failed: disk"
+    for event, logger in ((app, "app.module"), (library, "some.library")):
+        assert set(event) == {"event", "logger", "level", "timestamp", "exception"}
+        assert (event["logger"], event["level"]) == (logger, "error")
+        assert event["timestamp"].endswith("Z")
+        assert event["exception"].startswith("Traceback (most recent call last):")
+        assert event["exception"].rstrip().endswith("ValueError: bad value")
+    assert "exception" not in plain and "exc_info" not in plain
+
+
+def test_library_loggers_stay_at_warning(output):
+    configure_logging(level="DEBUG", async_logging=False, stream=output)
+
+    logging.getLogger("some.library").info("Chatty library")
+    structlog.get_logger("app.module").debug("App detail")
+
+    assert [event["event"] for event in lines(output)] == ["App detail"]
+
+
+def test_debug_events_can_be_sampled(output):
+    configure_logging(level="DEBUG", async_logging=False, debug_sample_rate=0.0, stream=output)
+    logger = structlog.get_logger("app.module")
+
+    for _ in range(50):
+        logger.debug("Dropped")
+    logger.info("Kept")
+
+    assert [event["event"] for event in lines(output)] == ["Kept"]
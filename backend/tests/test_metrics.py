@@ -0,0 +1,124 @@
+"""
+Tests for the in-process metrics (utils/metrics.py) and the metrics
+endpoint and middleware (api/metrics.py).
+"""
+
+import litellm
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import MetricsMiddleware, _route_label
+from api.metrics import router as metrics_router
+from services.crew_manager import _StreamingCrewLLM
+from utils.metrics import HTTP_REQUEST_DURATION, LLM_CALL_DURATION, Counter, Histogram, MetricsRegistry
+
+
+def sample(metric, name: str) -> float:
+    """Value of one rendered sample line, e.g. 'x_count{outcome="ok"}'; 0 if absent."""
+    for line in metric.render():
+        if line.rsplit(" ", 1)[0] == name:
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    histogram = Histogram("latency_seconds", "Latency.", ("outcome",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "ok")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{outcome="ok",le="0.1"} 2',
+        'latency_seconds_bucket{outcome="ok",le="1"} 3',
+        'latency_seconds_bucket{outcome="ok",le="+Inf"} 4',
+        'latency_seconds_sum{outcome="ok"} 3.65',
+        'latency_seconds_count{outcome="ok"} 4',
+    ]
+
+
+def test_histogram_without_labels():
+    histogram = Histogram("size_bytes", "Size.", buckets=(10,))
+    histogram.observe(20)
+
+    assert histogram.render()[2:] == [
+        'size_bytes_bucket{le="10"} 0',
+        'size_bytes_bucket{le="+Inf"} 1',
+        "size_bytes_sum 20",
+        "size_bytes_count 1",
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("events_total", "Events.", ("source",))
+    counter.inc('say "hi"\\now\nplease')
+
+    assert counter.render()[2] == 'events_total{source="say \\"hi\\"\\\\now\\nplease"} 1'
+
+
+def test_label_count_is_checked():
+    with pytest.raises(ValueError):
+        Counter("events_total", "Events.", ("source",)).inc()
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.register(Counter("events_total", "Events."))
+    with pytest.raises(ValueError):
+        registry.register(Counter("events_total", "Events."))
+
+
+@pytest.mark.parametrize("scope, label", [
+    ({"path": "/api/chat"}, "unmatched"),
+    ({"route": object(), "path": "/api/chat"}, "/api/chat"),
+    (
+        {"route": object(), "path": "/api/chat/sessions/abc123", "path_params": {"session_id": "abc123"}},
+        "/api/chat/sessions/{session_id}",
+    ),
+    (
+        {"route": object(), "path": "/teams/7/members/7", "path_params": {"team_id": "7", "member_id": "7"}},
+        "/teams/{team_id}/members/{member_id}",
+    ),
+])
+def test_route_label_uses_the_route_template(scope, label):
+    assert _route_label(scope) == label
+
+
+def test_middleware_records_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/api/chat/sessions/{session_id}")
+    async def session(session_id: str):
+        return {"session_id": session_id}
+
+    name = 'aamad_http_request_duration_seconds_count{method="GET",route="/api/chat/sessions/{session_id}",status="200"}'
+    before = sample(HTTP_REQUEST_DURATION, name)
+    with TestClient(app) as client:
+        client.get("/api/chat/sessions/s-1")
+        client.get("/api/chat/sessions/s-2")
+        body = client.get("/metrics").text
+
+    assert sample(HTTP_REQUEST_DURATION, name) == before + 2
+    assert "# TYPE aamad_http_request_duration_seconds histogram" in body
+
+
+def test_crew_llm_calls_are_timed(monkeypatch):
+    llm = _StreamingCrewLLM(model="openai/gpt-3.5-turbo")
+    ok = sample(LLM_CALL_DURATION, 'aamad_llm_call_duration_seconds_count{outcome="ok"}')
+    error = sample(LLM_CALL_DURATION, 'aamad_llm_call_duration_seconds_count{outcome="error"}')
+
+    monkeypatch.setattr(litellm, "completion", lambda **params: {"choices": [{"message": {"content": "hi"}}]})
+    assert llm.call([{"role": "user", "content": "hello"}]) == "hi"
+
+    def fail(**params):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(litellm, "completion", fail)
+    with pytest.raises(ConnectionError):
+        llm.call([{"role": "user", "content": "hello"}])
+
+    assert sample(LLM_CALL_DURATION, 'aamad_llm_call_duration_seconds_count{outcome="ok"}') == ok + 1
+    assert sample(LLM_CALL_DURATION, 'aamad_llm_call_duration_seconds_count{outcome="error"}') == error + 1
@@ -0,0 +1,48 @@
+"""
+Tests for services/model_router.py and the shipped config/models.yaml.
+"""
+
+from services.chat_router import ROUTE_CREW, ROUTE_DIRECT
+from services.model_router import TIER_COMPLEX, TIER_SIMPLE, load_model_router
+from utils.config import get_settings
+
+FAQ = "When is orientation?"
+COMPARISON = "Can you compare the two health plans and explain which is better?"
+
+
+def test_defaults_route_everything_to_openai_model():
+    router = load_model_router()
+    model = get_settings().OPENAI_MODEL
+
+    assert router.enabled is False
+    assert router.tiers[TIER_SIMPLE].model == model
+    assert router.complex.model == model
+    assert router.select(FAQ, ROUTE_DIRECT) is router.complex
+    # No prices are shipped as if they were quotes
+    assert all(tier.cost(1000, 1000) == 0 for tier in router.tiers.values())
+
+
+def test_routing_with_explicit_tiers(settings):
+    settings.set(MODEL_ROUTING_ENABLED=True, MODEL_SIMPLE="mock/small", MODEL_COMPLEX="mock/large")
+    router = load_model_router()
+
+    assert router.select(FAQ, ROUTE_DIRECT).model == "mock/small"
+    assert router.select(COMPARISON, ROUTE_DIRECT).model == "mock/large"
+    assert router.select(FAQ, ROUTE_CREW).model == "mock/large"
+    assert router.select(FAQ, ROUTE_DIRECT, has_summary=True).name == TIER_COMPLEX
+
+
+def test_classifier_signals():
+    classifier = load_model_router().classifier
+
+    assert classifier.classify(FAQ) == TIER_SIMPLE
+    assert classifier.classify("Where is the office? And when do I start?") == TIER_COMPLEX
+    assert classifier.classify("My badge is not working") == TIER_COMPLEX
+    assert classifier.classify("Walk me through the first week") == TIER_COMPLEX
+    assert classifier.classify("word " * 100) == TIER_COMPLEX
+
+
+def test_routing_changes_the_cache_version(settings):
+    before = load_model_router().version
+    settings.set(MODEL_ROUTING_ENABLED=True, MODEL_SIMPLE="mock/small")
+    assert load_model_router().version != before
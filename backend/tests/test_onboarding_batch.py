@@ -0,0 +1,102 @@
+"""
+Tests for services/onboarding_batch.py: batch progress and events through
+the shared state backend, as seen from the running worker and another one.
+"""
+
+import asyncio
+
+import pytest
+
+from services.onboarding_batch import BATCH_COMPLETED, BATCH_RUNNING, OnboardingBatchRunner
+from services.shared_state import SQLiteStore
+from services.workflow_orchestrator import STATUS_COMPLETED
+from services.workflow_state import STATE_COMPLETED, STATE_FAILED, STATE_IN_PROGRESS, WorkflowStateManager
+
+
+class _FakeOrchestrator:
+    """Finishes each workflow after a short delay; employees named "fail-*" fail."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+
+    async def run(self, inputs):
+        await asyncio.sleep(self.delay)
+        if inputs["employee_id"].startswith("fail"):
+            raise RuntimeError("provisioning down")
+        return {"status": STATUS_COMPLETED, "wall_time_ms": 1.0, "tasks": {"docs": {"status": "completed"}}}
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def workers(tmp_path, store):
+    """Two runners sharing the workflow database and the shared state store."""
+    state_manager = WorkflowStateManager(database_url=f"sqlite:///{tmp_path / 'workflows.db'}")
+
+    def runner():
+        return OnboardingBatchRunner(
+            orchestrator=_FakeOrchestrator(), state_manager=state_manager, max_concurrency=2, store=store
+        )
+
+    return runner(), runner()
+
+
+def employees(*ids):
+    return [
+        {"employee_id": employee_id, "role": "Engineer", "department": "R&D", "start_date": "2026-11-02"}
+        for employee_id in ids
+    ]
+
+
+async def collect(runner, batch_id):
+    return [event async for event in runner.follow(batch_id)]
+
+
+async def test_other_worker_sees_progress_and_events(workers):
+    owner, other = workers
+    batch = await owner.start(employees("E1", "E2", "fail-3"))
+
+    running = await other.summary(batch.batch_id)
+    assert running["status"] == BATCH_RUNNING
+    assert running["total"] == 3
+    assert [w["employee_id"] for w in running["workflows"]] == ["E1", "E2", "fail-3"]
+
+    local, remote = await asyncio.gather(collect(owner, batch.batch_id), collect(other, batch.batch_id))
+
+    assert local == remote
+    states = [(e["employee_id"], e["state"]) for e in remote if e["event"] == "workflow_state"]
+    assert sorted(states) == sorted([
+        ("E1", STATE_IN_PROGRESS), ("E1", STATE_COMPLETED),
+        ("E2", STATE_IN_PROGRESS), ("E2", STATE_COMPLETED),
+        ("fail-3", STATE_IN_PROGRESS), ("fail-3", STATE_FAILED),
+    ])
+    assert remote[-1]["event"] == "batch_finished"
+
+    finished = await other.summary(batch.batch_id)
+    assert finished["status"] == BATCH_COMPLETED
+    assert (finished["in_progress"], finished["completed"], finished["failed"]) == (0, 2, 1)
+    assert finished == await owner.summary(batch.batch_id)
+
+
+async def test_late_follower_gets_the_full_log(workers):
+    owner, other = workers
+    batch = await owner.start(employees("E1"))
+    await batch.task
+
+    events = await collect(other, batch.batch_id)
+    assert [e["event"] for e in events] == ["workflow_state", "workflow_state", "batch_finished"]
+    assert all(e["batch_id"] == batch.batch_id for e in events)
+
+
+async def test_unknown_batch(workers):
+    owner, _ = workers
+    assert await owner.summary("batch-missing") is None
+    assert await collect(owner, "batch-missing") == []
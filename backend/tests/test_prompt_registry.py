@@ -0,0 +1,113 @@
+"""
+Tests for the compiled prompt templates in utils/prompt_registry.py.
+"""
+
+import pytest
+
+from utils.prompt_registry import PromptTemplate, PromptTemplateError, load_prompts_from_yaml
+
+
+def baseline_chat_task(message: str, history_blob: str, ctx: list) -> str:
+    """The chat task prompt as the crew manager built it with an f-string before the registry."""
+    return f"""You are an onboarding assistant. Answer based on general onboarding knowledge (documents, IT access, training, coordination).
+{history_blob}
+Current user message: "{message}"
+{f'Additional context: ' + '; '.join(ctx) if ctx else ''}
+
+Examples of good, varied answers (match the question type):
+- "What documents do I need?" → Give a concrete list: I-9, W-4, direct deposit form, ID. Brief note on where to submit.
+- "How does IT access work?" → Short steps: request triggered by HR, IT provisions email/VPN/tools, you receive credentials before day one.
+- "What training is required?" → List modules (e.g. security, code of conduct, role-specific) and how they're assigned.
+
+Instructions:
+1. ANSWER THE USER'S QUESTION DIRECTLY. Give concrete, specific information. Do NOT give the same generic overview every time.
+2. NEVER ask for Employee ID or Workflow ID. Do not say "Could you please provide Employee ID or Workflow ID" or similar.
+3. Vary your answer based on the question. Be concise and helpful.
+4. Reply in plain text only. No JSON, code blocks, or markdown. Write only the reply message."""
+
+
+@pytest.mark.parametrize("message, history_blob, ctx", [
+    ("What documents do I need?", "", []),
+    ('Is {employee_id} a "placeholder"? 中文 😀', "", ["Employee ID: E-1"]),
+    (
+        "And after that?",
+        "\n\nPrevious conversation:\nUser: When do I start?\nAssistant: Monday {9am}.\n\n",
+        ["Employee ID: E-1", "Workflow ID: wf-2"],
+    ),
+])
+def test_chat_task_matches_the_baseline_prompt(message, history_blob, ctx):
+    chat_task = load_prompts_from_yaml().get("chat_task")
+
+    rendered = chat_task.render(
+        history_blob=history_blob,
+        message=message,
+        context_line="Additional context: " + "; ".join(ctx) if ctx else "",
+    )
+
+    assert rendered == baseline_chat_task(message, history_blob, ctx)
+    assert chat_task.expected_output == (
+        "A direct, specific plain-text answer to the user's question; no JSON or formatting"
+    )
+
+
+def test_placeholders_are_filled_in_order():
+    template = PromptTemplate("t", "{a}-{b}-{a}", placeholders=["b", "a"])
+
+    assert template.render(a="1", b="2") == "1-2-1"
+    assert template.placeholders == ("a", "b")
+    with pytest.raises(KeyError):
+        template.render(a="1")
+
+
+def test_literal_braces_survive():
+    assert PromptTemplate("t", "{{literal}} {x}").render(x="{y}") == "{literal} {y}"
+
+
+@pytest.mark.parametrize("declared", [["a"], ["a", "b", "c"], []])
+def test_declared_placeholders_must_match_the_template(declared):
+    with pytest.raises(PromptTemplateError):
+        PromptTemplate("t", "{a} {b}", placeholders=declared)
+
+
+@pytest.mark.parametrize("text", ["{x!r}", "{x:>3}", "{}", "{0}", "{x.y}", "{x[0]}", "unbalanced {x", "stray }"])
+def test_only_plain_placeholders_are_allowed(text):
+    with pytest.raises(PromptTemplateError):
+        PromptTemplate("t", text)
+
+
+def test_version_follows_the_text():
+    original = PromptTemplate("t", "Hello {name}", expected_output="A greeting")
+
+    assert PromptTemplate("other", "Hello {name}", expected_output="A greeting").version == original.version
+    assert PromptTemplate("t", "Hello, {name}", expected_output="A greeting").version != original.version
+    assert PromptTemplate("t", "Hello {name}", expected_output="A reply").version != original.version
+
+
+def test_registry_loads_and_checks_yaml(tmp_path):
+    path = tmp_path / "prompts.yaml"
+    path.write_text(
+        "prompts:\n"
+        "  - id: greet\n"
+        "    placeholders: [name]\n"
+        "    template: 'Hello {name}'\n"
+    )
+    registry = load_prompts_from_yaml(str(path))
+
+    assert registry.get("greet").render(name="Ada") == "Hello Ada"
+    assert set(registry.versions()) == {"greet"}
+    with pytest.raises(PromptTemplateError):
+        registry.get("missing")
+
+    path.write_text(
+        "prompts:\n"
+        "  - id: greet\n"
+        "    placeholders: [name]\n"
+        "    template: 'Hello {first_name}'\n"
+    )
+    with pytest.raises(PromptTemplateError):
+        load_prompts_from_yaml(str(path))
+
+
+def test_missing_prompt_file_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_prompts_from_yaml(str(tmp_path / "missing.yaml"))
@@ -0,0 +1,176 @@
+"""
+Tests for services/rate_limiter.py.
+
+Limiters use their own in-process store, so tests do not share budget.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+
+import httpx
+import pytest
+
+from services.rate_limiter import (
+    LANE_BACKGROUND,
+    LANE_INTERACTIVE,
+    AsyncRateLimitedTransport,
+    RateLimiter,
+    RateLimitTimeoutError,
+    current_lane,
+    priority_lane,
+)
+from services.shared_state import InProcessStore, SQLiteStore
+
+
+def make_limiter(**kwargs) -> RateLimiter:
+    options = {"rpm": 600, "burst_seconds": 0.5, "max_wait_seconds": 2.0, "store": InProcessStore()}
+    options.update(kwargs)
+    return RateLimiter(**options)
+
+
+def completion_request(messages, **body) -> httpx.Request:
+    return httpx.Request(
+        "POST",
+        "http://llm.test/v1/chat/completions",
+        content=json.dumps({"model": "gpt-4o-mini", "messages": messages, **body}).encode(),
+    )
+
+
+def test_priority_lane_context():
+    assert current_lane() == LANE_INTERACTIVE
+    with priority_lane(LANE_BACKGROUND):
+        assert current_lane() == LANE_BACKGROUND
+    assert current_lane() == LANE_INTERACTIVE
+    with pytest.raises(ValueError):
+        with priority_lane("urgent"):
+            pass
+
+
+def test_burst_is_granted_then_paced():
+    # 600/min = 10/s; a 0.5 s bucket holds 5 requests
+    limiter = make_limiter()
+    waits = [limiter.acquire(0) for _ in range(5)]
+    assert max(waits) < 0.02
+
+    started = time.monotonic()
+    limiter.acquire(0)
+    assert 0.05 < time.monotonic() - started < 0.5
+    assert limiter.stats()["lanes"][LANE_INTERACTIVE]["granted"] == 6
+
+
+def test_call_times_out_without_budget():
+    limiter = make_limiter(rpm=60, burst_seconds=1, max_wait_seconds=0.1)
+    limiter.acquire(0)
+    with pytest.raises(RateLimitTimeoutError) as exc:
+        limiter.acquire(0)
+    assert exc.value.retry_after >= 1.0
+    assert limiter.stats()["lanes"][LANE_INTERACTIVE]["timeouts"] == 1
+
+
+def test_background_lane_leaves_a_reserve_for_chat():
+    limiter = make_limiter(rpm=60, burst_seconds=5, interactive_reserve=0.4, max_wait_seconds=0.05)
+    # Bucket of 5 with a reserve of 2: background gets 3
+    for _ in range(3):
+        limiter.acquire(0, LANE_BACKGROUND)
+    with pytest.raises(RateLimitTimeoutError):
+        limiter.acquire(0, LANE_BACKGROUND)
+    # Chat can still use the reserve
+    limiter.acquire(0, LANE_INTERACTIVE)
+    limiter.acquire(0, LANE_INTERACTIVE)
+
+
+def test_token_budget():
+    limiter = make_limiter(rpm=0, tpm=6000, burst_seconds=1, max_wait_seconds=0.05)
+    # 100 tokens per burst second
+    limiter.acquire(80)
+    with pytest.raises(RateLimitTimeoutError):
+        limiter.acquire(80)
+
+
+def test_workers_sharing_a_store_share_the_budget():
+    store = InProcessStore()
+    first = make_limiter(rpm=60, burst_seconds=2, max_wait_seconds=0.05, store=store)
+    second = make_limiter(rpm=60, burst_seconds=2, max_wait_seconds=0.05, store=store)
+    first.acquire(0)
+    second.acquire(0)
+    with pytest.raises(RateLimitTimeoutError):
+        first.acquire(0)
+
+
+async def test_waiting_chat_call_goes_before_waiting_workflow_call():
+    limiter = make_limiter(rpm=600, burst_seconds=0.1)
+    await limiter.aacquire(0)
+    order = []
+
+    async def call(lane):
+        await limiter.aacquire(0, lane)
+        order.append(lane)
+
+    await asyncio.gather(call(LANE_BACKGROUND), call(LANE_INTERACTIVE))
+    assert order == [LANE_INTERACTIVE, LANE_BACKGROUND]
+
+
+def test_cost_only_for_completion_calls():
+    limiter = make_limiter(tpm=10000, completion_tokens=256)
+    assert limiter.cost(httpx.Request("GET", "http://llm.test/v1/models")) is None
+
+    short = limiter.cost(completion_request([{"role": "user", "content": "hi"}]))
+    capped = limiter.cost(completion_request([{"role": "user", "content": "hi"}], max_tokens=10))
+    assert short - capped == 256 - 10
+    assert make_limiter().cost(completion_request([])) == 0
+
+
+async def test_transport_answers_locally_when_budget_times_out():
+    upstream_calls = 0
+
+    def upstream(request):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        return httpx.Response(200, json={"ok": True})
+
+    limiter = make_limiter(rpm=60, burst_seconds=1, max_wait_seconds=0.05)
+    transport = AsyncRateLimitedTransport(httpx.MockTransport(upstream), limiter)
+    async with httpx.AsyncClient(transport=transport) as client:
+        first = await client.post("http://llm.test/v1/chat/completions", json={"messages": []})
+        second = await client.post("http://llm.test/v1/chat/completions", json={"messages": []})
+        models = await client.get("http://llm.test/v1/models")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["x-should-retry"] == "false"
+    assert models.status_code == 200
+    assert upstream_calls == 2
+
+
+def test_headroom_follows_this_workers_debits():
+    limiter = make_limiter(rpm=60, burst_seconds=10)
+    assert limiter.headroom() == 1.0
+    for _ in range(5):
+        limiter.acquire(0)
+    assert 0.5 <= limiter.headroom() < 0.6
+
+
+async def test_async_acquire_does_not_block_on_a_locked_store(tmp_path):
+    path = str(tmp_path / "state.db")
+    limiter = make_limiter(store=SQLiteStore(path, busy_timeout=2.0))
+    # Another worker holds the write lock for a while
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    acquire = asyncio.create_task(limiter.aacquire(0))
+    await asyncio.sleep(0.3)
+    blocker.execute("COMMIT")
+    assert await acquire >= 0.25
+    task.cancel()
+    blocker.close()
+    assert ticks >= 10
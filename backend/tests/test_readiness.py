@@ -0,0 +1,157 @@
+"""
+Tests for startup readiness: /health/ready in main.py and the warm-up
+checks in services/warmup.py.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import warmup, workflow_state
+from services.warmup import WARMUP_DEGRADED, WARMUP_FAILED, WARMUP_OK, run_warmup, validate_agent_config
+from utils import llm_factory
+from utils.agent_loader import load_agents_from_yaml, load_tasks_from_yaml
+
+
+def wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def workflow_database(monkeypatch, tmp_path):
+    # The warm-up opens it from a worker thread; an in-memory SQLite
+    # database exists only on the connection that created its tables
+    manager = workflow_state.WorkflowStateManager(database_url=f"sqlite:///{tmp_path / 'workflows.db'}")
+    monkeypatch.setattr(workflow_state, "_state_manager", manager)
+
+
+@pytest.fixture
+def llm_endpoint(monkeypatch):
+    """Point the warm-up probes at a stand-in LLM endpoint; set ``reachable`` to choose its behaviour."""
+    endpoint = SimpleNamespace(reachable=True, probes=0)
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        endpoint.probes += 1
+        if not endpoint.reachable:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(401, json={"error": "no key"})
+
+    transport = httpx.MockTransport(handle)
+    monkeypatch.setattr(llm_factory, "get_http_client", lambda: httpx.Client(transport=transport))
+    monkeypatch.setattr(llm_factory, "get_async_http_client", lambda: httpx.AsyncClient(transport=transport))
+    return endpoint
+
+
+def test_shipped_config_is_valid():
+    assert validate_agent_config(load_agents_from_yaml(), load_tasks_from_yaml()) == []
+
+
+def test_config_problems_are_reported():
+    agents = {
+        "helper": {"role": "Helper", "goal": "", "backstory": "b", "max_iter": 0, "tools": "email_system"},
+    }
+    tasks = {
+        "a": {"agent": "helper", "dependencies": ["b"]},
+        "b": {"agent": "nobody", "dependencies": ["a"]},
+    }
+
+    problems = validate_agent_config(agents, tasks)
+
+    assert problems[:4] == [
+        "agent 'onboarding_orchestrator' is missing",
+        "agent 'helper' has no goal",
+        "agent 'helper' max_iter must be a positive integer, got 0",
+        "agent 'helper' tools must be a list",
+    ]
+    assert "task 'b' uses unknown agent 'nobody'" in problems
+    assert any("cycle" in problem for problem in problems)
+
+
+async def test_warmup_ok_with_a_reachable_llm(llm_endpoint):
+    report = await run_warmup()
+
+    assert report["status"] == WARMUP_OK
+    # Any HTTP response counts, even 401
+    assert report["steps"]["llm_connections"]["http_status"] == [401]
+    assert llm_endpoint.probes > 0
+
+
+async def test_bad_agent_config_fails_warmup(llm_endpoint, monkeypatch):
+    monkeypatch.setattr(warmup, "load_agents_from_yaml", lambda: {"helper": {"role": "Helper"}})
+
+    report = await run_warmup()
+
+    assert report["status"] == WARMUP_FAILED
+    assert report["steps"]["config"]["status"] == WARMUP_FAILED
+
+
+async def test_unreachable_llm_degrades_warmup(llm_endpoint, settings):
+    llm_endpoint.reachable = False
+
+    report = await run_warmup()
+    assert report["status"] == WARMUP_DEGRADED
+    assert report["steps"]["llm_connections"]["errors"]
+
+    settings.set(WARMUP_REQUIRE_LLM=True)
+    assert (await run_warmup())["status"] == WARMUP_FAILED
+
+
+@pytest.fixture
+def crew_build(monkeypatch, settings):
+    """Hold the crew manager build until ``release`` is set; ``fail`` makes it raise."""
+    build = SimpleNamespace(release=threading.Event(), fail=False)
+
+    def build_crew_manager():
+        build.release.wait(timeout=10)
+        if build.fail:
+            raise RuntimeError("agents.yaml is broken")
+        return SimpleNamespace(shutdown=lambda: None)
+
+    monkeypatch.setattr(main, "_build_crew_manager", build_crew_manager)
+    settings.set(CREW_INIT_BACKGROUND=True, WARMUP_ENABLED=False)
+    yield build
+    build.release.set()
+
+
+def test_not_ready_while_initializing(crew_build):
+    with TestClient(main.app) as client:
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["crew_manager"] == "initializing"
+        # Liveness does not wait for the build
+        assert client.get("/health/live").status_code == 200
+
+        crew_build.release.set()
+        wait_for(lambda: client.get("/health/ready").status_code == 200)
+        assert client.get("/health/ready").json()["warmup"]["status"] == WARMUP_OK
+
+
+def test_not_ready_after_a_failed_build(crew_build):
+    crew_build.fail = True
+    crew_build.release.set()
+    with TestClient(main.app) as client:
+        wait_for(lambda: client.get("/health").json()["crew_manager"] == "failed")
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+
+def test_not_ready_when_warmup_fails(crew_build, llm_endpoint, monkeypatch, settings):
+    settings.set(WARMUP_ENABLED=True)
+    monkeypatch.setattr(warmup, "load_agents_from_yaml", lambda: {})
+    crew_build.release.set()
+    with TestClient(main.app) as client:
+        wait_for(lambda: client.get("/health/ready").json()["warmup"]["status"] != "pending")
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["warmup"]["status"] == WARMUP_FAILED
@@ -0,0 +1,272 @@
+"""
+Tests for services/resilience.py: failure classification, backoff, circuit
+breakers, retries and hedged requests.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from services.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    ERROR_PERMANENT,
+    ERROR_RATE_LIMITED,
+    ERROR_TRANSIENT,
+    AsyncResilientTransport,
+    CircuitBreaker,
+    CircuitOpenError,
+    ExceptionHandler,
+    ResilientTransport,
+    RetryPolicy,
+    classify_error,
+    classify_status,
+    retry_after_seconds,
+)
+
+COMPLETIONS = "http://llm.test/v1/chat/completions"
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ServiceUnavailableError(Exception):
+    pass
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def fast_handler(**kwargs) -> ExceptionHandler:
+    return ExceptionHandler(policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01), **kwargs)
+
+
+def scripted(*statuses):
+    """Mock upstream answering with the given statuses in turn; records its calls."""
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        return httpx.Response(statuses[min(len(calls), len(statuses)) - 1], json={"ok": True})
+
+    return respond, calls
+
+
+@pytest.mark.parametrize("status, kind", [
+    (200, None), (302, None),
+    (429, ERROR_RATE_LIMITED),
+    (408, ERROR_TRANSIENT), (500, ERROR_TRANSIENT), (503, ERROR_TRANSIENT), (529, ERROR_TRANSIENT),
+    (400, ERROR_PERMANENT), (401, ERROR_PERMANENT), (404, ERROR_PERMANENT),
+])
+def test_classify_status(status, kind):
+    assert classify_status(status) == kind
+
+
+@pytest.mark.parametrize("error, kind", [
+    (_StatusError(503), ERROR_TRANSIENT),
+    (_StatusError(429), ERROR_RATE_LIMITED),
+    (_StatusError(400), ERROR_PERMANENT),
+    (httpx.ConnectTimeout("slow"), ERROR_TRANSIENT),
+    (ConnectionResetError(), ERROR_TRANSIENT),
+    (ServiceUnavailableError(), ERROR_TRANSIENT),
+    (RateLimitError(), ERROR_RATE_LIMITED),
+    (CircuitOpenError("llm.test", 5), ERROR_TRANSIENT),
+    (ValueError("bad input"), ERROR_PERMANENT),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_retry_after_header():
+    assert retry_after_seconds(httpx.Headers({"retry-after": "2.5"})) == 2.5
+    assert retry_after_seconds(httpx.Headers({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(httpx.Headers({"retry-after": "soon"})) is None
+    assert retry_after_seconds(httpx.Headers()) is None
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=2.0)
+    for attempt in range(3):
+        assert 0 <= policy.delay(attempt) <= min(2.0, 0.5 * 2 ** attempt)
+    assert policy.delay(3) is None
+    assert policy.delay(0, retry_after=1.5) == 1.5
+    # Longer than we are willing to wait: give up
+    assert policy.delay(0, retry_after=30) is None
+
+
+def test_circuit_breaker_transitions():
+    breaker = CircuitBreaker("tool", failure_threshold=2, recovery_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN and not breaker.allow()
+
+    asyncio.run(asyncio.sleep(0.06))
+    # One probe at a time once the recovery time has passed
+    assert breaker.allow()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_call_retries_transient_errors():
+    handler = fast_handler()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ServiceUnavailableError()
+        return "ok"
+
+    assert handler.call(flaky, "tool") == "ok"
+    assert len(attempts) == 3
+    assert handler.stats()["retries"] == 2
+
+
+def test_call_does_not_retry_permanent_errors():
+    handler = fast_handler()
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        handler.call(broken, "tool")
+    assert len(attempts) == 1
+
+
+def test_call_does_not_retry_writes():
+    handler = fast_handler()
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        handler.call(send, "tool", idempotent=False)
+    assert len(attempts) == 1
+    assert handler.stats()["upstreams"]["tool"]["consecutive_failures"] == 1
+
+
+def test_open_circuit_fails_fast():
+    handler = fast_handler(failure_threshold=3, recovery_seconds=60)
+
+    def down():
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        handler.call(down, "tool")
+    with pytest.raises(CircuitOpenError):
+        handler.call(down, "tool")
+    assert handler.stats()["upstreams"]["tool"]["state"] == CIRCUIT_OPEN
+
+
+def test_transport_retries_server_errors():
+    respond, calls = scripted(500, 502, 200)
+    transport = ResilientTransport(httpx.MockTransport(respond), fast_handler())
+    with httpx.Client(transport=transport) as client:
+        response = client.post(COMPLETIONS, json={"messages": []})
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_transport_gives_up_and_stops_client_retries():
+    respond, calls = scripted(400)
+    transport = ResilientTransport(httpx.MockTransport(respond), fast_handler())
+    with httpx.Client(transport=transport) as client:
+        response = client.post(COMPLETIONS, json={"messages": []})
+        other = client.get("http://llm.test/v1/models")
+    assert response.status_code == 400
+    assert response.headers["x-should-retry"] == "false"
+    assert other.status_code == 400
+    assert len(calls) == 2
+
+
+def test_transport_leaves_local_answers_alone():
+    calls = []
+
+    def limited(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"x-should-retry": "false"})
+
+    transport = ResilientTransport(httpx.MockTransport(limited), fast_handler())
+    with httpx.Client(transport=transport) as client:
+        assert client.post(COMPLETIONS, json={}).status_code == 429
+    assert len(calls) == 1
+
+
+async def test_slow_call_is_hedged():
+    handler = fast_handler(hedge_enabled=True, hedge_min_samples=1, hedge_max_ratio=1.0)
+    handler.latency("llm.test").observe(0.01)
+    calls = 0
+
+    async def respond(request):
+        nonlocal calls
+        calls += 1
+        # The first attempt hangs; the hedge answers
+        await asyncio.sleep(5 if calls == 1 else 0)
+        return httpx.Response(200, json={"attempt": calls})
+
+    transport = AsyncResilientTransport(httpx.MockTransport(respond), handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await asyncio.wait_for(client.post(COMPLETIONS, json={}), 2)
+
+    assert response.json() == {"attempt": 2}
+    assert handler.stats()["hedges_won"] == 1
+
+
+async def test_no_hedge_without_rate_headroom():
+    handler = fast_handler(hedge_enabled=True, hedge_min_samples=1, hedge_max_ratio=1.0, hedge_min_headroom=0.5)
+    handler.latency("llm.test").observe(0.001)
+    calls = 0
+
+    async def respond(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={})
+
+    transport = AsyncResilientTransport(httpx.MockTransport(respond), handler, headroom=lambda: 0.1)
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert (await client.post(COMPLETIONS, json={})).status_code == 200
+    assert calls == 1
+
+
+@pytest.mark.parametrize("body", [
+    pytest.param({"messages": [], "tools": [{"type": "function"}]}, id="offers tools"),
+    pytest.param({"messages": [{"role": "tool", "content": "sent"}]}, id="tool result"),
+    pytest.param({"messages": [{"role": "assistant", "tool_calls": [{"id": "1"}]}]}, id="tool call"),
+])
+async def test_tool_calls_are_not_hedged(body):
+    handler = fast_handler(hedge_enabled=True, hedge_min_samples=1, hedge_max_ratio=1.0)
+    handler.latency("llm.test").observe(0.001)
+    calls = 0
+
+    async def respond(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={})
+
+    transport = AsyncResilientTransport(httpx.MockTransport(respond), handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert (await client.post(COMPLETIONS, json=body)).status_code == 200
+    assert calls == 1
+    assert handler.stats()["hedges"] == 0
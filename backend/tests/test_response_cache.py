@@ -0,0 +1,84 @@
+"""
+Tests for services/response_cache.py.
+"""
+
+import time
+
+from services.response_cache import ResponseCache, context_key, history_digest, normalize_message
+from services.shared_state import InProcessStore, SQLiteStore
+
+
+def test_normalize_message():
+    assert normalize_message("  What documents, do I NEED?? ") == "what documents do i need"
+
+
+def test_context_key_is_order_independent():
+    assert context_key(model="m", employee_id="E1") == context_key(employee_id="E1", model="m")
+    assert context_key(model="m", employee_id="E1") != context_key(model="m", employee_id="E2")
+
+
+def test_history_digest():
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello "}]
+    assert history_digest(None) == ""
+    assert history_digest(history) == history_digest([dict(m) for m in history])
+    assert history_digest(history) != history_digest(history[:1])
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    cache.set("What documents do I need?", "ctx", "Bring your ID.")
+
+    assert cache.get("what documents do i need", "ctx") == "Bring your ID."
+    assert cache.get("What documents do I need?", "other-ctx") is None
+    stats = cache.stats()
+    assert (stats["hits_exact"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_empty_answers_are_not_stored():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    cache.set("question", "ctx", "")
+    assert cache.get("question", "ctx") is None
+
+
+def test_entries_expire():
+    cache = ResponseCache(max_entries=10, ttl_seconds=0.05)
+    cache.set("question", "ctx", "answer")
+    time.sleep(0.1)
+    assert cache.get("question", "ctx") is None
+
+
+def test_similarity_tier_matches_rephrasings_in_same_context():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.6)
+    cache.set("What documents do I need for my first day?", "ctx", "Bring your ID.")
+
+    assert cache.get("Which documents do I need for my first day", "ctx") == "Bring your ID."
+    assert cache.get("Which documents do I need for my first day", "other-ctx") is None
+    assert cache.get("Where is the cafeteria?", "ctx") is None
+    assert cache.stats()["hits_similar"] == 1
+
+
+def test_shared_tier_serves_other_workers():
+    store = InProcessStore()
+    writer = ResponseCache(max_entries=10, ttl_seconds=60, shared=store)
+    reader = ResponseCache(max_entries=10, ttl_seconds=60, shared=store)
+    writer.set("question", "ctx", "answer")
+
+    assert reader.get("question", "ctx") == "answer"
+    assert reader.stats()["hits_shared"] == 1
+    # Now in the reader's local tier
+    assert reader.get("question", "ctx") == "answer"
+    assert reader.stats()["hits_exact"] == 1
+
+
+async def test_async_access_through_sqlite(tmp_path):
+    store = SQLiteStore(str(tmp_path / "state.db"))
+    writer = ResponseCache(max_entries=10, ttl_seconds=60, shared=store)
+    reader = ResponseCache(max_entries=10, ttl_seconds=60, shared=store)
+    await writer.aset("question", "ctx", "answer")
+    await writer.aset("empty", "ctx", "")
+
+    assert await reader.aget("question", "ctx") == "answer"
+    assert await reader.aget("empty", "ctx") is None
+    assert reader.stats()["hits_shared"] == 1
+    assert writer.stats()["stores"] == 1
+    store.close()
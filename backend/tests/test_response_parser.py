@@ -0,0 +1,118 @@
+"""
+Property tests for utils/response_parser.py.
+
+Randomized but seeded:
+
+1. extract_plain_message returns the message field of the first top-level
+   JSON object that has one, whatever surrounds it: prose, markdown fences,
+   decoy objects, braces and quotes inside strings, escapes, unicode.
+2. JSONMessageStream fed the same text in random chunk sizes (down to one
+   character) yields exactly the same message, in order.
+3. Text without JSON is returned unchanged, and pathological inputs such as
+   "{{{{..." or unterminated strings finish in linear time.
+"""
+
+import json
+import random
+import time
+
+import pytest
+
+from utils.response_parser import MESSAGE_KEYS, JSONMessageStream, extract_plain_message
+
+ALPHABET = (
+    'abc XYZ 019 {}[]":,\\/\n\t`*#'
+    "éß中文😀 \u0000"
+)
+
+
+def random_text(rng: random.Random, max_len: int = 40) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.randint(0, 6 if depth < 3 else 3)
+    if kind == 0:
+        return random_text(rng)
+    if kind == 1:
+        return rng.randint(-10**6, 10**6)
+    if kind == 2:
+        return rng.choice([True, False, None, 1.5e-3])
+    if kind == 3:
+        return random_text(rng, 8)
+    if kind in (4, 5):
+        return {random_text(rng, 6): random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+
+
+def decoy(rng: random.Random) -> str:
+    """Prose or JSON that must not be mistaken for the reply."""
+    options = [
+        lambda: random_text(rng).replace("{", "(").replace("[", "("),
+        lambda: json.dumps({"note": random_text(rng), "data": random_value(rng)}),
+        lambda: json.dumps([random_value(rng)]).replace("{", "(").replace("}", ")"),
+        lambda: "Thought: I now know the final answer",
+    ]
+    return rng.choice(options)()
+
+
+def make_case(rng: random.Random):
+    message = random_text(rng, 200)
+    obj = {random_text(rng, 6): random_value(rng) for _ in range(rng.randint(0, 2))}
+    obj = {k: v for k, v in obj.items() if k not in MESSAGE_KEYS}
+    items = list(obj.items())
+    items.insert(rng.randint(0, len(items)), (rng.choice(MESSAGE_KEYS), message))
+    body = json.dumps(dict(items), ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    fence = rng.choice(["", "```json\n", "```\n", "```JSON "])
+    text = decoy(rng) + "\n" + fence + body + ("\n```" if fence else "") + "\n" + decoy(rng)
+    return text, message
+
+
+def stream(text: str, rng: random.Random) -> str:
+    parser = JSONMessageStream()
+    out, i = [], 0
+    while i < len(text):
+        n = rng.choice([1, 1, 2, 3, 7, 16, 64])
+        out.append(parser.feed(text[i:i + n]))
+        i += n
+    return "".join(out)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_message_extracted_from_any_surroundings(seed):
+    rng = random.Random(seed)
+    for _ in range(1000):
+        text, message = make_case(rng)
+        assert extract_plain_message(text) == message, text
+        assert stream(text, rng) == message, text
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_plain_text_unchanged(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        plain = decoy(rng)
+        assert extract_plain_message(plain) == plain
+
+
+def test_prose_braces_do_not_hide_a_later_reply():
+    # Each "{xN}" is rejected at its first character, so none of them
+    # uses up the extractor's budget for failed candidates
+    text = " ".join(f"{{x{i}}}" for i in range(16)) + ' {"message": "hello"}'
+
+    assert extract_plain_message(text) == "hello"
+    assert extract_plain_message(text) == stream(text, random.Random(0))
+
+
+@pytest.mark.parametrize("text", [
+    pytest.param("{" * 200_000, id="open braces"),
+    pytest.param('{"message": "' + "a" * 200_000, id="unterminated string"),
+    pytest.param('{"a": {' * 50_000, id="brace soup"),
+    pytest.param('{"x": "' + "\\\\" * 100_000, id="escapes"),
+    pytest.param('{"a": "b{"c' * 50_000, id="unterminated strings"),
+])
+def test_pathological_input_is_linear(text):
+    started = time.perf_counter()
+    extract_plain_message(text)
+    stream(text, random.Random(0))
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,119 @@
+"""
+Tests for services/shared_state.py: both backends honour the same interface,
+and SQLite updates are atomic across processes.
+"""
+
+import asyncio
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from services.shared_state import InProcessStore, SQLiteStore, resolve_backend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = InProcessStore() if request.param == "memory" else SQLiteStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def test_get_set_delete(store):
+    assert store.get("ns", "k") is None
+    assert store.get("ns", "k", "fallback") == "fallback"
+
+    store.set("ns", "k", {"answer": [1, 2]})
+    assert store.get("ns", "k") == {"answer": [1, 2]}
+    assert store.get("other", "k") is None
+
+    assert store.delete("ns", "k") is True
+    assert store.delete("ns", "k") is False
+    assert store.get("ns", "k") is None
+
+
+def test_values_expire(store):
+    store.set("ns", "short", 1, ttl=0.05)
+    store.set("ns", "long", 2)
+    time.sleep(0.1)
+    assert store.get("ns", "short") is None
+    assert store.get("ns", "long") == 2
+
+
+def test_update_and_incr(store):
+    assert store.update("ns", "list", lambda value: (value or []) + ["a"]) == ["a"]
+    assert store.update("ns", "list", lambda value: (value or []) + ["b"]) == ["a", "b"]
+    assert store.incr("ns", "n") == 1
+    assert store.incr("ns", "n", 2.5) == 3.5
+
+
+def test_failed_update_keeps_the_old_value(store):
+    store.set("ns", "k", 1)
+
+    def fail(value):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        store.update("ns", "k", fail)
+    assert store.get("ns", "k") == 1
+
+
+def test_resolve_backend():
+    assert resolve_backend("auto", 1) == "memory"
+    assert resolve_backend("auto", 4) == "sqlite"
+    assert resolve_backend("memory", 4) == "memory"
+
+
+def _count(path: str, times: int) -> None:
+    store = SQLiteStore(path)
+    for _ in range(times):
+        store.incr("ns", "n")
+    store.close()
+
+
+def test_sqlite_increments_are_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "state.db")
+    SQLiteStore(path).close()
+    workers = [multiprocessing.Process(target=_count, args=(path, 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    assert SQLiteStore(path).get("ns", "n") == 800
+
+
+async def test_async_methods(store):
+    await store.aset("ns", "k", [1])
+    assert await store.aget("ns", "k") == [1]
+    assert await store.aupdate("ns", "k", lambda value: value + [2]) == [1, 2]
+    assert await store.aincr("ns", "n", 3) == 3
+    assert await store.adelete("ns", "k") is True
+    assert await store.aget("ns", "k", "gone") == "gone"
+
+
+async def test_sqlite_calls_leave_the_event_loop_free(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SQLiteStore(path, busy_timeout=2.0)
+    # Another worker holds the write lock for a while
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    write = asyncio.create_task(store.aincr("ns", "n"))
+    await asyncio.sleep(0.3)
+    blocker.execute("COMMIT")
+    assert await write == 1
+    task.cancel()
+    blocker.close()
+    store.close()
+    assert ticks >= 10
@@ -0,0 +1,116 @@
+"""
+Tests for services/single_flight.py.
+"""
+
+import asyncio
+
+from services.single_flight import SingleFlight
+
+
+async def collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+async def test_concurrent_identical_requests_share_one_producer():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def produce():
+        nonlocal started
+        started += 1
+        yield "Hello, "
+        await release.wait()
+        yield "world"
+
+    streams = [asyncio.create_task(collect(flight.stream("key", produce))) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert flight.in_flight("key")
+    release.set()
+
+    assert await asyncio.gather(*streams) == ["Hello, world"] * 5
+    assert started == 1
+    stats = flight.stats()
+    assert (stats["leaders"], stats["followers"], stats["in_flight"]) == (1, 4, 0)
+
+
+async def test_late_follower_gets_earlier_chunks_replayed():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def produce():
+        yield "a"
+        yield "b"
+        await release.wait()
+        yield "c"
+
+    leader = asyncio.create_task(collect(flight.stream("key", produce)))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(collect(flight.stream("key", produce)))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await leader == await follower == "abc"
+
+
+async def test_new_request_after_completion_starts_a_new_flight():
+    flight = SingleFlight()
+    calls = 0
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        yield str(calls)
+
+    assert await collect(flight.stream("key", produce)) == "1"
+    assert await collect(flight.stream("key", produce)) == "2"
+    assert flight.stats()["leaders"] == 2
+
+
+async def test_producer_error_reaches_every_subscriber():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def produce():
+        yield "partial"
+        await release.wait()
+        raise RuntimeError("upstream failed")
+
+    streams = [asyncio.create_task(collect(flight.stream("key", produce))) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    results = await asyncio.gather(*streams, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["failed"] == 1
+
+
+async def test_producer_finishes_when_subscribers_leave():
+    flight = SingleFlight()
+    finished = asyncio.Event()
+
+    async def produce():
+        yield "a"
+        await asyncio.sleep(0.02)
+        yield "b"
+        finished.set()
+
+    stream = flight.stream("key", produce)
+    assert await stream.__anext__() == "a"
+    await stream.aclose()
+
+    await asyncio.wait_for(finished.wait(), timeout=1)
+
+
+async def test_different_keys_do_not_share():
+    flight = SingleFlight()
+
+    def producer(key):
+        async def produce():
+            await asyncio.sleep(0.01)
+            yield key
+        return produce
+
+    answers = await asyncio.gather(*(collect(flight.stream(k, producer(k))) for k in ("a", "b")))
+    assert answers == ["a", "b"]
+    assert flight.stats()["followers"] == 0
@@ -0,0 +1,46 @@
+"""
+Tests for the local token counter in utils/token_counter.py.
+"""
+
+import pytest
+
+from utils import token_counter
+from utils.token_counter import estimate_tokens, get_token_counter
+
+
+@pytest.fixture(autouse=True)
+def fresh_encoders(monkeypatch):
+    monkeypatch.setattr(token_counter, "_encoders", {})
+
+
+def test_estimate_over_counts_english_text():
+    text = "Please schedule my security training for next Monday morning."
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+    assert estimate_tokens("x" * 35) == 11
+    # More than the usual 4 characters per token would give
+    assert estimate_tokens(text) > len(text) / 4
+
+
+def test_encoder_is_loaded_once_per_model(monkeypatch):
+    loaded = []
+
+    def load(model):
+        loaded.append(model)
+        return str.split
+
+    monkeypatch.setattr(token_counter, "_load_encoder", load)
+    count = get_token_counter("openai/gpt-4o-mini")
+
+    assert count("one two three") == 3
+    assert count("") == 0
+    get_token_counter("openai/gpt-4o-mini")
+    # Provider prefixes are dropped before looking up the encoding
+    assert loaded == ["gpt-4o-mini"]
+
+
+def test_falls_back_to_the_estimate_without_an_encoding(monkeypatch):
+    monkeypatch.setattr(token_counter, "_load_encoder", lambda model: None)
+
+    assert get_token_counter("anthropic/claude-3-haiku") is estimate_tokens
@@ -0,0 +1,83 @@
+"""
+Tests for utils/tracing.py: the JSON-lines span exporter, and the stage
+spans a crew chat request records (a real crew whose litellm calls are
+replaced).
+"""
+
+import json
+from types import SimpleNamespace
+
+import litellm
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.chat import router
+from services.crew_manager import OnboardingCrewManager
+from utils import tracing
+from utils.tracing import InMemorySpanExporter, JSONLinesSpanExporter, Tracer
+
+
+def test_file_exporter_writes_finished_spans(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JSONLinesSpanExporter(str(path))
+    tracer = Tracer(exporter)
+
+    with tracer.span("chat.request", parent=None) as root:
+        with tracer.span("chat.generate", route="direct"):
+            pass
+    exporter.shutdown()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [s["name"] for s in spans] == ["chat.generate", "chat.request"]
+    assert spans[0]["parent_id"] == f"0x{root.span_id:016x}"
+    assert spans[0]["attributes"] == {"route": "direct"}
+    # Spans ending after shutdown are ignored
+    tracer.record("late", 0.001)
+
+
+
+def test_crew_request_records_every_stage(settings, monkeypatch):
+    settings.set(KICKOFF_QUEUE_SIZE=100, ENABLE_STREAMING=True)
+    exporter = InMemorySpanExporter(1000)
+    monkeypatch.setattr(tracing, "_tracer", Tracer(exporter))
+    # One tool step, then the final answer
+    replies = iter([
+        "Thought: I should schedule it\nAction: task_scheduler\n"
+        'Action Input: {"task_id": "t1", "task_type": "training", "dependencies": []}',
+        "Thought: I now know the final answer\nFinal Answer: Scheduled.",
+    ])
+
+    def completion(**params):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=next(replies)))])
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    manager = OnboardingCrewManager()
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.crew_manager = manager
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/chat", json={"message": "Please schedule my security training"})
+    finally:
+        manager.shutdown()
+
+    assert response.status_code == 200
+    assert "Scheduled." in response.text
+    spans = exporter.spans()
+    assert len({s.trace_id for s in spans}) == 1
+    by_id = {s.span_id: s for s in spans}
+    parents = [(s.name, by_id[s.parent_id].name if s.parent_id else None) for s in spans]
+    for stage in [
+        ("chat.request", None),
+        ("chat.validate", "chat.request"),
+        ("chat.stream", "chat.request"),
+        ("chat.generate", "chat.stream"),
+        ("chat.prompt_build", "chat.generate"),
+        ("kickoff.queue_wait", "chat.generate"),
+        ("crew.kickoff", "chat.generate"),
+        ("tool.task_scheduler", "crew.kickoff"),
+    ]:
+        assert stage in parents
+    # Both of the agent's LLM calls, under the kickoff
+    assert parents.count(("llm.call", "crew.kickoff")) == 2
+    assert [s.name for s in spans].count("llm.call") == 2
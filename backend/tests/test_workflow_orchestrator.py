@@ -0,0 +1,126 @@
+"""
+Tests for services/workflow_orchestrator.py: DAG planning and execution.
+
+Tasks run a simulated runner instead of a crew.
+"""
+
+import time
+
+import pytest
+
+from services.rate_limiter import LANE_BACKGROUND, current_lane
+from services.workflow_orchestrator import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_TIMED_OUT,
+    FullWorkflowOrchestrator,
+    WorkflowConfigError,
+    plan_levels,
+)
+from utils.agent_loader import load_tasks_from_yaml
+
+AGENTS = {"worker": {"max_execution_time": 5}, "slow": {"max_execution_time": 0.05}}
+
+# docs -> it; training and coordination independent; report after all
+TASKS = {
+    "docs": {"id": "docs", "agent": "worker"},
+    "training": {"id": "training", "agent": "worker"},
+    "coordination": {"id": "coordination", "agent": "worker"},
+    "it": {"id": "it", "agent": "worker", "dependencies": ["docs"]},
+    "report": {"id": "report", "agent": "worker", "dependencies": ["it", "training", "coordination"]},
+}
+
+
+def sleeping_runner(seconds: float, fail=()):
+    def run(task_config, agent_config, context):
+        time.sleep(seconds)
+        if task_config["id"] in fail:
+            raise RuntimeError(f"{task_config['id']} failed")
+        return f"{task_config['id']} done ({len(context['dependency_outputs'])} inputs)"
+    return run
+
+
+@pytest.fixture
+def make_orchestrator():
+    created = []
+
+    def make(tasks=TASKS, runner=None, agents=AGENTS):
+        orchestrator = FullWorkflowOrchestrator(
+            agents_config=agents,
+            tasks_config=tasks,
+            task_runner=runner or sleeping_runner(0.05),
+            max_workers=8,
+        )
+        created.append(orchestrator)
+        return orchestrator
+
+    yield make
+    for orchestrator in created:
+        orchestrator.shutdown()
+
+
+def test_plan_levels():
+    levels = plan_levels(TASKS)
+    assert [sorted(level) for level in levels] == [["coordination", "docs", "training"], ["it"], ["report"]]
+
+
+def test_plan_levels_for_shipped_tasks():
+    tasks = load_tasks_from_yaml()
+    levels = plan_levels(tasks)
+    assert sorted(t for level in levels for t in level) == sorted(tasks)
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(WorkflowConfigError, match="unknown task"):
+        plan_levels({"a": {"dependencies": ["missing"]}})
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(WorkflowConfigError, match="cycle"):
+        plan_levels({"a": {"dependencies": ["b"]}, "b": {"dependencies": ["a"]}, "c": {}})
+
+
+def test_unknown_agent_is_rejected(make_orchestrator):
+    with pytest.raises(WorkflowConfigError, match="unknown agent"):
+        make_orchestrator(tasks={"a": {"id": "a", "agent": "nobody"}})
+
+
+async def test_independent_tasks_run_in_parallel(make_orchestrator):
+    report = await make_orchestrator(runner=sleeping_runner(0.1)).run({"employee_id": "E1"})
+
+    assert report["status"] == STATUS_COMPLETED
+    assert all(t["status"] == STATUS_COMPLETED for t in report["tasks"].values())
+    assert report["tasks"]["report"]["output"] == "report done (3 inputs)"
+    # Three levels of 0.1 s, not five sequential tasks
+    assert report["wall_time_ms"] < 0.8 * report["task_time_ms"]
+    assert report["critical_path"] == ["docs", "it", "report"]
+
+
+async def test_failed_dependency_skips_dependents(make_orchestrator):
+    report = await make_orchestrator(runner=sleeping_runner(0.01, fail={"docs"})).run({"employee_id": "E1"})
+
+    tasks = report["tasks"]
+    assert report["status"] == STATUS_FAILED
+    assert tasks["docs"]["status"] == STATUS_FAILED
+    assert tasks["it"]["status"] == STATUS_SKIPPED
+    assert tasks["report"]["status"] == STATUS_SKIPPED
+    assert tasks["training"]["status"] == STATUS_COMPLETED
+
+
+async def test_task_exceeding_max_execution_time_times_out(make_orchestrator):
+    tasks = {"slow_task": {"id": "slow_task", "agent": "slow"}}
+    report = await make_orchestrator(tasks=tasks, runner=sleeping_runner(0.3)).run({})
+
+    assert report["tasks"]["slow_task"]["status"] == STATUS_TIMED_OUT
+
+
+async def test_tasks_run_in_background_lane(make_orchestrator):
+    lanes = []
+
+    def runner(task_config, agent_config, context):
+        lanes.append(current_lane())
+        return "ok"
+
+    await make_orchestrator(runner=runner).run({})
+    assert lanes == [LANE_BACKGROUND] * len(TASKS)
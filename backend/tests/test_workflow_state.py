@@ -0,0 +1,108 @@
+"""
+Tests for services/workflow_state.py: state machine and cache.
+"""
+
+import pytest
+
+from services.shared_state import SQLiteStore
+from services.workflow_state import (
+    STATE_COMPLETED,
+    STATE_FAILED,
+    STATE_IN_PROGRESS,
+    STATE_INITIATED,
+    InvalidTransitionError,
+    WorkflowNotFoundError,
+    WorkflowStateManager,
+    new_workflow_id,
+)
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'workflows.db'}"
+
+
+@pytest.fixture
+def manager(database_url):
+    return WorkflowStateManager(database_url=database_url, cache_size=16)
+
+
+def test_new_workflow_ids_are_unique():
+    assert new_workflow_id("E1") != new_workflow_id("E1")
+    assert new_workflow_id("E1").startswith("workflow-E1-")
+
+
+def test_create_and_get(manager):
+    created = manager.create("wf-1", "E1", {"role": "Engineer"})
+
+    assert created["state"] == STATE_INITIATED
+    assert manager.get("wf-1") == created
+    assert created["metadata"] == {"role": "Engineer"}
+    assert manager.get("missing") is None
+
+
+def test_happy_path_transitions_merge_metadata(manager):
+    manager.create("wf-1", "E1", {"role": "Engineer"})
+    manager.transition("wf-1", STATE_IN_PROGRESS, {"step": 1})
+    done = manager.transition("wf-1", STATE_COMPLETED, {"step": 2})
+
+    assert done["state"] == STATE_COMPLETED
+    assert done["metadata"] == {"role": "Engineer", "step": 2}
+    assert manager.get("wf-1")["state"] == STATE_COMPLETED
+
+
+@pytest.mark.parametrize("path, forbidden", [
+    ([], STATE_COMPLETED),
+    ([STATE_IN_PROGRESS, STATE_COMPLETED], STATE_IN_PROGRESS),
+    ([STATE_IN_PROGRESS, STATE_COMPLETED], STATE_FAILED),
+])
+def test_forbidden_transitions(manager, path, forbidden):
+    manager.create("wf-1", "E1")
+    for state in path:
+        manager.transition("wf-1", state)
+    with pytest.raises(InvalidTransitionError):
+        manager.transition("wf-1", forbidden)
+
+
+def test_failed_workflow_can_resume(manager):
+    manager.create("wf-1", "E1")
+    manager.transition("wf-1", STATE_FAILED)
+    assert manager.transition("wf-1", STATE_IN_PROGRESS)["state"] == STATE_IN_PROGRESS
+
+
+def test_unknown_state_and_workflow(manager):
+    manager.create("wf-1", "E1")
+    with pytest.raises(InvalidTransitionError):
+        manager.transition("wf-1", "paused")
+    with pytest.raises(WorkflowNotFoundError):
+        manager.transition("missing", STATE_IN_PROGRESS)
+
+
+def test_list_for_employee(manager):
+    manager.create_many([
+        {"workflow_id": "wf-1", "employee_id": "E1"},
+        {"workflow_id": "wf-2", "employee_id": "E1"},
+        {"workflow_id": "wf-3", "employee_id": "E2"},
+    ])
+    assert [w["workflow_id"] for w in manager.list_for_employee("E1")] == ["wf-1", "wf-2"]
+
+
+def test_reads_are_served_from_cache(manager):
+    manager.create("wf-1", "E1")
+    manager.get("wf-1")
+    manager.get("wf-1")
+    assert manager.stats()["cache"]["hits"] >= 2
+
+
+def test_writes_by_another_worker_invalidate_the_cache(database_url, tmp_path):
+    store = SQLiteStore(str(tmp_path / "shared.db"))
+    worker_a = WorkflowStateManager(database_url=database_url, shared=store)
+    worker_b = WorkflowStateManager(database_url=database_url, shared=store)
+    try:
+        worker_a.create("wf-1", "E1")
+        assert worker_b.get("wf-1")["state"] == STATE_INITIATED
+
+        worker_a.transition("wf-1", STATE_IN_PROGRESS)
+        assert worker_b.get("wf-1")["state"] == STATE_IN_PROGRESS
+    finally:
+        store.close()
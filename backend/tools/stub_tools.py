@@ -11,14 +11,52 @@ Reference:
 
 from crewai.tools import tool
 from typing import Dict, List, Any, Optional
+import functools
 import structlog
 
+from services.resilience import get_exception_handler
+from services.workflow_state import (
+    STATE_INITIATED,
+    InvalidTransitionError,
+    WorkflowNotFoundError,
+    get_workflow_state_manager,
+)
+from utils.tracing import traced
+
 logger = structlog.get_logger(__name__)
 
 
+def _traced_tool(fn):
+    """Record each call of a tool as a span under the running kickoff."""
+    return traced(f"tool.{fn.__name__}", **{"tool.name": fn.__name__})(fn)
+
+
+def _resilient_tool(fn):
+    """Retry transient failures of a read or idempotent tool; a tool that keeps failing trips its own circuit breaker."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return get_exception_handler().call(fn, f"tool.{fn.__name__}", *args, **kwargs)
+    return wrapper
+
+
+def _side_effect_tool(fn):
+    """
+    Call a tool with side effects (sends, creates, provisions) once, behind its circuit breaker.
+
+    A write that failed with a timeout may still have happened, so it is not
+    retried: the error goes back to the agent instead of a second email or ticket.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return get_exception_handler().call(fn, f"tool.{fn.__name__}", *args, idempotent=False, **kwargs)
+    return wrapper
+
+
 # Orchestrator Tools
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def workflow_state_manager(workflow_id: str, state: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
     """
     Manage workflow state for onboarding processes.
@@ -26,24 +64,30 @@ def workflow_state_manager(workflow_id: str, state: str, metadata: Optional[Dict
     Args:
         workflow_id: Unique identifier for the workflow
         state: New state to set (initiated, in_progress, completed, failed)
-        metadata: Optional metadata to store with state
+        metadata: Optional metadata to store with state (include employee_id
+            when initiating a new workflow)
         
     Returns:
         Dictionary with workflow state information
-        
-    Note: MVP stub - will be replaced with database-backed implementation
     """
     logger.info("Workflow state manager called", workflow_id=workflow_id, state=state)
-    return {
-        "workflow_id": workflow_id,
-        "state": state,
-        "metadata": metadata or {},
-        "status": "success",
-        "note": "MVP stub - database implementation pending"
-    }
+    manager = get_workflow_state_manager()
+    try:
+        if state == STATE_INITIATED and manager.get(workflow_id) is None:
+            employee_id = (metadata or {}).get("employee_id", "unknown")
+            workflow = manager.create(workflow_id, employee_id, metadata)
+        else:
+            workflow = manager.transition(workflow_id, state, metadata)
+    except WorkflowNotFoundError:
+        return {"workflow_id": workflow_id, "status": "error", "error": "Workflow not found"}
+    except InvalidTransitionError as e:
+        return {"workflow_id": workflow_id, "status": "error", "error": str(e)}
+    return {**workflow, "status": "success"}
 
 
 @tool
+@_resilient_tool
+@_traced_tool
 def task_scheduler(task_id: str, task_type: str, dependencies: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Schedule tasks for onboarding workflow.
@@ -69,6 +113,8 @@ def task_scheduler(task_id: str, task_type: str, dependencies: Optional[List[str
 
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def exception_handler(error_type: str, error_message: str, workflow_id: str) -> Dict[str, Any]:
     """
     Handle exceptions and escalate when necessary.
@@ -95,6 +141,8 @@ def exception_handler(error_type: str, error_message: str, workflow_id: str) ->
 
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def notification_system(recipient: str, message: str, notification_type: str = "info") -> Dict[str, Any]:
     """
     Send notifications to stakeholders.
@@ -122,6 +170,8 @@ def notification_system(recipient: str, message: str, notification_type: str = "
 # Document Verification Agent Tools
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def document_collector(employee_id: str, document_types: List[str]) -> Dict[str, Any]:
     """
     Collect required documents from employee.
@@ -145,6 +195,8 @@ def document_collector(employee_id: str, document_types: List[str]) -> Dict[str,
 
 
 @tool
+@_resilient_tool
+@_traced_tool
 def i9_verifier(document_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Verify I-9 form compliance.
@@ -167,6 +219,8 @@ def i9_verifier(document_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @tool
+@_resilient_tool
+@_traced_tool
 def compliance_checker(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Check compliance of all submitted documents.
@@ -191,6 +245,8 @@ def compliance_checker(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
 # IT Provisioning Agent Tools
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def it_ticket_system(employee_id: str, access_requirements: List[str]) -> Dict[str, Any]:
     """
     Create IT tickets for access provisioning.
@@ -216,6 +272,8 @@ def it_ticket_system(employee_id: str, access_requirements: List[str]) -> Dict[s
 
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def access_provisioning_api(employee_id: str, systems: List[str]) -> Dict[str, Any]:
     """
     Provision access to IT systems.
@@ -242,6 +300,8 @@ def access_provisioning_api(employee_id: str, systems: List[str]) -> Dict[str, A
 # Training Coordinator Agent Tools
 
 @tool
+@_resilient_tool
+@_traced_tool
 def lms_integration(employee_id: str, training_modules: List[str]) -> Dict[str, Any]:
     """
     Assign training modules via LMS integration.
@@ -265,6 +325,8 @@ def lms_integration(employee_id: str, training_modules: List[str]) -> Dict[str,
 
 
 @tool
+@_resilient_tool
+@_traced_tool
 def training_catalog(role: str, department: str) -> List[Dict[str, Any]]:
     """
     Get role-based training catalog.
@@ -298,6 +360,8 @@ def training_catalog(role: str, department: str) -> List[Dict[str, Any]]:
 # Stakeholder Coordinator Agent Tools
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def email_system(recipient: str, subject: str, body: str) -> Dict[str, Any]:
     """
     Send email notifications.
@@ -322,6 +386,8 @@ def email_system(recipient: str, subject: str, body: str) -> Dict[str, Any]:
 
 
 @tool
+@_side_effect_tool
+@_traced_tool
 def calendar_manager(employee_id: str, event_title: str, event_date: str) -> Dict[str, Any]:
     """
     Schedule calendar events.
@@ -11,13 +11,15 @@ Reference:
 
 import yaml
 import os
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any
 from pathlib import Path
-from crewai import Agent
-from langchain_core.language_models import BaseChatModel
-from langchain_openai import ChatOpenAI
 import structlog
 
+if TYPE_CHECKING:
+    # crewai and langchain are heavy; imported when an agent is built
+    from crewai import Agent
+    from langchain_core.language_models import BaseChatModel
+
 logger = structlog.get_logger(__name__)
 
 
@@ -57,9 +59,9 @@ def load_agents_from_yaml(config_path: str = None) -> Dict[str, Dict[str, Any]]:
 
 def create_agent_from_config(
     agent_config: Dict[str, Any],
-    llm: BaseChatModel = None,
+    llm: "BaseChatModel" = None,
     tools: List[Any] = None
-) -> Agent:
+) -> "Agent":
     """
     Create a CrewAI Agent from configuration dictionary.
     
@@ -83,17 +85,17 @@ def create_agent_from_config(
     max_execution_time = agent_config.get('max_execution_time', 300)
     memory = agent_config.get('memory', True)
     
-    # Create LLM if not provided (OpenRouter / OpenAI-compatible)
+    # Create LLM if not provided (OpenRouter / OpenAI-compatible), sharing
+    # the process-wide connection pool
+    from utils.llm_factory import create_chat_llm, use_shared_clients_for_litellm
     if llm is None:
-        from utils.config import get_settings
-        settings = get_settings()
-        base_url = settings.OPENAI_BASE_URL or settings.OPENAI_API_BASE or None
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
-            api_key=settings.OPENAI_API_KEY,
-            base_url=base_url,
-        )
+        llm = create_chat_llm()
+    
+    from crewai import Agent
+    
+    # Agents call the LLM through litellm; keep it on the shared
+    # (rate-limited) clients
+    use_shared_clients_for_litellm()
     
     # Create agent
     agent = Agent(
@@ -118,3 +120,35 @@ def create_agent_from_config(
     )
     
     return agent
+
+
+def load_tasks_from_yaml(config_path: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load task configurations from YAML file.
+    
+    Args:
+        config_path: Path to tasks.yaml file. Defaults to backend/config/tasks.yaml
+        
+    Returns:
+        Dictionary mapping task IDs to their configurations, in file order
+    """
+    if config_path is None:
+        backend_dir = Path(__file__).parent.parent
+        config_path = backend_dir / "config" / "tasks.yaml"
+    
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Task configuration file not found: {config_path}")
+    
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    tasks_config = config.get('tasks', [])
+    logger.info("Loaded task configurations", count=len(tasks_config), path=str(config_path))
+    
+    tasks_dict = {}
+    for task_config in tasks_config:
+        task_id = task_config.get('id')
+        if task_id:
+            tasks_dict[task_id] = task_config
+    
+    return tasks_dict
@@ -0,0 +1,238 @@
+"""
+LLM Client Factory
+
+Process-wide factory for ChatOpenAI instances (OpenRouter / OpenAI-compatible).
+
+Every ChatOpenAI built here shares one sync and one async httpx client, so
+all agents and requests reuse a single keep-alive connection pool (HTTP/2
+when the ``h2`` package is installed) instead of each instance opening its
+own pool and repeating TLS handshakes. CrewAI's litellm calls are pointed at
+the same clients, and their transports apply the global LLM rate limit
+(services/rate_limiter.py) and retries, circuit breaking and hedging
+(services/resilience.py).
+
+Reference:
+- SAD Section 3.3: CrewAI Framework Configuration
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+import structlog
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_openai import ChatOpenAI
+
+from utils.config import get_settings
+from utils.metrics import LLM_CALL_DURATION
+from utils.tracing import get_tracer
+
+logger = structlog.get_logger(__name__)
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _transport_options() -> dict:
+    settings = get_settings()
+    http2 = settings.LLM_HTTP2 and _http2_available()
+    if settings.LLM_HTTP2 and not http2:
+        logger.warning("LLM_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _timeout() -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT)
+
+
+def get_http_client() -> httpx.Client:
+    """Shared sync client used by ChatOpenAI.invoke / stream and CrewAI (kickoff threads)."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                from services.rate_limiter import RateLimitedTransport, get_rate_limiter
+                from services.resilience import ResilientTransport, get_exception_handler
+
+                options = _transport_options()
+                transport: httpx.BaseTransport = httpx.HTTPTransport(**options)
+                limiter = get_rate_limiter()
+                if limiter is not None:
+                    transport = RateLimitedTransport(transport, limiter)
+                # Outermost, so each retry takes rate budget again
+                transport = ResilientTransport(transport, get_exception_handler())
+                _http_client = httpx.Client(transport=transport, timeout=_timeout())
+                logger.info(
+                    "Created shared LLM HTTP client", http2=options["http2"], rate_limited=limiter is not None
+                )
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async client used by ChatOpenAI.ainvoke / astream (event loop)."""
+    global _http_async_client
+    if _http_async_client is None:
+        with _lock:
+            if _http_async_client is None:
+                from services.rate_limiter import AsyncRateLimitedTransport, get_rate_limiter
+                from services.resilience import AsyncResilientTransport, get_exception_handler
+
+                options = _transport_options()
+                transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(**options)
+                limiter = get_rate_limiter()
+                if limiter is not None:
+                    transport = AsyncRateLimitedTransport(transport, limiter)
+                transport = AsyncResilientTransport(
+                    transport,
+                    get_exception_handler(),
+                    headroom=limiter.headroom if limiter is not None else None,
+                )
+                _http_async_client = httpx.AsyncClient(transport=transport, timeout=_timeout())
+                logger.info(
+                    "Created shared async LLM HTTP client",
+                    http2=options["http2"],
+                    rate_limited=limiter is not None,
+                )
+    return _http_async_client
+
+
+def use_shared_clients_for_litellm() -> None:
+    """
+    Send CrewAI's LLM calls through the shared clients.
+
+    CrewAI agents run on litellm, which would otherwise open its own
+    connections and bypass the rate limiter. Call after crewai is imported
+    (it imports litellm).
+    """
+    import litellm
+
+    litellm.client_session = get_http_client()
+    litellm.aclient_session = get_async_http_client()
+
+
+class _LLMCallTimer(BaseCallbackHandler):
+    """Time every LLM call (sync, async and streamed alike) for metrics and tracing."""
+
+    # Called in the caller's context, so the span nests under the active one
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, Tuple[float, Any]] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, serialized)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe(run_id, "ok")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe(run_id, "error", error)
+
+    def _start(self, run_id: UUID, serialized: Any) -> None:
+        model = ((serialized or {}).get("kwargs") or {}).get("model_name")
+        span = get_tracer().start_span("llm.call", attributes={"llm.model": model} if model else None)
+        self._started[run_id] = (time.perf_counter(), span)
+
+    def _observe(self, run_id: UUID, outcome: str, error: Optional[BaseException] = None) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        LLM_CALL_DURATION.observe(time.perf_counter() - started[0], outcome)
+        span = started[1]
+        if error is not None:
+            span.record_exception(error)
+        span.end()
+
+
+_llm_call_timer = _LLMCallTimer()
+
+
+@contextmanager
+def timed_llm_call(model: Optional[str] = None) -> Iterator[Any]:
+    """
+    Time one LLM call made outside LangChain, like the timer above does.
+
+    CrewAI agents call litellm directly, so their calls never reach that
+    timer; the ``llm.call`` span nests under the active one (``crew.kickoff``).
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with get_tracer().span("llm.call", **({"llm.model": model} if model else {})) as span:
+            yield span
+        outcome = "ok"
+    finally:
+        LLM_CALL_DURATION.observe(time.perf_counter() - started, outcome)
+
+
+def create_chat_llm(
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    streaming: bool = False,
+    callbacks: Optional[List[Any]] = None,
+    max_tokens: Optional[int] = None,
+) -> ChatOpenAI:
+    """
+    Create a ChatOpenAI bound to the shared connection pools.
+
+    Args:
+        model: Model name; defaults to OPENAI_MODEL
+        temperature: Sampling temperature; defaults to OPENAI_TEMPERATURE
+        streaming: Stream tokens by default (astream streams either way)
+        callbacks: LangChain callback handlers for this instance (an LLM
+            call timer for metrics and tracing is always added)
+        max_tokens: Completion token cap; unset leaves it to the provider
+
+    Returns:
+        Configured ChatOpenAI instance
+    """
+    settings = get_settings()
+    base_url = settings.OPENAI_BASE_URL or settings.OPENAI_API_BASE or None
+    return ChatOpenAI(
+        model=model or settings.OPENAI_MODEL,
+        temperature=settings.OPENAI_TEMPERATURE if temperature is None else temperature,
+        api_key=settings.OPENAI_API_KEY,
+        base_url=base_url,
+        streaming=streaming,
+        max_tokens=max_tokens,
+        callbacks=[*(callbacks or []), _llm_call_timer],
+        # Retries happen in the shared transports (services/resilience.py)
+        max_retries=0,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+async def aclose_http_clients() -> None:
+    """Close the shared pools on application shutdown."""
+    global _http_client, _http_async_client
+    with _lock:
+        client, async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
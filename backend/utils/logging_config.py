@@ -0,0 +1,340 @@
+"""
+Logging Configuration
+
+Structured JSON logging that stays off the request path.
+
+A log call on the event loop or a kickoff thread is filtered by level in
+the bound logger itself, runs a few cheap processors (level, logger name,
+creation time, debug sampling) and hands the event dict to a queue. A
+background writer thread renders queued events to JSON (orjson when
+installed) and writes them in batches, one write and flush per batch. When
+the queue is full, events are dropped and counted rather than blocking the
+caller. Records from libraries using stdlib logging go through the same
+queue and JSON layout.
+
+Debug events can be sampled with LOG_DEBUG_SAMPLE_RATE, so verbose debug
+logging can stay on under load.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+import structlog
+
+from utils.metrics import LOG_QUEUE_DEPTH, LOG_RECORDS_DROPPED
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Events rendered and written per batch by the writer thread
+_BATCH_SIZE = 512
+
+_STOP = object()
+
+
+def _orjson_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> str:
+    return orjson.dumps(obj, default=default or str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def _json_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> str:
+    return json.dumps(obj, default=default or str)
+
+
+def json_serializer() -> Callable[..., str]:
+    """orjson-backed serializer, or the stdlib one without orjson."""
+    return _orjson_dumps if orjson is not None else _json_dumps
+
+
+def _iso_timestamp(created: float) -> str:
+    return datetime.fromtimestamp(created, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+# Caller side
+
+class _DebugSampler:
+    """Processor keeping roughly ``rate`` of debug events; other levels always pass."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if method_name == "debug" and random.random() >= self.rate:
+            raise structlog.DropEvent
+        return event_dict
+
+
+def _capture(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Record the creation time and resolve ``exc_info=True`` while on the caller's thread."""
+    event_dict["_created"] = time.time()
+    if event_dict.get("exc_info") is True:
+        exc_info = sys.exc_info()
+        if exc_info[0] is None:
+            del event_dict["exc_info"]
+        else:
+            event_dict["exc_info"] = exc_info
+    return event_dict
+
+
+def _to_sink(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Tuple[tuple, dict]:
+    """Last processor: pass the event dict itself on instead of a rendered string."""
+    return (event_dict,), {}
+
+
+class _SinkLogger:
+    """structlog logger that hands event dicts to the writer."""
+
+    def __init__(self, name: str, sink: Callable[[Any], None]):
+        self.name = name
+        self._sink = sink
+
+    def msg(self, event_dict: Dict[str, Any]) -> None:
+        self._sink(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class _SinkLoggerFactory:
+    def __init__(self, sink: Callable[[Any], None]):
+        self._sink = sink
+
+    def __call__(self, *args: Any) -> _SinkLogger:
+        name = args[0] if args and isinstance(args[0], str) else "root"
+        return _SinkLogger(name, self._sink)
+
+
+class _StdlibHandler(logging.Handler):
+    """Routes records from stdlib loggers (libraries) to the writer."""
+
+    def __init__(self, sink: Callable[[Any], None]):
+        super().__init__()
+        self._sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._sink(record)
+
+
+# Writer side
+
+class _Renderer:
+    """Turns event dicts and stdlib records into JSON lines."""
+
+    def __init__(self, serializer: Callable[..., str]):
+        self._serializer = serializer
+        self._processors = [
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+        ]
+        self._exc_formatter = logging.Formatter()
+
+    def render(self, item: Any) -> str:
+        if isinstance(item, logging.LogRecord):
+            event_dict: Dict[str, Any] = {
+                "event": item.getMessage(),
+                "logger": item.name,
+                "level": item.levelname.lower(),
+                "timestamp": _iso_timestamp(item.created),
+            }
+            if item.exc_info:
+                event_dict["exception"] = self._exc_formatter.formatException(item.exc_info)
+            return self._serializer(event_dict)
+        event_dict = item
+        event_dict["timestamp"] = _iso_timestamp(event_dict.pop("_created", time.time()))
+        for processor in self._processors:
+            event_dict = processor(None, "", event_dict)
+        return self._serializer(event_dict)
+
+    def render_safe(self, item: Any) -> str:
+        try:
+            return self.render(item)
+        except Exception as e:
+            return self._serializer({"event": "Log rendering failed", "level": "error", "error": str(e)})
+
+
+class QueueWriter:
+    """
+    Background thread draining the queue in batches.
+
+    ``renderer.render_safe(item)`` turns each queued item into one line; the
+    span file exporter in utils/tracing.py uses the same writer.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        renderer: Any,
+        queue_size: int,
+        dropped: Any = LOG_RECORDS_DROPPED,
+        name: str = "log-writer",
+    ):
+        self.stream = stream
+        self.renderer = renderer
+        self.queue_size = queue_size
+        self._dropped = dropped
+        self.queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any) -> None:
+        # SimpleQueue.put never blocks; the size check is approximate, which
+        # is enough to shed load when the writer falls behind
+        if self.queue_size and self.queue.qsize() >= self.queue_size:
+            self._dropped.inc()
+            return
+        self.queue.put(item)
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Any] = [self.queue.get()]
+            try:
+                while len(batch) < _BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = False
+            lines = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                else:
+                    lines.append(self.renderer.render_safe(item))
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+            if stop:
+                return
+
+    def stop(self) -> None:
+        """Write everything queued so far, then end the thread."""
+        self.queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+
+class _SyncWriter:
+    """LOG_ASYNC=false: render and write on the caller's thread."""
+
+    def __init__(self, stream: TextIO, renderer: _Renderer):
+        self.stream = stream
+        self.renderer = renderer
+        self._lock = threading.Lock()
+
+    def put(self, item: Any) -> None:
+        line = self.renderer.render_safe(item)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def stop(self) -> None:
+        pass
+
+
+_writer: Optional[Any] = None
+_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+def _emit(item: Any) -> None:
+    """Sink for loggers and the stdlib handler; follows _writer across reconfiguration."""
+    writer = _writer
+    if writer is not None:
+        writer.put(item)
+
+
+def configure_logging(
+    level: str = "INFO",
+    async_logging: bool = True,
+    queue_size: int = 10000,
+    debug_sample_rate: float = 1.0,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """
+    Configure structlog and route stdlib logging to the same writer.
+
+    Args:
+        level: Level for application loggers (LOG_LEVEL); library loggers
+            stay at WARNING unless this is stricter
+        async_logging: Render and write on a background thread (LOG_ASYNC)
+        queue_size: Events buffered for the writer thread; beyond that new
+            events are dropped and counted (LOG_QUEUE_SIZE, 0 = unbounded)
+        debug_sample_rate: Fraction of debug events kept (LOG_DEBUG_SAMPLE_RATE)
+        stream: Output stream; defaults to stdout
+    """
+    global _writer, _handler
+    with _lock:
+        _stop_locked()
+
+        output = stream or sys.stdout
+        renderer = _Renderer(json_serializer())
+        if async_logging:
+            _writer = QueueWriter(output, renderer, max(0, queue_size))
+            LOG_QUEUE_DEPTH.set_function(_writer.queue.qsize)
+        else:
+            _writer = _SyncWriter(output, renderer)
+
+        numeric_level = logging.getLevelName(level.upper())
+        if not isinstance(numeric_level, int):
+            numeric_level = logging.INFO
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        _handler = _StdlibHandler(_emit)
+        root.addHandler(_handler)
+        root.setLevel(max(numeric_level, logging.WARNING))
+
+        processors: List[Any] = [
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            _capture,
+            _to_sink,
+        ]
+        if debug_sample_rate < 1.0:
+            processors.insert(0, _DebugSampler(debug_sample_rate))
+        structlog.configure(
+            processors=processors,
+            context_class=dict,
+            logger_factory=_SinkLoggerFactory(_emit),
+            # Calls below the level return before any processor runs
+            wrapper_class=structlog.make_filtering_bound_logger(numeric_level),
+            cache_logger_on_first_use=True,
+        )
+
+
+def _stop_locked() -> None:
+    global _writer, _handler
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+def shutdown_logging() -> None:
+    """Write out queued events and stop the writer thread; later events are written directly."""
+    global _writer
+    with _lock:
+        if not isinstance(_writer, QueueWriter):
+            return
+        writer = _writer
+        writer.stop()
+        _writer = _SyncWriter(writer.stream, writer.renderer)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,121 @@
+"""
+Bounded LRU Cache with TTL
+
+Thread-safe least-recently-used cache with optional per-entry expiry and
+hit/miss/eviction counters. Shared by the in-process caches in services/.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class TTLLRUCache:
+    """
+    LRU cache bounded by entry count, with an optional time-to-live.
+
+    Expired entries are dropped lazily when they are read or when they reach
+    the LRU end. ``ttl_seconds <= 0`` disables expiry. ``on_evict(key, value)``
+    is called (outside the lock) for live entries pushed out by capacity.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float = 0,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it recently used, or ``default``."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            stored_at, value = item
+            if self._expired(stored_at, now):
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value without touching LRU order or counters."""
+        with self._lock:
+            item = self._data.get(key)
+        if item is None or self._expired(item[0], time.monotonic()):
+            return default
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting the least recently used entries."""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                old_key, (stored_at, old_value) = self._data.popitem(last=False)
+                if self._expired(stored_at, now):
+                    self.expirations += 1
+                else:
+                    self.evictions += 1
+                    evicted.append((old_key, old_value))
+        if self.on_evict is not None:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live (unexpired) entries, most recently used last."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = list(self._data.items())
+        for key, (stored_at, value) in snapshot:
+            if not self._expired(stored_at, now):
+                yield key, value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,315 @@
+"""
+In-Process Metrics
+
+Counters, gauges and histograms kept in process memory and rendered in the
+Prometheus text exposition format by GET /metrics (see api/metrics.py).
+
+Recording is a lock-protected integer/float update and, for histograms, a
+bisect over a fixed bucket list, so instrumenting hot paths (per request,
+per LLM call, per extraction) costs well under a microsecond. Nothing is
+exported until a scrape renders the registry. The prometheus_client package
+is not required.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; spans sub-second LLM first tokens up to multi-minute crew kickoffs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Seconds; response extraction is CPU-only and normally well under a millisecond
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(v) for v in labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` on every scrape instead."""
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return math.nan
+        with self._lock:
+            return self._value
+
+    def _samples(self) -> List[str]:
+        value = self.value()
+        return [f"{self.name} {'NaN' if math.isnan(value) else _format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with a running sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((k, list(counts), total[0]) for k, (counts, total) in self._series.items())
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _label_text(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "aamad_http_request_duration_seconds",
+    "HTTP request latency until the response body is complete (whole stream for SSE).",
+    ("method", "route", "status"),
+))
+CHAT_TIME_TO_FIRST_CHUNK = REGISTRY.register(Histogram(
+    "aamad_chat_time_to_first_chunk_seconds",
+    "Time from the start of a chat stream to its first response text frame.",
+))
+KICKOFF_DURATION = REGISTRY.register(Histogram(
+    "aamad_kickoff_duration_seconds",
+    "Duration of crew.kickoff on a kickoff worker.",
+    ("outcome",),
+))
+LLM_CALL_DURATION = REGISTRY.register(Histogram(
+    "aamad_llm_call_duration_seconds",
+    "Duration of one LLM call, start to last token.",
+    ("outcome",),
+))
+RESPONSE_EXTRACTION_DURATION = REGISTRY.register(Histogram(
+    "aamad_response_extraction_seconds",
+    "CPU time spent extracting the reply text from an LLM response.",
+    ("mode",),
+    buckets=FAST_BUCKETS,
+))
+SSE_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "aamad_sse_response_bytes",
+    "Bytes sent per chat SSE response.",
+    buckets=BYTES_BUCKETS,
+))
+SSE_RESPONSE_FRAMES = REGISTRY.register(Histogram(
+    "aamad_sse_response_frames",
+    "SSE frames sent per chat SSE response.",
+    buckets=COUNT_BUCKETS,
+))
+CHAT_IN_FLIGHT = REGISTRY.register(Gauge(
+    "aamad_chat_in_flight",
+    "Chat responses currently streaming.",
+))
+KICKOFF_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "aamad_kickoff_queue_depth",
+    "Admitted chat requests waiting for a kickoff worker.",
+))
+KICKOFF_ACTIVE_WORKERS = REGISTRY.register(Gauge(
+    "aamad_kickoff_active_workers",
+    "Kickoff workers currently running a crew.",
+))
+CHAT_SINGLE_FLIGHT = REGISTRY.register(Counter(
+    "aamad_chat_single_flight_total",
+    "Uncached chat requests by single-flight role (leader starts the LLM call, follower joins it).",
+    ("role",),
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "aamad_log_records_dropped_total",
+    "Log records dropped because the async logging queue was full.",
+))
+LOG_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "aamad_log_queue_depth",
+    "Log records waiting for the async logging writer thread.",
+))
+TRACE_SPANS_DROPPED = REGISTRY.register(Counter(
+    "aamad_trace_spans_dropped_total",
+    "Finished spans dropped because the trace file writer queue was full.",
+))
+LLM_RATE_LIMIT_WAIT = REGISTRY.register(Histogram(
+    "aamad_llm_rate_limit_wait_seconds",
+    "Time an LLM call waited for the global rate limit budget.",
+    ("lane",),
+))
+LLM_RATE_LIMIT_TIMEOUTS = REGISTRY.register(Counter(
+    "aamad_llm_rate_limit_timeouts_total",
+    "LLM calls rejected locally after waiting LLM_RATE_LIMIT_MAX_WAIT_SECONDS for budget.",
+    ("lane",),
+))
+LLM_RATE_LIMIT_UTILIZATION = REGISTRY.register(Gauge(
+    "aamad_llm_rate_limit_utilization",
+    "Fraction of the LLM request budget bucket currently used (1 = empty bucket).",
+))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "aamad_upstream_retries_total",
+    "LLM and tool call attempts retried after a failure, by failure class.",
+    ("kind",),
+))
+LLM_HEDGED_REQUESTS = REGISTRY.register(Counter(
+    "aamad_llm_hedged_requests_total",
+    "Hedged LLM requests sent, by which attempt answered first.",
+    ("winner",),
+))
+CIRCUIT_BREAKER_TRANSITIONS = REGISTRY.register(Counter(
+    "aamad_circuit_breaker_transitions_total",
+    "Circuit breaker state changes per upstream.",
+    ("upstream", "state"),
+))
+CHAT_MODEL_LATENCY = REGISTRY.register(Histogram(
+    "aamad_chat_model_latency_seconds",
+    "Chat answer generation time by model tier and path (direct or crew).",
+    ("tier", "route"),
+))
+CHAT_MODEL_TOKENS = REGISTRY.register(Counter(
+    "aamad_chat_model_tokens_total",
+    "Chat answer tokens by model tier and kind (prompt or completion).",
+    ("tier", "kind"),
+))
+CHAT_MODEL_COST = REGISTRY.register(Counter(
+    "aamad_chat_model_cost_usd_total",
+    "Estimated chat answer cost in USD from the config/models.yaml prices, by model tier.",
+    ("tier",),
+))
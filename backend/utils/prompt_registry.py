@@ -0,0 +1,158 @@
+"""
+Prompt Template Registry
+
+Loads prompt templates from config/prompts.yaml (next to agents.yaml and
+tasks.yaml) and compiles each one once at startup: the template is split
+into its static text segments and placeholder slots, so rendering a request
+only splices the per-request values between precomputed strings instead of
+re-parsing a format string.
+
+Every template carries a version hash of its text and expected output. The
+response cache keys on it, and it identifies which variant produced an
+answer when two templates are compared.
+
+Reference:
+- SAD Section 3.3: CrewAI Framework Configuration
+- adapter-crewai.mdc: Configuration Patterns
+"""
+
+import hashlib
+import os
+import string
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+import yaml
+
+logger = structlog.get_logger(__name__)
+
+
+class PromptTemplateError(ValueError):
+    """Raised when a prompt template is malformed or missing."""
+
+
+class PromptTemplate:
+    """A compiled prompt template."""
+
+    def __init__(
+        self,
+        prompt_id: str,
+        template: str,
+        expected_output: str = "",
+        placeholders: Optional[List[str]] = None,
+    ):
+        self.id = prompt_id
+        self.template = template
+        self.expected_output = expected_output
+        self.version = hashlib.sha256(
+            (template + expected_output).encode("utf-8")
+        ).hexdigest()[:12]
+        self._segments, self._slots = self._compile(prompt_id, template)
+        if placeholders is not None and set(placeholders) != set(self._slots):
+            raise PromptTemplateError(
+                f"Prompt '{prompt_id}' declares placeholders {sorted(placeholders)} "
+                f"but uses {sorted(set(self._slots))}"
+            )
+        self.placeholders = tuple(dict.fromkeys(self._slots))
+
+    @staticmethod
+    def _compile(prompt_id: str, template: str) -> Tuple[List[str], List[str]]:
+        """Split into static segments and slot names: seg0 slot0 seg1 slot1 ... segN."""
+        segments: List[str] = []
+        slots: List[str] = []
+        pending = ""
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError as e:
+            raise PromptTemplateError(f"Prompt '{prompt_id}' is not a valid template: {e}") from e
+        for literal, field, spec, conversion in parsed:
+            pending += literal
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conversion:
+                raise PromptTemplateError(
+                    f"Prompt '{prompt_id}' placeholder '{{{field}}}' must be a plain name"
+                )
+            segments.append(pending)
+            slots.append(field)
+            pending = ""
+        segments.append(pending)
+        return segments, slots
+
+    def render(self, **values: str) -> str:
+        """Fill the placeholders; raises KeyError for a missing value."""
+        parts = [self._segments[0]]
+        for slot, segment in zip(self._slots, self._segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return "".join(parts)
+
+
+class PromptRegistry:
+    """Compiled prompt templates by ID."""
+
+    def __init__(self, templates: Dict[str, PromptTemplate]):
+        self._templates = templates
+
+    def get(self, prompt_id: str) -> PromptTemplate:
+        template = self._templates.get(prompt_id)
+        if template is None:
+            raise PromptTemplateError(
+                f"Prompt template '{prompt_id}' not found; available: {sorted(self._templates)}"
+            )
+        return template
+
+    def versions(self) -> Dict[str, str]:
+        return {prompt_id: t.version for prompt_id, t in self._templates.items()}
+
+
+def load_prompts_from_yaml(config_path: str = None) -> PromptRegistry:
+    """
+    Load and compile prompt templates from YAML file.
+
+    Args:
+        config_path: Path to prompts.yaml file. Defaults to backend/config/prompts.yaml
+
+    Returns:
+        PromptRegistry with every template compiled
+    """
+    if config_path is None:
+        backend_dir = Path(__file__).parent.parent
+        config_path = backend_dir / "config" / "prompts.yaml"
+
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Prompt configuration file not found: {config_path}")
+
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    templates = {}
+    for prompt_config in config.get('prompts', []):
+        prompt_id = prompt_config.get('id')
+        if not prompt_id:
+            continue
+        templates[prompt_id] = PromptTemplate(
+            prompt_id,
+            prompt_config.get('template', ''),
+            expected_output=prompt_config.get('expected_output', ''),
+            placeholders=prompt_config.get('placeholders'),
+        )
+    registry = PromptRegistry(templates)
+    logger.info("Loaded prompt templates", versions=registry.versions(), path=str(config_path))
+    return registry
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry (loaded on first use)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = load_prompts_from_yaml()
+    return _registry
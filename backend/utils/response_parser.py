@@ -0,0 +1,240 @@
+"""
+LLM Response Parser
+
+Pulls the plain-text reply out of LLM output that may be wrapped in JSON
+and/or markdown code fences, e.g. ``{"message": "..."}`` or
+```` ```json {"message": "..."} ``` ````.
+
+``extract_plain_message`` works on a complete response in one pass: it jumps
+between ``{`` candidates with a regex search and lets ``json.JSONDecoder.raw_decode``
+parse each candidate in C, so braces inside JSON strings are handled and no
+intermediate copies of the response are made. ``JSONMessageStream`` does the
+same over a token stream, releasing the reply text while it is generated.
+
+Reference:
+- SAD Section 4.3: Chat Interface Specifications
+"""
+
+import json
+import re
+import time
+from typing import Optional
+
+from utils.metrics import RESPONSE_EXTRACTION_DURATION
+
+# Keys that may hold the reply, in order of preference
+MESSAGE_KEYS = ("message", "content", "text", "response", "output")
+
+# Only a brace followed by a key or "}" can open an object; anything else,
+# such as prose "{x}" or "{{{{...", is skipped without a decode attempt.
+_CANDIDATE = re.compile(r'\{\s*["}]')
+# A failed decode costs about as much as the text up to where it failed:
+# the decoder scans from the candidate, and the error counts lines from the
+# start. The total is capped at this many times the response length, which
+# keeps the extractor linear on pathological input.
+_FAILED_SCAN_FACTOR = 16
+
+_decoder = json.JSONDecoder()
+
+
+def _message_from(data) -> Optional[str]:
+    if isinstance(data, dict):
+        for key in MESSAGE_KEYS:
+            value = data.get(key)
+            if isinstance(value, str):
+                return value
+    return None
+
+
+def extract_plain_message(raw: str) -> str:
+    """
+    Extract the plain-text message from a complete response.
+
+    Returns the preferred message field of the first top-level JSON object
+    that has one, or ``raw`` unchanged when there is none.
+    """
+    started = time.perf_counter()
+    try:
+        return _extract(raw)
+    finally:
+        RESPONSE_EXTRACTION_DURATION.observe(time.perf_counter() - started, "complete")
+
+
+def _extract(raw: str) -> str:
+    budget = _FAILED_SCAN_FACTOR * len(raw)
+    match = _CANDIDATE.search(raw)
+    while match is not None:
+        i = match.start()
+        try:
+            data, end = _decoder.raw_decode(raw, i)
+        except json.JSONDecodeError as e:
+            # An unterminated string is reported where it starts, but was
+            # scanned to the end of the response
+            budget -= len(raw) if e.msg.startswith("Unterminated string") else e.pos
+            if budget < 0:
+                break
+            match = _CANDIDATE.search(raw, i + 1)
+            continue
+        message = _message_from(data)
+        if message is not None:
+            return message
+        # Nested objects of a decoded value are never top-level candidates
+        match = _CANDIDATE.search(raw, end)
+    return raw
+
+
+# Next character that matters inside / outside a JSON string
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURE_SPECIAL = re.compile(r'[{}\[\]":,]')
+# A \uXXXX escape for a high surrogate must be decoded together with its pair
+_HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}")
+_MESSAGE_KEY_SET = frozenset(MESSAGE_KEYS)
+
+
+class JSONMessageStream:
+    """
+    Incremental message extraction over a token stream.
+
+    Tracks JSON structure (string-aware, escapes included) as chunks arrive
+    and streams the value of the first message field (see ``MESSAGE_KEYS``)
+    of a top-level object as soon as its characters are available. Every
+    character is examined once, so the total cost is linear in the stream
+    length. Unlike ``extract_plain_message`` the first message field in
+    document order wins.
+    """
+
+    def __init__(self):
+        self.found = False
+        self.complete = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        # Only meaningful at depth 1: "key" | "colon" | "value" | "comma"
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk; return newly available message text."""
+        if self.complete:
+            return ""
+        self._buf += chunk
+        if self._value_start is not None:
+            return self._scan_value()
+        out = self._scan_structure()
+        if self._value_start is None:
+            # Drop text that can no longer matter; a key being read is kept
+            keep = self._pos
+            if self._in_string and self._depth == 1 and self._expect == "key":
+                keep = self._string_start
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            self._string_start -= keep
+        return out
+
+    def _scan_structure(self) -> str:
+        buf = self._buf
+        while True:
+            if self._in_string:
+                m = _STRING_SPECIAL.search(buf, self._pos)
+                if m is None:
+                    self._pos = len(buf)
+                    return ""
+                if m.group() == "\\":
+                    if m.end() >= len(buf):
+                        self._pos = m.start()
+                        return ""
+                    self._pos = m.end() + 1
+                    continue
+                self._in_string = False
+                self._pos = m.end()
+                if self._depth == 1 and self._expect == "key":
+                    try:
+                        self._key = json.loads(buf[self._string_start:self._pos])
+                    except ValueError:
+                        self._key = None
+                    self._expect = "colon"
+                elif self._depth == 1 and self._expect == "value":
+                    self._expect = "comma"
+                continue
+
+            if self._depth == 0:
+                start = buf.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(buf)
+                    return ""
+                self._pos = start + 1
+                self._depth = 1
+                self._expect = "key"
+                continue
+
+            m = _STRUCTURE_SPECIAL.search(buf, self._pos)
+            if m is None:
+                self._pos = len(buf)
+                return ""
+            ch = m.group()
+            self._pos = m.end()
+            if ch == '"':
+                if self._depth == 1 and self._expect == "value" and self._key in _MESSAGE_KEY_SET:
+                    self.found = True
+                    self._value_start = self._pos
+                    return self._scan_value()
+                self._in_string = True
+                self._string_start = m.start()
+            elif ch in "{[":
+                if self._depth == 1:
+                    self._expect = "comma"
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    # Object without a message field; look for the next one
+                    self._key = None
+            elif self._depth == 1:
+                if ch == ":":
+                    self._expect = "value"
+                elif ch == ",":
+                    self._expect = "key"
+                    self._key = None
+
+    def _scan_value(self) -> str:
+        """Emit the decodable prefix of the message string seen so far."""
+        buf = self._buf
+        pos = self._pos
+        last_escape = None
+        while True:
+            m = _STRING_SPECIAL.search(buf, pos)
+            if m is None:
+                safe = len(buf)
+                break
+            if m.group() == '"':
+                self.complete = True
+                safe = m.start()
+                break
+            # Escape: \uXXXX needs 6 characters, the rest 2
+            width = 6 if buf[m.end():m.end() + 1] == "u" else 2
+            if m.start() + width > len(buf):
+                safe = m.start()
+                break
+            last_escape = m.start()
+            pos = m.start() + width
+        # A high surrogate must wait for its pair
+        if (
+            not self.complete
+            and last_escape == safe - 6
+            and _HIGH_SURROGATE.match(buf, last_escape)
+        ):
+            safe = last_escape
+        raw = buf[self._value_start:safe]
+        self._buf = buf[safe:]
+        self._pos = 0
+        self._value_start = 0
+        if self.complete:
+            self._buf = ""
+        try:
+            return json.loads('"' + raw + '"')
+        except ValueError:
+            # Invalid escape from the model; keep the text as written
+            return raw
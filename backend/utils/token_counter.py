@@ -0,0 +1,61 @@
+"""
+Token Counter
+
+Counts prompt tokens locally. Uses tiktoken when it is installed and its
+encoding files are available (cached or downloadable); otherwise falls back
+to a character-based estimate that slightly over-counts English text, so
+budgets stay on the safe side.
+
+Reference:
+- SAD Section 3.3: CrewAI Framework Configuration
+"""
+
+import threading
+from typing import Callable, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Roughly 4 characters per token for English with cl100k-style encodings;
+# 3.5 errs towards over-counting
+_CHARS_PER_TOKEN = 3.5
+
+_lock = threading.Lock()
+_encoders: dict = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Character-based token estimate (no tokenizer needed)."""
+    return int(len(text) / _CHARS_PER_TOKEN) + 1 if text else 0
+
+
+def _load_encoder(model: str) -> Optional[Callable[[str], list]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # OpenRouter ids like "openai/gpt-4o-mini" or non-OpenAI models
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encoding files are fetched on first use and may be unreachable
+        logger.warning("tiktoken encoding unavailable; estimating tokens", model=model, error=str(e))
+        return None
+    return encoding.encode_ordinary
+
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Return a ``text -> token count`` function for ``model`` (loaded once per model)."""
+    if model not in _encoders:
+        with _lock:
+            if model not in _encoders:
+                name = model.rsplit("/", 1)[-1]
+                _encoders[model] = _load_encoder(name)
+    encode = _encoders[model]
+    if encode is None:
+        return estimate_tokens
+    return lambda text: len(encode(text)) if text else 0
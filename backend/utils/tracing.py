@@ -0,0 +1,372 @@
+"""
+Request Tracing
+
+Lightweight spans for breaking a chat request into stages (validation,
+prompt build, executor wait, kickoff, LLM round trips, tool calls,
+extraction, streaming) without an external collector.
+
+Spans follow the OpenTelemetry data model: 128-bit trace ids, 64-bit span
+ids, parent links, attributes, status and exception events. Finished spans
+are exported in the JSON layout of OpenTelemetry's ConsoleSpanExporter,
+either to a JSON-lines file written by a background thread
+(TRACING_EXPORTER=file) or to an in-memory ring buffer served by GET
+/traces (TRACING_EXPORTER=memory). The active span is kept in a context
+variable, so it follows the request onto kickoff threads through the
+copied context. With TRACING_ENABLED off every call returns a
+shared no-op span.
+
+Reference:
+- SAD Section 5.1: API Architecture Requirements
+"""
+
+import contextvars
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import structlog
+
+from utils.config import get_settings
+from utils.logging_config import QueueWriter, json_serializer
+from utils.metrics import TRACE_SPANS_DROPPED
+
+logger = structlog.get_logger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+# Default for ``parent``: the span active in the calling context
+_CURRENT = object()
+
+
+def _iso(time_ns: int) -> str:
+    return datetime.fromtimestamp(time_ns / 1e9, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "_tracer", "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "events", "status", "description",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: int,
+        parent_id: Optional[int],
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = "UNSET"
+        self.description: Optional[str] = None
+
+    @property
+    def recording(self) -> bool:
+        return self.end_ns is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.description = f"{type(exc).__name__}: {exc}"
+        self.events.append({
+            "name": "exception",
+            "timestamp": _iso(time.time_ns()),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        """Finish and export the span; later calls are ignored."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        self._tracer._export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {"status_code": self.status}
+        if self.description:
+            status["description"] = self.description
+        return {
+            "name": self.name,
+            "context": {
+                "trace_id": f"0x{self.trace_id:032x}",
+                "span_id": f"0x{self.span_id:016x}",
+            },
+            "kind": "SpanKind.INTERNAL",
+            "parent_id": f"0x{self.parent_id:016x}" if self.parent_id is not None else None,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns) if self.end_ns is not None else None,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": status,
+            "attributes": self.attributes,
+            "events": self.events,
+            "resource": {"attributes": {"service.name": self._tracer.service_name}},
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    recording = False
+    name = ""
+    start_ns = None
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans in a ring buffer."""
+
+    def __init__(self, max_spans: int):
+        self._spans: deque = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def traces(self, limit: int = 50, min_ms: float = 0.0) -> List[Dict[str, Any]]:
+        """Most recent traces first (root at least ``min_ms`` long), spans in start order."""
+        by_trace: Dict[int, List[Span]] = {}
+        for span in list(self._spans):
+            by_trace.setdefault(span.trace_id, []).append(span)
+        traces = []
+        for trace_id, spans in reversed(list(by_trace.items())):
+            root = next((s for s in spans if s.parent_id is None), None)
+            duration_ms = root.duration_ms if root is not None else 0.0
+            if duration_ms < min_ms:
+                continue
+            spans.sort(key=lambda s: s.start_ns)
+            traces.append({
+                "trace_id": f"0x{trace_id:032x}",
+                "root": root.name if root is not None else None,
+                "duration_ms": round(duration_ms, 3),
+                "spans": [s.to_dict() for s in spans],
+            })
+            if len(traces) >= limit:
+                break
+        return traces
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _SpanRenderer:
+    def __init__(self) -> None:
+        self._serializer = json_serializer()
+
+    def render_safe(self, record: Dict[str, Any]) -> str:
+        try:
+            return self._serializer(record, default=str)
+        except Exception as e:
+            return self._serializer({"name": record.get("name"), "error": f"Span rendering failed: {e}"})
+
+
+class JSONLinesSpanExporter:
+    """
+    Appends one JSON object per finished span to a local file.
+
+    Spans are serialized and written by a background writer thread (the
+    async logging writer); when ``queue_size`` spans are waiting, new ones
+    are dropped and counted.
+    """
+
+    def __init__(self, path: str, queue_size: int = 10000):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writer: Optional[QueueWriter] = QueueWriter(
+            open(path, "a", encoding="utf-8"),
+            _SpanRenderer(),
+            max(0, queue_size),
+            dropped=TRACE_SPANS_DROPPED,
+            name="trace-writer",
+        )
+
+    def export(self, span: Span) -> None:
+        writer = self._writer
+        if writer is not None:
+            writer.put(span.to_dict())
+
+    def shutdown(self) -> None:
+        """Write out queued spans and close the file."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop()
+            writer.stream.close()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter; None disables tracing."""
+
+    def __init__(self, exporter: Optional[Any] = None, service_name: str = "aamad-hr-backend"):
+        self.exporter = exporter
+        self.service_name = service_name
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        parent: Any = _CURRENT,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        """
+        Start a span; the caller must end() it.
+
+        ``parent`` defaults to the active span; pass None to start a new trace.
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        if parent is _CURRENT:
+            parent = _current_span.get()
+        if isinstance(parent, Span):
+            return Span(self, name, parent.trace_id, parent.span_id, attributes, start_ns)
+        return Span(self, name, random.getrandbits(128), None, attributes, start_ns)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Any = _CURRENT,
+        start_ns: Optional[int] = None,
+        **attributes: Any,
+    ) -> Iterator[Any]:
+        """Run the block in a new span that is active for nested spans."""
+        span = self.start_span(name, parent, attributes, start_ns)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generator finalized from another context
+                pass
+            span.end()
+
+    def record(self, name: str, duration_seconds: float, **attributes: Any) -> None:
+        """Export an already-measured stage as a span ending now."""
+        if self.exporter is None:
+            return
+        end_ns = time.time_ns()
+        span = self.start_span(name, attributes=attributes, start_ns=end_ns - int(duration_seconds * 1e9))
+        span.end(end_ns)
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning("Span export failed", span=span.name, error=str(e))
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def current_span():
+    """The span active in this context (a no-op span if there is none)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator: run each call of the function (sync or async) in a span."""
+
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with get_tracer().span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with get_tracer().span(span_name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer (configured from TRACING_* settings)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                settings = get_settings()
+                exporter = None
+                if settings.TRACING_ENABLED:
+                    if settings.TRACING_EXPORTER == "file":
+                        exporter = JSONLinesSpanExporter(settings.TRACING_FILE_PATH, settings.TRACING_MAX_SPANS)
+                    else:
+                        exporter = InMemorySpanExporter(settings.TRACING_MAX_SPANS)
+                    logger.info(
+                        "Tracing enabled",
+                        exporter=settings.TRACING_EXPORTER,
+                        path=settings.TRACING_FILE_PATH if settings.TRACING_EXPORTER == "file" else None,
+                    )
+                _tracer = Tracer(exporter)
+    return _tracer
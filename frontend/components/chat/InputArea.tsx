@@ -69,7 +69,7 @@ function extractMessageText(content: string): string {
 export function InputArea({ onSendMessage, disabled = false, prefillPrompt, onPrefillConsumed }: InputAreaProps) {
   const [input, setInput] = useState('');
   const inputRef = useRef<HTMLInputElement>(null);
-  const { addMessage, setLoading, setError, messages } = useChatStore();
+  const { addMessage, setLoading, setError, messages, sessionId, setSessionId } = useChatStore();
 
   useEffect(() => {
     if (!prefillPrompt) return;
@@ -99,61 +99,81 @@ export function InputArea({ onSendMessage, disabled = false, prefillPrompt, onPr
     let assistantMessageContent = '';
 
     try {
-      // Prior turns only; current message is sent as `message`
-      const conversationHistory = messages.map((msg) => ({
-        role: msg.role,
-        content: msg.content,
-      }));
-
-      await sendChatMessage(
-        {
-          message: trimmedInput,
-          conversation_history: conversationHistory,
-        },
-        (chunk) => {
-          if (chunk.status === 'thinking') return;
-
-          if (chunk.chunk) assistantMessageContent += chunk.chunk;
-
-          if (chunk.status === 'complete' || chunk.status === 'error') {
-            const toShow = extractMessageText(assistantMessageContent);
-            const assistantMessage: Message = {
-              id: assistantMessageId,
-              role: 'assistant',
-              content: toShow,
-              timestamp: new Date(),
-            };
-            addMessage(assistantMessage);
-            setLoading(false);
-            if (chunk.status === 'error') {
-              setError('An error occurred while processing your message.');
-            }
-          }
-        },
-        (error) => {
-          // Handle errors
-          console.error('Chat API error:', error);
-          const errorMsg = error.message || 'Failed to send message. Please try again.';
-          setError(errorMsg);
-          setLoading(false);
-          
-          // Add error message to chat with helpful guidance
-          let userFriendlyError = errorMsg;
-          if (errorMsg.includes('Failed to connect') || errorMsg.includes('fetch')) {
-            userFriendlyError = 'Failed to connect to backend server. Please ensure the backend is running on http://localhost:8000';
-          } else if (errorMsg.includes('500')) {
-            userFriendlyError = 'Backend server error. Please check backend logs for details. Common causes: missing OpenAI API key or crew initialization failure.';
-          }
-          
-          const errorMessage: Message = {
-            id: `msg-error-${Date.now()}`,
-            role: 'system',
-            content: `Error: ${userFriendlyError}`,
+      // With a session the backend already has the history; otherwise send
+      // prior turns once and ask it to start a session seeded with them
+      const buildRequest = (session: string | null) => ({
+        message: trimmedInput,
+        conversation_history: session
+          ? undefined
+          : messages.map((msg) => ({
+              role: msg.role,
+              content: msg.content,
+            })),
+        session_id: session ?? undefined,
+        create_session: !session,
+      });
+      let resent = false;
+
+      const onChunk: Parameters<typeof sendChatMessage>[1] = (chunk) => {
+        if (chunk.status === 'thinking') {
+          const { session_id } = chunk as { session_id?: string };
+          if (session_id && session_id !== sessionId) setSessionId(session_id);
+          return;
+        }
+
+        if (chunk.chunk) assistantMessageContent += chunk.chunk;
+
+        if (chunk.status === 'complete' || chunk.status === 'error') {
+          const toShow = extractMessageText(assistantMessageContent);
+          const assistantMessage: Message = {
+            id: assistantMessageId,
+            role: 'assistant',
+            content: toShow,
             timestamp: new Date(),
           };
-          addMessage(errorMessage);
+          addMessage(assistantMessage);
+          setLoading(false);
+          if (chunk.status === 'error') {
+            setError('An error occurred while processing your message.');
+          }
+        }
+      };
+
+      const onError = (error: Error) => {
+        const errorMsg = error.message || 'Failed to send message. Please try again.';
+
+        // 409: the backend no longer has our session (expired, evicted or
+        // restarted). Start a new one from the visible transcript, once.
+        if (sessionId && !resent && errorMsg.includes('409')) {
+          resent = true;
+          setSessionId(null);
+          sendChatMessage(buildRequest(null), onChunk, onError).catch(onError);
+          return;
         }
-      );
+
+        // Handle errors
+        console.error('Chat API error:', error);
+        setError(errorMsg);
+        setLoading(false);
+        
+        // Add error message to chat with helpful guidance
+        let userFriendlyError = errorMsg;
+        if (errorMsg.includes('Failed to connect') || errorMsg.includes('fetch')) {
+          userFriendlyError = 'Failed to connect to backend server. Please ensure the backend is running on http://localhost:8000';
+        } else if (errorMsg.includes('500')) {
+          userFriendlyError = 'Backend server error. Please check backend logs for details. Common causes: missing OpenAI API key or crew initialization failure.';
+        }
+        
+        const errorMessage: Message = {
+          id: `msg-error-${Date.now()}`,
+          role: 'system',
+          content: `Error: ${userFriendlyError}`,
+          timestamp: new Date(),
+        };
+        addMessage(errorMessage);
+      };
+
+      await sendChatMessage(buildRequest(sessionId), onChunk, onError);
     } catch (error) {
       console.error('Unexpected error:', error);
       setError('An unexpected error occurred.');
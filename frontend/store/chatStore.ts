@@ -5,10 +5,13 @@ interface ChatState {
   messages: Message[];
   isLoading: boolean;
   error: string | null;
+  /** Backend conversation session; history is kept server-side once set */
+  sessionId: string | null;
   addMessage: (message: Message) => void;
   updateMessage: (messageId: string, content: string) => void;
   setLoading: (loading: boolean) => void;
   setError: (error: string | null) => void;
+  setSessionId: (sessionId: string | null) => void;
   clearMessages: () => void;
 }
 
@@ -16,6 +19,7 @@ export const useChatStore = create<ChatState>((set, get) => ({
   messages: [],
   isLoading: false,
   error: null,
+  sessionId: null,
   addMessage: (message) =>
     set((state) => ({
       messages: [...state.messages, message],
@@ -28,5 +32,6 @@ export const useChatStore = create<ChatState>((set, get) => ({
     })),
   setLoading: (loading) => set({ isLoading: loading }),
   setError: (error) => set({ error }),
-  clearMessages: () => set({ messages: [] }),
+  setSessionId: (sessionId) => set({ sessionId }),
+  clearMessages: () => set({ messages: [], sessionId: null }),
 }));